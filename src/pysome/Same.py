@@ -1,9 +1,13 @@
-from typing import Callable, Union
+from __future__ import annotations
 
-from pysome import Some, AllOf
+from pysome.Some import Some, AllOf
 from pysome.SameState import default_name, SameState
 from pysome.exceptions import InvalidArgument, SameOutsideExpect
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Union
+
 
 class Same(Some):
     state_name = "Same"
@@ -26,21 +30,17 @@ class Same(Some):
         if self.some != other:
             return False
 
-        if self.name not in SameState._state[self.state_name]:
-            SameState._state[self.state_name][self.name] = other  # noqa
-            return True
-
-        return self._eq(other)
+        return self._check(SameState.backend, other)
 
-    def _eq(self, other):
-        return other == SameState._state[self.state_name][self.name]  # noqa
+    def _check(self, backend, other):
+        return backend.same(self.name, other)
 
 
 class NotSame(Same):
     state_name = "NotSame"
 
-    def _eq(self, other):
-        return not other == SameState._state[self.state_name][self.name]  # noqa
+    def _check(self, backend, other):
+        return backend.unique(self.name, other)
 
 
 # alias
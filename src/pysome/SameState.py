@@ -1,3 +1,8 @@
+from __future__ import annotations
+
+from collections import namedtuple
+
+
 class default_name:
     pass
 
@@ -11,6 +16,8 @@ class SameState:
         "Same": {},
         "NotSame": {}
     }
+    # stores the values that `Same` and `NotSame` compare with, see `use`
+    backend = None
 
     @staticmethod
     def _start():
@@ -23,3 +30,217 @@ class SameState:
         for key in SameState._allow.keys():
             SameState._allow[key] = False
             SameState._state[key] = {}
+
+    @staticmethod
+    def use(backend=None):
+        """
+        sets the backend that stores the values of `Same` and `NotSame` and returns the previous one. None restores
+        the default `LocalState` whose values only live for a single comparison. With `SharedState` or
+        `MergeableState` the values are kept across comparisons (and processes), so e.g. NotSame ids are unique in a
+        whole dataset.
+        """
+        previous = SameState.backend
+        SameState.backend = LocalState() if backend is None else backend
+        return previous
+
+
+class LocalState:
+    """
+    keeps the values of `Same` and `NotSame` in the current process for a single comparison (the default)
+
+    examples:
+    >>> state = LocalState()
+    >>> SameState._start()
+    >>> state.same("version", 2), state.same("version", 2), state.same("version", 3)
+    (True, True, False)
+    >>> state.unique("id", 1), state.unique("id", 2), state.unique("id", 1.0)
+    (True, True, False)
+    >>> SameState._end()
+    """
+    # False because the values are reset at the start of every comparison
+    persistent = False
+
+    def same(self, name, value) -> bool:
+        """
+        binds the value to the name if it is unbound and returns True if it equals the value bound to the name
+        """
+        state = SameState._state["Same"]
+        if name not in state:
+            state[name] = value
+            return True
+        return value == state[name]
+
+    def unique(self, name, value) -> bool:
+        """
+        records the value for the name and returns True if no equal value was recorded for the name before
+        """
+        state = SameState._state["NotSame"]
+        seen = state.get(name)
+        if seen is None:
+            seen = state[name] = _Seen()
+        return seen.add(value)
+
+
+class _Seen:
+    """
+    values that were compared to a `NotSame`. Hashable values are looked up in a set, others compared one by one.
+    """
+
+    def __init__(self):
+        self.hashable = set()
+        self.unhashable = []
+
+    def add(self, value) -> bool:
+        try:
+            duplicate = value in self.hashable
+        except TypeError:
+            if any(value == seen for seen in self.hashable) or any(value == seen for seen in self.unhashable):
+                return False
+            self.unhashable.append(value)
+            return True
+        if duplicate or any(value == seen for seen in self.unhashable):
+            return False
+        self.hashable.add(value)
+        return True
+
+
+class SharedState:
+    """
+    keeps the values of `Same` and `NotSame` in a `multiprocessing.Manager` so all processes (e.g. the workers of a
+    `multiprocessing.Pool`, it can be passed to them as argument) compare with the same values. Values are kept
+    across comparisons until `clear` is called. Every comparison is a round trip to the manager process, for large
+    datasets `MergeableState` is much faster.
+    NotSame values that are not hashable are compared by the digest of their pickled representation.
+    """
+    persistent = True
+
+    def __init__(self, manager=None):
+        if manager is None:
+            import multiprocessing
+
+            manager = multiprocessing.Manager()
+            self._owned = manager
+        else:
+            self._owned = None
+        self.values = manager.dict()
+        self.seen = manager.dict()
+
+    def __getstate__(self):
+        # the proxies connect to the manager from any process, the manager itself stays with its owner
+        return {"values": self.values, "seen": self.seen, "_owned": None}
+
+    def same(self, name, value) -> bool:
+        import os
+
+        token = os.urandom(16)
+        # setdefault runs atomically in the manager process
+        bound_token, bound = self.values.setdefault(name, (token, value))
+        return bound_token == token or value == bound
+
+    def unique(self, name, value) -> bool:
+        import os
+
+        token = os.urandom(16)
+        return self.seen.setdefault(_unique_key(name, value), token) == token
+
+    def clear(self):
+        self.values.clear()
+        self.seen.clear()
+
+    def shutdown(self):
+        """
+        stops the manager process if it was started by this state
+        """
+        if self._owned is not None:
+            self._owned.shutdown()
+            self._owned = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+# a Same value or NotSame duplicate that conflicts between the states of different workers
+Conflict = namedtuple("Conflict", ["kind", "name", "value"])
+
+
+class MergeableState:
+    """
+    keeps the values of `Same` and `NotSame` locally (like `LocalState` but across comparisons) and only digests of
+    the NotSame values. Every worker validates its part of a dataset with its own state and the states are merged
+    at the end, which collects values that conflict between workers in `conflicts`.
+    NotSame values are compared by the digest of their pickled representation, so only values that pickle the same
+    count as duplicates (e.g. 1 and 1.0 do not).
+
+    examples:
+    >>> first, second = MergeableState(), MergeableState()
+    >>> first.same("version", 2), first.unique("id", 1), first.unique("id", 1)
+    (True, True, False)
+    >>> second.same("version", 3), second.unique("id", 1), second.unique("id", 7)
+    (True, True, True)
+    >>> [(conflict.kind, conflict.name) for conflict in first.merge(second).conflicts]
+    [('Same', 'version'), ('NotSame', 'id')]
+    """
+    persistent = True
+
+    def __init__(self):
+        self.values = {}
+        self.digests = {}
+        self.conflicts = []
+
+    def same(self, name, value) -> bool:
+        if name not in self.values:
+            self.values[name] = value
+            return True
+        return value == self.values[name]
+
+    def unique(self, name, value) -> bool:
+        digest = _digest(value)
+        digests = self.digests.setdefault(name, set())
+        if digest in digests:
+            return False
+        digests.add(digest)
+        return True
+
+    def merge(self, other: "MergeableState") -> "MergeableState":
+        """
+        adds the values of another state (e.g. of another worker) and records all conflicts between both. The
+        value of a NotSame conflict is the digest of the duplicated value.
+        """
+        self.conflicts.extend(other.conflicts)
+        for name, value in other.values.items():
+            if name not in self.values:
+                self.values[name] = value
+            elif not value == self.values[name]:
+                self.conflicts.append(Conflict("Same", name, value))
+        for name, digests in other.digests.items():
+            ours = self.digests.setdefault(name, set())
+            for digest in sorted(ours & digests):
+                self.conflicts.append(Conflict("NotSame", name, digest.hex()))
+            ours.update(digests)
+        return self
+
+    def clear(self):
+        self.values = {}
+        self.digests = {}
+        self.conflicts = []
+
+
+def _digest(value) -> bytes:
+    import hashlib
+    import pickle
+
+    return hashlib.blake2b(pickle.dumps(value, protocol=4), digest_size=16).digest()
+
+
+def _unique_key(name, value):
+    try:
+        hash(value)
+    except TypeError:
+        return name, 1, _digest(value)
+    return name, 0, value
+
+
+SameState.backend = LocalState()
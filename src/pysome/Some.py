@@ -1,9 +1,14 @@
-import inspect
-import re
-from collections import Iterable
-from typing import Union, Callable, Any
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from pysome.budget import Budget
 from pysome.exceptions import *
 
+# typing, inspect and re are imported only when they are needed to keep `import pysome` cheap
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, Union
+
 
 class Some:
     """
@@ -22,10 +27,24 @@ class Some:
     False
     >>> Some(int) == None
     False
+
+    With `adaptive=True` the alternatives that match most often are tried first. The order is updated every
+    `adapt_interval` comparisons, so this is only allowed if all alternatives are pure (see `pure`).
+    >>> number = Some(type(None), SomeStr(regex="[0-9]+$"), int, adaptive=True)
+    >>> all(number == i for i in range(2000))
+    True
+    >>> number.types[0]
+    <class 'int'>
     """
     unequals = []
-
-    def __init__(self, *args: Union[type, Callable, "Some"]):
+    # the `_Recording` of the validator calls of a compiled comparison (see `pysome.codegen`) or None
+    recording = None
+    # number of comparisons after which adaptive matchers reorder their alternatives
+    adapt_interval = 1024
+    # True if the validator functions a subclass passes to `Some.__init__` only look at the compared value
+    _pure_validator = False
+
+    def __init__(self, *args: Union[type, Callable, "Some"], adaptive: bool = False):
         self._signature = self.get_signature(*args)
         self.types = []
         if args:
@@ -37,7 +56,7 @@ class Some:
                     self.types.append(arg)
                     continue
                 elif callable(arg):
-                    if len(inspect.signature(arg).parameters) != 1:
+                    if _count_parameters(arg) != 1:
                         raise InvalidFunction("function must accept exactly one parameter")
                     self.types.append(arg)
                     continue
@@ -45,6 +64,18 @@ class Some:
                                       f"is of type {type(arg)}")
         else:
             self.types = None
+        # pure matchers have no side effects and only depend on the compared value, so the order of pure
+        # alternatives does not change the result (unlike e.g. user functions or `Same`)
+        self.pure = self.types is None or all(
+            isinstance(t, type) or (t.pure if isinstance(t, Some) else self._pure_validator) for t in self.types)
+        self.adaptive = adaptive
+        if adaptive:
+            if not self.pure:
+                raise InvalidArgument("adaptive=True is only allowed if all alternatives are types or pure matchers "
+                                      "like SomeIn or SomeStr")
+            self._declared = tuple(self.types or ())
+            self._hits = [0] * len(self._declared)
+            self._calls = 0
 
     @classmethod
     def get_signature(cls, *args, **kwargs):
@@ -65,6 +96,10 @@ class Some:
     def __eq__(self, other: Any):
         if self.types is None:
             return True
+        if Budget.active is not None:
+            Budget.active.visit()
+        if self.adaptive:
+            return self._adaptive_eq(other)
         for t in self.types:
             if isinstance(t, type):
                 if isinstance(other, t):
@@ -73,7 +108,7 @@ class Some:
                 if t == other:
                     return True
             elif callable(t):
-                eq = t(other)
+                eq = t(other) if Some.recording is None else Some.recording.call(t, other)
                 if not isinstance(eq, bool):
                     raise MustReturnBool(
                         f"validator function must return bool (True or False) but returned {eq} of type {type(eq)} "
@@ -83,10 +118,123 @@ class Some:
         Some.unequals.append(f"{self} does not equal {other}")
         return False
 
+    def _adaptive_eq(self, other):
+        types, hits = self.types, self._hits
+        mark = len(Some.unequals)
+        index = _first_match(types, other)
+        if index >= 0:
+            hits[index] += 1
+        self._calls += 1
+        if self._calls >= self.adapt_interval:
+            self._adapt()
+        if index >= 0:
+            return True
+        # all alternatives failed, so they are tried again in declaration order for the same messages as without
+        # adaptive (pure alternatives return the same result again)
+        del Some.unequals[mark:]
+        _first_match(self._declared, other)
+        Some.unequals.append(f"{self} does not equal {other}")
+        return False
+
+    def _adapt(self):
+        # stable sort so ties keep the declaration order, halving the counts lets the order follow drifting data
+        order = sorted(range(len(self.types)), key=lambda i: -self._hits[i])
+        self.types = [self.types[i] for i in order]
+        self._hits = [self._hits[i] // 2 for i in order]
+        self._calls = 0
+
     def __str__(self):
         return self._signature
 
 
+def _first_match(types, other) -> int:
+    """
+    index of the first alternative that equals other or -1
+    """
+    for i, t in enumerate(types):
+        if isinstance(t, type):
+            if isinstance(other, t):
+                return i
+        elif isinstance(t, Some):
+            if t == other:
+                return i
+        else:
+            eq = t(other)
+            if not isinstance(eq, bool):
+                raise MustReturnBool(
+                    f"validator function must return bool (True or False) but returned {eq} of type {type(eq)} "
+                    "instead")
+            if eq:
+                return i
+    return -1
+
+
+class _Recording:
+    """
+    the validator functions a comparison called in call order with their results and the messages they added to
+    `Some.unequals`. A comparison that is repeated from `position` 0 gets the recorded results (and messages) of the
+    same calls instead of calling the functions again, the calls made within a replayed call are skipped.
+    """
+    __slots__ = ("calls", "position")
+
+    def __init__(self):
+        # [function, other, result, messages, index after the calls made within this call]
+        self.calls = []
+        self.position = 0
+
+    def call(self, function, other):
+        calls, i = self.calls, self.position
+        if i < len(calls):
+            recorded = calls[i]
+            if recorded[0] is function and recorded[1] is other:
+                self.position = recorded[4]
+                Some.unequals.extend(recorded[3])
+                return recorded[2]
+            # the repeated comparison took another path, calls that were not recorded are made (once)
+            return function(other)
+        recorded = [function, other, None, None, None]
+        calls.append(recorded)
+        self.position = i + 1
+        mark = len(Some.unequals)
+        try:
+            recorded[2] = function(other)
+        except BaseException:
+            del calls[i:]
+            self.position = i
+            raise
+        recorded[3] = Some.unequals[mark:]
+        recorded[4] = self.position = len(calls)
+        return recorded[2]
+
+
+def _call(function, other):
+    """
+    calls a validator function of generated code, see `_Recording`
+    """
+    recording = Some.recording
+    if recording is None:
+        return function(other)
+    return recording.call(function, other)
+
+
+def _count_parameters(function) -> int:
+    """
+    number of parameters of a function like `len(inspect.signature(function).parameters)`. Plain functions (like
+    the validators of all matchers) are looked at directly, everything else with inspect.
+    """
+    if type(function) is _function_type and "__wrapped__" not in function.__dict__ \
+            and "__signature__" not in function.__dict__:
+        code = function.__code__
+        # 0x04 and 0x08 are the code flags of *args and **kwargs
+        return code.co_argcount + code.co_kwonlyargcount + bool(code.co_flags & 0x04) + bool(code.co_flags & 0x08)
+    import inspect
+
+    return len(inspect.signature(function).parameters)
+
+
+_function_type = type(_count_parameters)
+
+
 class AllOf(Some):
     """
     AllOf validates against all given arguments and only equals if all match.
@@ -101,11 +249,14 @@ class AllOf(Some):
     """
 
     def __init__(self, *args: Union[type, Callable, "Some"]):
+        self.args = args
+
         def validate_all(other):
             return all(Some(arg) == other for arg in args)
 
         super().__init__(validate_all)
         self._signature = self.get_signature(*args)
+        self.pure = all(Some(arg).pure for arg in args)
 
 
 class SomeOrNone(Some):
@@ -126,11 +277,8 @@ class SomeOrNone(Some):
     """
 
     def __init__(self, *args: Union[type, Callable, "Some"]):
-        def is_none(x):
-            return x is None
-
         if args:
-            super().__init__(*args, is_none)
+            super().__init__(*args, type(None))
         else:
             super().__init__()
         self._signature = self.get_signature(*args)
@@ -150,15 +298,30 @@ class SomeIterable(Some):
     >>> SomeIterable(Some(str)) == (1, 3, 4)
     False
     """
-    def __init__(self, arg: Any = Some(), length=None, is_type: type = Iterable):
+    def __init__(self, arg: Any = Some(), length=None, is_type: type = Iterable, columnar: bool = False):
         if not isinstance(is_type, type):
             raise InvalidArgument(f"is_type must be a type but is {is_type}")
+        self.arg = arg
+        self.length = length
+        self.is_type = is_type
+        self.columnar = columnar
+        column_check = None
 
         def some_iterable_validator(others):
+            nonlocal column_check
             if not isinstance(others, is_type):
                 return False
             if length is not None and len(others) != length:
                 return False
+            if Budget.active is not None:
+                others = Budget.active.items(others)
+            if columnar and type(others) is list:
+                if column_check is None:
+                    from pysome.columnar import records_checker
+                    column_check = records_checker(arg)
+                # a failing columnar check is repeated row by row to get the exact result and error messages
+                if column_check(others):
+                    return True
             return all(arg == x for x in others)
 
         super().__init__(some_iterable_validator)
@@ -167,6 +330,8 @@ class SomeIterable(Some):
             kwargs["length"] = length
         if is_type is not Iterable:
             kwargs["is_type"] = is_type
+        if columnar:
+            kwargs["columnar"] = columnar
         self._signature = self.get_signature(arg, **kwargs)
 
 
@@ -183,17 +348,20 @@ class SomeList(SomeIterable):
     False
     """
 
-    def __init__(self, arg: Any = Some(), length=None):
-        super().__init__(arg, length=length, is_type=list)
+    def __init__(self, arg: Any = Some(), length=None, columnar: bool = False):
+        super().__init__(arg, length=length, is_type=list, columnar=columnar)
         kwargs = {}
         if length is not None:
             kwargs["length"] = length
+        if columnar:
+            kwargs["columnar"] = columnar
         self._signature = self.get_signature(arg, **kwargs)
 
 
 class SomeDict(Some):
     """
-    SomeDict is equal to any dict
+    SomeDict is equal to any dict (or other `collections.abc.Mapping`). Of other mappings like shelves only the keys
+    and values the template needs are read.
 
     examples:
     >>> SomeDict() == {}
@@ -208,25 +376,133 @@ class SomeDict(Some):
     True
     >>> SomeDict({"a": Some(int)}) == {"a": {"a1": 1, "a2": 2}, "b": 3}
     False
+    >>> SomeDict(a=Some(), required=True) == {"b": 3}
+    False
+    >>> SomeDict(a=Some(int), extra="forbid") == {"a": 1, "b": 3}
+    False
     """
 
-    def __init__(self, partial_dict: dict = None, **kwargs):
+    def __init__(self, partial_dict: dict = None, extra: str = "allow", required=None, **kwargs):
         if partial_dict is None:
             partial_dict = {}
         if not isinstance(partial_dict, dict):
             raise InvalidArgument("SomeDict except either dict or **kwargs")
+        if extra not in ("allow", "forbid"):
+            raise InvalidArgument('extra must be either "allow" or "forbid"')
         partial_dict = dict(partial_dict, **kwargs)
+        if required is None or required is False:
+            required_keys = frozenset()
+        elif required is True:
+            required_keys = frozenset(partial_dict)
+        elif isinstance(required, (list, tuple, set, frozenset)):
+            required_keys = frozenset(required)
+        else:
+            raise InvalidArgument("required must be a bool or a collection of keys")
+        self.partial_dict = partial_dict
+        self.extra = extra
+        self.required = required_keys
+        # keys a dict may have if extra keys are forbidden, else None
+        self.allowed = frozenset(partial_dict) | required_keys if extra == "forbid" else None
+        # Some() equals everything (even missing keys) so it does not have to be compared
+        checks = [(key, value) for key, value in partial_dict.items()
+                  if not (type(value) is Some and value.types is None)]
+        allowed = self.allowed
+        exact = allowed is not None and allowed == required_keys
 
         def some_dict_validator(other):
             if not isinstance(other, dict):
+                if isinstance(other, Mapping):
+                    return lazy_mapping_validator(other)
                 return False
-            for key, value in partial_dict.items():
+            if exact:
+                if other.keys() != allowed:
+                    return False
+            else:
+                if required_keys and not other.keys() >= required_keys:
+                    return False
+                if allowed is not None and not allowed.issuperset(other):
+                    return False
+            for key, value in checks:
+                if not other.get(key, None) == value:
+                    return False
+            return True
+
+        def lazy_mapping_validator(other):
+            # only membership tests, iteration over keys and single lookups so no other values are loaded
+            for key in required_keys:
+                if key not in other:
+                    return False
+            if allowed is not None and not allowed.issuperset(other):
+                return False
+            for key, value in checks:
                 if not other.get(key, None) == value:
                     return False
             return True
 
         super().__init__(some_dict_validator)
         self._signature = self.get_signature(**partial_dict)
+        options = []
+        if extra != "allow":
+            options.append(f"extra={extra}")
+        if required is True:
+            options.append("required=True")
+        elif required_keys:
+            options.append(f"required={sorted(required_keys, key=repr)}")
+        if options:
+            self._signature = self._signature[:-1] + (", " if partial_dict else "") + ", ".join(options) + ")"
+
+
+class SomeMapping(SomeDict):
+    """
+    SomeMapping is equal to any `collections.abc.Mapping` (like SomeDict). With `SomeMapping.each(key, value)` all
+    items of a mapping are streamed one by one instead of looking up given keys.
+
+    examples:
+    >>> from types import MappingProxyType
+    >>> SomeMapping(a=Some(int)) == MappingProxyType({"a": 1, "b": 2})
+    True
+    >>> SomeMapping.each(Some(str), Some(int)) == {"a": 1, "b": 2}
+    True
+    >>> SomeMapping.each(value=Some(int)) == {"a": 1, "b": "2"}
+    False
+    """
+
+    def __init__(self, partial_dict: dict = None, extra: str = "allow", required=None, **kwargs):
+        super().__init__(partial_dict, extra, required, **kwargs)
+        # (key, value) templates every item has to equal or None
+        self.each_item = None
+
+    @classmethod
+    def each(cls, key=None, value=None) -> "SomeMapping":
+        """
+        returns a SomeMapping that equals mappings whose keys all equal `key` and whose values all equal `value`.
+        Items are read one at a time and values are not read at all if `value` is not given.
+        """
+        key = Some() if key is None else key
+        value = Some() if value is None else value
+        mapping = cls()
+        mapping.each_item = (key, value)
+        keys_only = type(value) is Some and value.types is None
+
+        def each_item_validator(other):
+            if not isinstance(other, Mapping):
+                return False
+            keys, items = other.keys(), other.items()
+            if Budget.active is not None:
+                keys, items = Budget.active.items(keys), Budget.active.items(items)
+            if keys_only:
+                for k in keys:
+                    if not k == key:
+                        return False
+                return True
+            for k, v in items:
+                if not k == key or not v == value:
+                    return False
+            return True
+
+        Some.__init__(mapping, each_item_validator)
+        mapping._signature = f"{cls.__name__}.each(key={key}, value={value})"
+        return mapping
 
 
 class SomeIn(Some):
@@ -241,10 +517,12 @@ class SomeIn(Some):
        >>> SomeIn({"a", "b"}) == "c"
        False
        """
+    _pure_validator = True
 
     def __init__(self, container):
         if not hasattr(container, '__contains__'):
             raise InvalidArgument("is_in container doesn't implement __contains__")
+        self.container = container
 
         def is_in_validator(other):
             return other in container
@@ -265,8 +543,13 @@ class SomeWithLen(Some):
     >>> SomeWithLen(2) == (1, )
     False
     """
+    _pure_validator = True
 
     def __init__(self, length=None, min_length=None, max_length=None):
+        self.length = length
+        self.min_length = min_length
+        self.max_length = max_length
+
         def len_validator(other):
             if not hasattr(other, '__len__'):
                 return False
@@ -314,7 +597,8 @@ class NotSome(Some):
 
 class SomeStr(Some):
     """
-    Equals all Strings that fulfill given conditions
+    Equals all Strings that fulfill all given conditions. Every condition can also be a collection of alternatives
+    (e.g. several prefixes) which are combined into a single regex or `str.startswith` call.
 
     examples:
     >>> SomeStr() == "abc"
@@ -323,40 +607,15 @@ class SomeStr(Some):
     True
     >>> SomeStr(regex="a[0-9]z") == "axz"
     False
+    >>> SomeStr(startswith=("http://", "https://"), endswith=".de") == "https://pysome.de"
+    True
+    >>> SomeStr(regex=["[0-9]+$", "0x[0-9a-f]+$"]) == "0x1f"
+    True
     """
+    _pure_validator = True
 
     def __init__(self, regex=None, pattern=None, endswith=None, startswith=None):
-        if not SomeOrNone(str) == regex:
-            raise InvalidArgument("regex must be of type str or None")
-        if not SomeOrNone(str) == pattern:
-            raise InvalidArgument("pattern must be of type str or None")
-        if not SomeOrNone(str) == endswith:
-            raise InvalidArgument("endswith must be of type str or None")
-        if not SomeOrNone(str) == startswith:
-            raise InvalidArgument("startswith must be of type str or None")
-
-        def some_str_validator(other):
-            if not isinstance(other, str):
-                return False
-            if regex is not None:
-                if re.match(regex, other):
-                    return True
-                else:
-                    return False
-            if pattern is not None:
-                if re.match(pattern.replace("_", ".") + "$", other):
-                    return True
-                else:
-                    return False
-            if endswith is not None:
-                return other.endswith(endswith)
-            if startswith is not None:
-                return other.startswith(startswith)
-            return True
-
-        super().__init__(some_str_validator)
         kwargs = {}
-
         if regex is not None:
             kwargs["regex"] = regex
         if pattern is not None:
@@ -365,9 +624,102 @@ class SomeStr(Some):
             kwargs["endswith"] = endswith
         if startswith is not None:
             kwargs["startswith"] = startswith
+        self.regex = regex = _str_alternatives(regex, "regex")
+        self.pattern = pattern = _str_alternatives(pattern, "pattern")
+        self.endswith = endswith = _str_alternatives(endswith, "endswith")
+        self.startswith = startswith = _str_alternatives(startswith, "startswith")
+
+        expressions = []
+        if regex is not None:
+            expressions.append(regex)
+        if pattern is not None:
+            expressions.append(tuple(p.replace("_", ".") + "$" for p in pattern))
+        self.compiled = _compile_all(expressions)
+
+        def some_str_validator(other):
+            if not isinstance(other, str):
+                return False
+            if startswith is not None and not other.startswith(startswith):
+                return False
+            if endswith is not None and not other.endswith(endswith):
+                return False
+            if self.compiled and Budget.active is not None:
+                Budget.active.string(other)
+            for compiled in self.compiled:
+                if compiled.match(other) is None:
+                    return False
+            return True
+
+        super().__init__(some_str_validator)
         self._signature = self.get_signature(**kwargs)
 
 
+# regex features that refer to other groups or change flags and thus can not be combined with other regexes
+# (compiled on first use by the cache of `re`)
+_uncombinable = r"\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)"
+
+
+def _str_alternatives(value, name):
+    """
+    normalizes a str or a collection of str to a tuple of alternatives
+    """
+    if value is None or isinstance(value, str):
+        return value if value is None else (value,)
+    if isinstance(value, (list, tuple, set, frozenset)) and value and all(isinstance(v, str) for v in value):
+        return tuple(value)
+    raise InvalidArgument(f"{name} must be of type str, a non empty collection of str or None")
+
+
+def _compile_all(expressions):
+    """
+    compiles regexes of which all must match (each given as a tuple of alternatives of which one must match) into as
+    few patterns as possible. Usually this is a single pattern like `(?=(?:a|b))(?:c|d)`.
+    """
+    if not expressions:
+        return []
+    import re
+
+    for alternatives in expressions:
+        for alternative in alternatives:
+            try:
+                re.compile(alternative)
+            except re.error as e:
+                raise InvalidArgument(f"invalid regex {alternative!r}: {e}")
+    uncombinable = re.compile(_uncombinable)
+    if not any(uncombinable.search(a) for alternatives in expressions for a in alternatives) or \
+            sum(map(len, expressions)) == 1:
+        alternations = ["|".join(f"(?:{a})" for a in alternatives) for alternatives in expressions]
+        combined = "".join(f"(?=(?:{a}))" for a in alternations[:-1]) + f"(?:{alternations[-1]})"
+        try:
+            return [re.compile(combined)]
+        except re.error:
+            # e.g. the same group name in several regexes
+            pass
+    compiled = []
+    for alternatives in expressions:
+        if len(alternatives) == 1:
+            compiled.append(re.compile(alternatives[0]))
+        else:
+            compiled.append(_AnyOf([re.compile(a) for a in alternatives]))
+    return compiled
+
+
+class _AnyOf:
+    """
+    regexes of which one has to match, for regexes that can not be combined into one alternation
+    """
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+
+    def match(self, string):
+        for pattern in self.patterns:
+            m = pattern.match(string)
+            if m is not None:
+                return m
+        return None
+
+
 class SomeEmail(SomeStr):
     """
     SomeEmail equals all email strings that are email adresses
@@ -381,12 +733,30 @@ class SomeEmail(SomeStr):
 
     def __init__(self):
         super().__init__(regex=r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+        email = self.compiled[0].match
+
+        def some_email_validator(other):
+            if not isinstance(other, str):
+                return False
+            # cheap structural check first, most non emails fail here without running the regex
+            if "@" not in other or "." not in other:
+                return False
+            if Budget.active is not None:
+                Budget.active.string(other)
+            return email(other) is not None
+
+        Some.__init__(self, some_email_validator)
         self._signature = self.get_signature()
 
 
+_uuid_cases = {"lower": "0-9a-f", "upper": "0-9A-F", "any": "0-9a-fA-F"}
+
+
 class SomeUuid(SomeStr):
     """
-    SomeUuid equals all strings that are uuids
+    SomeUuid equals all strings (or bytes) that are uuids and `uuid.UUID` objects. By default the hex digits
+    must be lowercase, `case` can be "lower", "upper" or "any". If a `version` is given only RFC 4122 uuids of
+    this version are equal.
 
     examples:
     >>> SomeUuid() == "385a77ce-e9ad-47eb-aad6-d58512035fb0"
@@ -395,11 +765,137 @@ class SomeUuid(SomeStr):
     True
     >>> SomeUuid() == "not a uuid"
     False
+    >>> SomeUuid(version=4, case="upper") == "385A77CE-E9AD-47EB-AAD6-D58512035FB0"
+    True
+    >>> import uuid
+    >>> SomeUuid(version=1) == uuid.UUID("385a77ce-e9ad-47eb-aad6-d58512035fb0")
+    False
     """
 
-    def __init__(self):
-        super().__init__(regex=r"^[0-9a-f]{8}\b-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-\b[0-9a-f]{12}$")
-        self._signature = self.get_signature()
+    def __init__(self, version: int = None, case: str = "lower"):
+        if version is not None and (not isinstance(version, int) or not 1 <= version <= 8):
+            raise InvalidArgument("version must be an int between 1 and 8 or None")
+        if case not in _uuid_cases:
+            raise InvalidArgument(f"case must be one of {', '.join(_uuid_cases)}")
+        h = f"[{_uuid_cases[case]}]"
+        if version is None:
+            regex = f"{h}{{8}}-{h}{{4}}-{h}{{4}}-{h}{{4}}-{h}{{12}}"
+        else:
+            variant = "[89ab]" if case == "lower" else "[89AB]" if case == "upper" else "[89abAB]"
+            regex = f"{h}{{8}}-{h}{{4}}-{version:x}{h}{{3}}-{variant}{h}{{3}}-{h}{{12}}"
+        super().__init__(regex=regex + r"\Z")
+        self.version = version
+        self.case = case
+        import re
+        import uuid
+
+        # the length check rejects most other strings before the (precompiled) regex runs
+        str_uuid = re.compile(regex).fullmatch
+        bytes_uuid = re.compile(regex.encode()).fullmatch
+
+        def some_uuid_validator(other):
+            if isinstance(other, str):
+                return len(other) == 36 and str_uuid(other) is not None
+            if isinstance(other, uuid.UUID):
+                return version is None or other.version == version
+            if isinstance(other, (bytes, bytearray)):
+                return len(other) == 36 and bytes_uuid(other) is not None
+            return False
+
+        Some.__init__(self, some_uuid_validator)
+        kwargs = {}
+        if version is not None:
+            kwargs["version"] = version
+        if case != "lower":
+            kwargs["case"] = case
+        self._signature = self.get_signature(**kwargs)
+
+
+class SomeBytes(Some):
+    """
+    SomeBytes equals all bytes like objects (bytes, bytearray, memoryview, mmap, ...) that fulfill all given
+    conditions. The payload is only looked at through a memoryview so it is never copied or decoded.
+
+    examples:
+    >>> SomeBytes(prefix=b"\\x89PNG") == b"\\x89PNG\\r\\n..."
+    True
+    >>> SomeBytes(regex=rb"[0-9]+;", max_length=8) == bytearray(b"42;")
+    True
+    >>> SomeBytes(length=4) == memoryview(b"abc")
+    False
+    >>> SomeBytes() == "abc"
+    False
+    """
+    _pure_validator = True
+
+    def __init__(self, prefix: bytes = None, suffix: bytes = None, regex=None, length: int = None,
+                 max_length: int = None):
+        if not SomeOrNone(bytes) == prefix:
+            raise InvalidArgument("prefix must be of type bytes or None")
+        if not SomeOrNone(bytes) == suffix:
+            raise InvalidArgument("suffix must be of type bytes or None")
+        import re
+
+        if isinstance(regex, bytes):
+            compiled = re.compile(regex)
+        elif isinstance(regex, re.Pattern) and isinstance(regex.pattern, bytes):
+            compiled = regex
+        elif regex is None:
+            compiled = None
+        else:
+            raise InvalidArgument("regex must be a bytes pattern or None")
+        if not SomeOrNone(int) == length:
+            raise InvalidArgument("length must be of type int or None")
+        if not SomeOrNone(int) == max_length:
+            raise InvalidArgument("max_length must be of type int or None")
+        self.prefix = prefix
+        self.suffix = suffix
+        self.regex = compiled
+        self.length = length
+        self.max_length = max_length
+
+        def some_bytes_validator(other):
+            if isinstance(other, str):
+                return False
+            try:
+                view = memoryview(other)
+            except TypeError:
+                return False
+            with view:
+                if not view.c_contiguous:
+                    # strided views (e.g. memoryview(b)[::2]) have no flat representation without a copy
+                    view = memoryview(view.tobytes())
+                elif view.format != "B" or view.ndim != 1:
+                    view = view.cast("B")
+                with view:
+                    size = view.nbytes
+                    if length is not None and size != length:
+                        return False
+                    if max_length is not None and size > max_length:
+                        return False
+                    if prefix is not None and (size < len(prefix) or view[:len(prefix)] != prefix):
+                        return False
+                    if suffix is not None and (size < len(suffix) or view[size - len(suffix):] != suffix):
+                        return False
+                    if compiled is not None and Budget.active is not None:
+                        Budget.active.string(view)
+                    if compiled is not None and compiled.match(view) is None:
+                        return False
+            return True
+
+        super().__init__(some_bytes_validator)
+        kwargs = {}
+        if prefix is not None:
+            kwargs["prefix"] = prefix
+        if suffix is not None:
+            kwargs["suffix"] = suffix
+        if compiled is not None:
+            kwargs["regex"] = compiled.pattern
+        if length is not None:
+            kwargs["length"] = length
+        if max_length is not None:
+            kwargs["max_length"] = max_length
+        self._signature = self.get_signature(**kwargs)
 
 
 class SomeObject(Some):
@@ -423,18 +919,144 @@ class SomeObject(Some):
     """
 
     def __init__(self, *args: Union[type, Callable, "Some"], **kwargs):
+        some = Some(*args) if args else None
+        self.some = some
+        self.attributes = kwargs
+        attributes = tuple(kwargs.items())
+        import weakref
+
+        plans = weakref.WeakKeyDictionary()
+
         def validate_some_object(other):
-            for key, value in kwargs.items():
-                if not hasattr(other, key):
+            if some is not None and not some == other:
+                return False
+            cls = type(other)
+            try:
+                plan = plans[cls]
+            except KeyError:
+                plan = plans[cls] = tuple((attribute_getter(cls, key), value) for key, value in attributes)
+            except TypeError:
+                plan = tuple((attribute_getter(cls, key), value) for key, value in attributes)
+            for getter, value in plan:
+                attr = getter(other)
+                if attr is no_attribute:
                     return False
-                if value != getattr(other, key):
+                if value != attr:
                     return False
             return True
 
-        super().__init__(AllOf(Some(*args), validate_some_object))
+        super().__init__(validate_some_object)
         self._signature = self.get_signature(*args, **kwargs)
 
 
+# returned by attribute getters if the object does not have the attribute
+no_attribute = object()
+
+
+def attribute_getter(cls: type, name: str) -> Callable:
+    """
+    returns a function that reads the attribute `name` of instances of cls (or `no_attribute` if they don't have
+    it). The class is inspected once so the returned function can skip the parts of the generic attribute lookup
+    that can't apply to this class. Classes may change after they were inspected: a lookup that misses and a data
+    descriptor that was replaced or removed fall back to the generic lookup (only a data descriptor that is added
+    later does not take precedence over an attribute in the instance dict).
+    """
+    def generic(obj):
+        return getattr(obj, name, no_attribute)
+
+    if cls.__getattribute__ is not object.__getattribute__ or hasattr(cls, "__getattr__"):
+        return generic
+
+    class_attr = owner = no_attribute
+    for base in cls.__mro__:
+        if name in base.__dict__:
+            # the mappingproxy of a class shows later changes of its attributes
+            owner = base.__dict__
+            class_attr = owner[name]
+            break
+
+    if class_attr is not no_attribute and hasattr(type(class_attr), "__set__"):
+        if not hasattr(type(class_attr), "__get__"):
+            return generic
+        # data descriptors like properties or __slots__ members win over the instance dict
+        get = type(class_attr).__get__
+
+        def from_descriptor(obj):
+            if owner.get(name, no_attribute) is not class_attr:
+                return generic(obj)
+            try:
+                return get(class_attr, obj, cls)
+            except AttributeError:
+                return no_attribute
+
+        return from_descriptor
+
+    if not cls.__dictoffset__:
+        return generic
+
+    def from_dict(obj):
+        attr = obj.__dict__.get(name, no_attribute)
+        if attr is no_attribute:
+            # class attributes and attributes the class got after it was inspected
+            return getattr(obj, name, no_attribute)
+        return attr
+
+    return from_dict
+
+
+class SomeOneOf(Some):
+    """
+    SomeOneOf equals dicts that equal the variant that is selected by the value of their discriminator key. The
+    variant is looked up directly instead of trying all of them. If fallback is True dicts without the
+    discriminator key equal if any variant equals them.
+
+    examples:
+    >>> events = SomeOneOf("type", {"click": SomeDict(x=Some(int)), "key": SomeDict(code=Some(str))})
+    >>> events == {"type": "click", "x": 12}
+    True
+    >>> events == {"type": "key", "code": "Enter"}
+    True
+    >>> events == {"type": "key", "x": 12}
+    False
+    >>> events == {"type": "scroll"}
+    False
+    >>> events == {"x": 12}
+    False
+    >>> SomeOneOf("type", {"click": SomeDict(x=Some(int))}, fallback=True) == {"x": 12}
+    True
+    """
+
+    def __init__(self, discriminator, variants: dict, fallback: bool = False):
+        if not isinstance(variants, dict):
+            raise InvalidArgument("variants of SomeOneOf must be a dict that maps tags to templates")
+        try:
+            hash(discriminator)
+        except TypeError:
+            raise InvalidArgument("discriminator of SomeOneOf must be hashable")
+        variants = dict(variants)
+        self.discriminator = discriminator
+        self.variants = variants
+        self.fallback = fallback
+
+        def one_of_validator(other):
+            if not isinstance(other, dict):
+                return False
+            if discriminator not in other:
+                return fallback and any(variant == other for variant in variants.values())
+            try:
+                variant = variants[other[discriminator]]
+            except (KeyError, TypeError):
+                return False
+            return variant == other
+
+        super().__init__(one_of_validator)
+        signs = [f"discriminator={discriminator}",
+                 "variants={" + ", ".join(f"{tag}: {variant}" for tag, variant in variants.items()) + "}"]
+        if fallback:
+            signs.append(f"fallback={fallback}")
+        self._signature = self.__class__.__name__ + "(" + ", ".join(signs) + ")"
+
+
 # alias names
 has_len = SomeWithLen
 
@@ -445,3 +1067,5 @@ is_not = NotSome
 is_email = SomeEmail
 
 is_uuid = SomeUuid
+
+one_of = SomeOneOf
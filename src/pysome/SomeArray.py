@@ -0,0 +1,110 @@
+from pysome.Some import Some
+from pysome.exceptions import InvalidArgument
+
+_monotonic_orders = ("increasing", "decreasing", "strictly_increasing", "strictly_decreasing")
+
+
+class SomeArray(Some):
+    """
+    SomeArray equals numpy arrays, buffers (like bytes or array.array) and lists of numbers whose elements fulfill
+    all given conditions. The elements are checked with vectorized numpy operations instead of a python call per
+    element. Requires numpy.
+
+    examples:
+    >>> import numpy as np
+    >>> SomeArray(dtype=float, shape=(None, 3)) == np.zeros((10, 3))
+    True
+    >>> SomeArray(dtype=int) == np.zeros((10, 3))
+    False
+    >>> SomeArray(min=0, max=1) == np.array([0.1, 0.5, 1.2])
+    False
+    >>> SomeArray(monotonic="increasing") == [1, 2, 2, 5]
+    True
+    >>> SomeArray(finite=True) == [1.0, float("nan")]
+    False
+    >>> SomeArray() == ["a", "b"]
+    False
+    """
+
+    def __init__(self, dtype=None, shape=None, min=None, max=None, finite: bool = False, monotonic: str = None):
+        import numpy as np
+
+        kwargs = {}
+        if dtype is not None:
+            kwargs["dtype"] = dtype
+            dtype = {int: np.integer, float: np.floating, complex: np.complexfloating, bool: np.bool_}.get(dtype, dtype)
+            try:
+                np.issubdtype(np.float64, dtype)
+            except TypeError:
+                raise InvalidArgument(f"dtype must be a numpy dtype or type but is {dtype}")
+        if isinstance(shape, int):
+            shape = (shape,)
+        if shape is not None:
+            if not isinstance(shape, tuple) or not all(s is None or isinstance(s, int) for s in shape):
+                raise InvalidArgument("shape must be an int or a tuple of ints and None")
+        if monotonic is not None and monotonic not in _monotonic_orders:
+            raise InvalidArgument(f"monotonic must be one of {', '.join(_monotonic_orders)}")
+
+        def some_array_validator(other):
+            if isinstance(other, np.ndarray):
+                array = other
+            elif isinstance(other, (list, tuple)):
+                try:
+                    array = np.asarray(other)
+                except (ValueError, TypeError):
+                    return False
+                if array.dtype.kind not in "biufc":
+                    return False
+            else:
+                try:
+                    array = np.asarray(memoryview(other))
+                except (TypeError, ValueError, NotImplementedError):
+                    return False
+
+            if dtype is not None and not np.issubdtype(array.dtype, dtype):
+                return False
+            if shape is not None:
+                if len(array.shape) != len(shape):
+                    return False
+                if any(s is not None and s != a for s, a in zip(shape, array.shape)):
+                    return False
+            if array.size == 0:
+                return True
+            try:
+                if finite and array.dtype.kind in "fc" and not np.isfinite(array).all():
+                    return False
+                # min() and max() are nan if any element is nan so nan never fulfills a range
+                if min is not None and not array.min() >= min:
+                    return False
+                if max is not None and not array.max() <= max:
+                    return False
+                if monotonic is not None:
+                    if array.ndim != 1:
+                        return False
+                    before, after = array[:-1], array[1:]
+                    if monotonic == "increasing":
+                        ordered = after >= before
+                    elif monotonic == "decreasing":
+                        ordered = after <= before
+                    elif monotonic == "strictly_increasing":
+                        ordered = after > before
+                    else:
+                        ordered = after < before
+                    if not ordered.all():
+                        return False
+            except TypeError:
+                return False
+            return True
+
+        super().__init__(some_array_validator)
+        if shape is not None:
+            kwargs["shape"] = shape
+        if min is not None:
+            kwargs["min"] = min
+        if max is not None:
+            kwargs["max"] = max
+        if finite:
+            kwargs["finite"] = finite
+        if monotonic is not None:
+            kwargs["monotonic"] = monotonic
+        self._signature = self.get_signature(**kwargs)
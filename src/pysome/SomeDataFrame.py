@@ -0,0 +1,195 @@
+import functools
+import operator
+import re
+
+from pysome.Some import Some, SomeEmail, SomeIn, SomeOrNone, SomeStr
+from pysome.exceptions import InvalidArgument
+
+_literal_types = (int, float, str, bool)
+# containers whose `in` means equality with one of their elements (unlike e.g. str where it means substring)
+_element_containers = (set, frozenset, list, tuple, dict)
+
+
+class SomeDataFrame(Some):
+    """
+    SomeDataFrame equals pandas DataFrames that have all given columns where every value of a column equals the
+    template of the column. Missing values (None, NaN, NaT, NA) count as None and numeric columns as their python
+    types (e.g. an int64 column as int). Most matchers are mapped to vectorized column operations (dtype checks,
+    `isin`, `.str.match`, `notna`); only opaque matchers like functions are evaluated value by value.
+    Requires pandas.
+
+    examples:
+    >>> import pandas as pd
+    >>> df = pd.DataFrame({"id": [1, 2, 3], "email": ["a@b.de", "c@d.de", None], "kind": ["a", "b", "a"]})
+    >>> SomeDataFrame(id=Some(int), kind=SomeIn({"a", "b"})) == df
+    True
+    >>> SomeDataFrame(email=SomeEmail()) == df
+    False
+    >>> SomeDataFrame(email=SomeOrNone(SomeEmail())) == df
+    True
+    >>> SomeDataFrame(name=Some()) == df
+    False
+    """
+
+    def __init__(self, columns: dict = None, **kwargs):
+        import pandas as pd
+
+        if columns is None:
+            columns = {}
+        if not isinstance(columns, dict):
+            raise InvalidArgument("SomeDataFrame expects either a dict of columns or **kwargs")
+        columns = dict(columns, **kwargs)
+        self.columns = columns
+        checkers = [(name, series_checker(template)) for name, template in columns.items()]
+
+        def some_data_frame_validator(other):
+            if not isinstance(other, pd.DataFrame):
+                return False
+            for name, checker in checkers:
+                if name not in other.columns:
+                    return False
+                column = other[name]
+                if not isinstance(column, pd.Series):
+                    return False
+                if not checker(column):
+                    return False
+            return True
+
+        super().__init__(some_data_frame_validator)
+        self._signature = self.get_signature(**columns)
+
+
+def series_checker(template):
+    """
+    returns a function that is True if all values of a pandas Series equal the template
+    """
+    if type(template) is SomeOrNone and template.types is not None:
+        inner = [t for t in template.types if t is not type(None)]
+        if len(inner) == 1 and isinstance(inner[0], Some) and not isinstance(inner[0], SomeOrNone):
+            # SomeOrNone(matcher) is the matcher for all values that are not missing
+            return _nullable(series_checker(inner[0]))
+    if type(template) in (Some, SomeOrNone):
+        if template.types is None:
+            return _always
+        if all(type(t) is type for t in template.types):
+            return _type_checker(template.types)
+    if type(template) in (SomeStr, SomeEmail):
+        return _str_checker(template)
+    if type(template) is SomeIn and type(template.container) is range:
+        return _range_checker(template.container)
+    if type(template) is SomeIn and isinstance(template.container, _element_containers):
+        return _in_checker(template.container)
+    if template is None:
+        return lambda series: bool(series.isna().all())
+    if type(template) in _literal_types:
+        return lambda series: bool(series.notna().all() and series.eq(template).all())
+    return _value_checker(template)
+
+
+def _always(series):
+    return True
+
+
+def _nullable(checker):
+    def check(series):
+        missing = series.isna()
+        if missing.any():
+            series = series[~missing]
+        return checker(series)
+
+    return check
+
+
+def _python_type(dtype):
+    """
+    python type of the values of a column with this dtype or None if the values have to be looked at
+    """
+    import pandas as pd
+
+    if isinstance(dtype, pd.StringDtype):
+        return str
+    kind = getattr(dtype, "kind", "O")
+    if kind == "O" or isinstance(dtype, pd.CategoricalDtype):
+        return None
+    return {"b": bool, "i": int, "u": int, "f": float, "c": complex, "M": pd.Timestamp, "m": pd.Timedelta}.get(kind)
+
+
+def _type_checker(types):
+    allow_none = type(None) in types
+    types = tuple(t for t in types if t is not type(None))
+
+    def check(series):
+        missing = series.isna()
+        if missing.any():
+            if not allow_none:
+                return False
+            series = series[~missing]
+        if series.empty:
+            return True
+        python_type = _python_type(series.dtype)
+        if python_type is not None:
+            return issubclass(python_type, types)
+        return all(issubclass(t, types) for t in set(map(type, series.tolist())))
+
+    return check
+
+
+def _str_checker(template):
+    is_str = _type_checker((str,))
+
+    def check(series):
+        if not is_str(series):
+            return False
+        if series.empty:
+            return True
+        # all conditions must hold just like in SomeStr
+        if template.startswith is not None and not series.str.startswith(template.startswith).all():
+            return False
+        if template.endswith is not None and not series.str.endswith(template.endswith).all():
+            return False
+        for compiled in template.compiled:
+            if isinstance(compiled, re.Pattern):
+                matches = series.str.match(compiled)
+            else:
+                matches = functools.reduce(operator.or_, (series.str.match(p) for p in compiled.patterns))
+            if not matches.all():
+                return False
+        return True
+
+    return check
+
+
+def _in_checker(container):
+    values = list(container)
+
+    def check(series):
+        missing = series.isna()
+        if missing.any():
+            if None not in container:
+                return False
+            series = series[~missing]
+        return bool(series.isin(values).all())
+
+    return check
+
+
+def _range_checker(numbers):
+    from pysome.columnar import _in_range, range_contains
+
+    def check(series):
+        if series.isna().any():
+            return False
+        kind = getattr(series.dtype, "kind", "O")
+        if kind not in "biuf":
+            return all(_in_range(value, numbers) for value in series.tolist())
+        return range_contains(series.astype(int) if kind == "b" else series, numbers)
+
+    return check
+
+
+def _value_checker(template):
+    def check(series):
+        missing = series.isna().tolist()
+        return all(template == (None if na else value) for value, na in zip(series.tolist(), missing))
+
+    return check
@@ -0,0 +1,289 @@
+import re
+import struct
+import sys
+
+from pysome.Some import Some, SomeIn, SomeOrNone
+from pysome.columnar import column_checker, contains_same, range_contains
+from pysome.exceptions import InvalidArgument
+
+_format_item = re.compile(r"\s*(\d*)([xcbB?hHiIlLqQnNefdspP])")
+# struct codes that numpy can view without converting the values differently than struct does
+_numpy_codes = {"b": "i1", "B": "u1", "h": "i2", "H": "u2", "i": "i4", "I": "u4", "l": "i4", "L": "u4",
+                "q": "i8", "Q": "u8", "e": "f2", "f": "f4", "d": "f8", "?": "u1"}
+_element_containers = (set, frozenset, list, tuple, dict)
+
+
+def _parse_format(fmt):
+    """
+    splits a struct format into its byte order and one item per unpacked value (or pad byte)
+
+    examples:
+    >>> _parse_format("<2hx10s?")
+    ('<', ['h', 'h', 'x', '10s', '?'])
+    """
+    order = "@"
+    if fmt[:1] in ("@", "=", "<", ">", "!"):
+        order, fmt = fmt[0], fmt[1:]
+    items = []
+    pos = 0
+    while pos < len(fmt.rstrip()):
+        m = _format_item.match(fmt, pos)
+        if m is None:
+            raise InvalidArgument(f"invalid struct format {fmt!r}")
+        count, code = m.groups()
+        if code in "sp":
+            items.append(count + code)
+        else:
+            items.extend([code] * int(count or 1))
+        pos = m.end()
+    return order, items
+
+
+class SomeStruct(Some):
+    """
+    SomeStruct equals bytes like objects that contain one fixed-size binary record of the given `struct` format
+    (or numpy structured dtype) whose named fields equal the given templates. With `many=True` it equals buffers
+    of any number of such records (e.g. a mmapped capture file) that all match. Whole buffers are checked field by
+    field with vectorized numpy operations where possible, so no python objects are created per record.
+
+    examples:
+    >>> header = SomeStruct("<4sHI", names=("magic", "version", "size"), fields={"magic": b"PCAP", "version": 2})
+    >>> header == struct.pack("<4sHI", b"PCAP", 2, 1024)
+    True
+    >>> header == struct.pack("<4sHI", b"PCAP", 3, 1024)
+    False
+    >>> records = SomeStruct("<Id", names=("id", "value"), fields={"value": Some(float)}, many=True)
+    >>> records == struct.pack("<IdId", 1, 0.5, 2, 1.5)
+    True
+    """
+
+    def __init__(self, format, fields: dict = None, names=None, many: bool = False):
+        if fields is None:
+            fields = {}
+        if not isinstance(fields, dict):
+            raise InvalidArgument("fields must be a dict of field names and templates")
+        if isinstance(format, str):
+            try:
+                self.size = struct.calcsize(format)
+            except struct.error as e:
+                raise InvalidArgument(f"invalid struct format {format!r}: {e}")
+            order, items = _parse_format(format)
+            values = [item for item in items if item != "x"]
+            if names is None:
+                names = tuple(range(len(values)))
+            names = tuple(names)
+            if len(names) != len(values):
+                raise InvalidArgument(f"format {format!r} has {len(values)} fields but {len(names)} names are given")
+            self.struct = struct.Struct(format)
+            self.dtype = None
+        else:
+            import numpy as np
+
+            try:
+                dtype = np.dtype(format)
+            except TypeError:
+                raise InvalidArgument("format must be a struct format or a numpy structured dtype")
+            if dtype.names is None:
+                raise InvalidArgument("numpy dtypes must be structured dtypes with named fields")
+            if names is not None:
+                raise InvalidArgument("names are taken from the structured dtype")
+            names = dtype.names
+            self.size = dtype.itemsize
+            self.struct = None
+            self.dtype = dtype
+        unknown = [name for name in fields if name not in names]
+        if unknown:
+            raise InvalidArgument(f"unknown fields {', '.join(map(str, unknown))}")
+        self.format = format
+        self.names = names
+        self.fields = fields
+        self.many = many
+        # layout of whole buffers as numpy dtype with the numpy field name of every name
+        self._array_dtype = None
+        self._array_fields = {}
+        self._bool_fields = set()
+        if self.dtype is not None:
+            self._array_dtype = self.dtype
+            self._array_fields = {name: name for name in names}
+        else:
+            self._array_dtype = _numpy_view(order, items)
+            self._array_fields = {name: f"f{i}" for i, name in enumerate(names)}
+            self._bool_fields = {name for name, item in zip(names, values) if item == "?"}
+        if self._array_dtype is not None:
+            self._checkers = {name: _array_checker(template) for name, template in fields.items()}
+        else:
+            self._checkers = {name: column_checker(template) for name, template in fields.items()}
+
+        def some_struct_validator(other):
+            if isinstance(other, str):
+                return False
+            try:
+                view = memoryview(other)
+            except TypeError:
+                return False
+            with view:
+                if not view.c_contiguous:
+                    view = memoryview(view.tobytes())
+                elif view.format != "B" or view.ndim != 1:
+                    view = view.cast("B")
+                with view:
+                    if many:
+                        return view.nbytes % self.size == 0 and self.check_buffer(view)
+                    return view.nbytes == self.size and self.check_record(view)
+
+        super().__init__(some_struct_validator)
+        kwargs = {}
+        if names != tuple(range(len(names))):
+            kwargs["names"] = names
+        if fields:
+            kwargs["fields"] = "{" + ", ".join(f"{name}: {template}" for name, template in fields.items()) + "}"
+        if many:
+            kwargs["many"] = many
+        self._signature = self.get_signature(format, **kwargs)
+
+    def unpack(self, buffer) -> dict:
+        """
+        unpacks a single record into a dict of its named fields
+        """
+        if self.struct is not None:
+            return dict(zip(self.names, self.struct.unpack_from(buffer)))
+        import numpy as np
+
+        return dict(zip(self.names, np.frombuffer(buffer, self.dtype, count=1).tolist()[0]))
+
+    def check_record(self, buffer) -> bool:
+        record = self.unpack(buffer)
+        for name, template in self.fields.items():
+            if not record[name] == template:
+                return False
+        return True
+
+    def check_buffer(self, buffer) -> bool:
+        """
+        True if the buffer consists of records that all match. The buffer length must be a multiple of the record
+        size.
+        """
+        if contains_same(self.fields):
+            # Same compares values across records so every record is checked in order
+            return all(self.check_record(buffer[i:i + self.size]) for i in range(0, len(buffer), self.size))
+        if self._array_dtype is not None:
+            import numpy as np
+
+            array = np.frombuffer(buffer, self._array_dtype)
+            for name in self.fields:
+                column = array[self._array_fields[name]]
+                if name in self._bool_fields:
+                    # struct unpacks every non zero byte as True
+                    column = column != 0
+                if not self._checkers[name](column):
+                    return False
+            return True
+        columns = dict(zip(self.names, zip(*self.struct.iter_unpack(buffer))))
+        for name in self.fields:
+            if not self._checkers[name](list(columns.get(name, ()))):
+                return False
+        return True
+
+
+def _numpy_view(order, items):
+    """
+    numpy dtype with the same layout as the struct format (fields f0, f1, ...) or None if numpy is not installed or
+    the format contains fields numpy would convert differently (e.g. strings)
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    if any(item != "x" and item not in _numpy_codes for item in items):
+        return None
+    if order == "@":
+        byteorder = "="
+    elif order == "!":
+        byteorder = ">"
+    elif order == "=":
+        byteorder = "<" if sys.byteorder == "little" else ">"
+    else:
+        byteorder = order
+    formats, offsets = [], []
+    prefix = ""
+    for item in items:
+        offset = struct.calcsize(order + prefix + item) - struct.calcsize(order + item)
+        prefix += item
+        if item == "x":
+            continue
+        offsets.append(offset)
+        if order == "@":
+            # native sizes are the sizes of the C types that numpy uses for the same codes
+            formats.append(np.dtype("B" if item == "?" else item))
+        else:
+            formats.append(np.dtype(byteorder + _numpy_codes[item]))
+    return np.dtype({"names": [f"f{i}" for i in range(len(formats))], "formats": formats, "offsets": offsets,
+                     "itemsize": struct.calcsize(order + prefix)})
+
+
+def _array_checker(template):
+    """
+    returns a function that is True if all values of a 1-dimensional numpy array equal the template
+    """
+    fallback = column_checker(template)
+
+    def values(column):
+        return fallback(column.tolist())
+
+    if type(template) in (Some, SomeOrNone):
+        if template.types is None:
+            return _always
+        if all(type(t) is type for t in template.types):
+            types = tuple(template.types)
+
+            def check_type(column):
+                python_type = _python_types.get(column.dtype.kind)
+                if python_type is None or column.ndim != 1:
+                    return values(column)
+                return len(column) == 0 or issubclass(python_type, types)
+
+            return check_type
+    if type(template) in (int, float, bool):
+        def check_literal(column):
+            if column.dtype.kind not in "biuf" or column.ndim != 1:
+                return values(column)
+            return bool((_widened(column) == template).all())
+
+        return check_literal
+    if type(template) is SomeIn and type(template.container) is range:
+        numbers = template.container
+
+        def check_range(column):
+            if column.dtype.kind not in "biuf" or column.ndim != 1:
+                return values(column)
+            return range_contains(_widened(column), numbers)
+
+        return check_range
+    if type(template) is SomeIn and isinstance(template.container, _element_containers) \
+            and all(type(value) in (int, float, bool) for value in template.container):
+        import numpy as np
+
+        container = list(template.container)
+
+        def check_in(column):
+            if column.dtype.kind not in "biuf" or column.ndim != 1:
+                return values(column)
+            return bool(np.isin(_widened(column), container).all())
+
+        return check_in
+    return values
+
+
+def _widened(column):
+    # struct unpacks float32 and float16 to python floats, numpy would compare them with the literal cast to the
+    # smaller type (so 0.1 would equal float32(0.1))
+    if column.dtype.kind == "f" and column.dtype.itemsize < 8:
+        return column.astype("float64")
+    return column
+
+
+_python_types = {"b": bool, "i": int, "u": int, "f": float, "c": complex, "S": bytes, "U": str}
+
+
+def _always(column):
+    return True
@@ -1,3 +1,52 @@
-from pysome.Some import *
-from pysome.Same import *
-from pysome.expect import expect
+"""
+pysome loads its modules lazily: `import pysome` only sets up this table and every name is imported from its
+module on first access, so short-lived processes only pay for the matchers they actually use.
+"""
+import importlib
+import sys
+
+# public names and the modules that define them
+_exports = {
+    **dict.fromkeys(("Some", "AllOf", "SomeOrNone", "SomeIterable", "SomeList", "SomeDict", "SomeMapping", "SomeIn",
+                     "SomeWithLen", "NotSome", "SomeStr", "SomeEmail", "SomeUuid", "SomeBytes", "SomeObject",
+                     "SomeOneOf", "no_attribute", "attribute_getter", "has_len", "is_in", "is_not", "is_email",
+                     "is_uuid", "one_of"), "pysome.Some"),
+    **dict.fromkeys(("Same", "NotSame", "is_same", "is_unique"), "pysome.Same"),
+    **dict.fromkeys(("SameState", "default_name", "LocalState", "SharedState", "MergeableState"), "pysome.SameState"),
+    **dict.fromkeys(("PySomeException", "MustReturnBool", "ExpectException", "InvalidArgument", "InvalidFunction",
+                     "SameOutsideExpect", "BudgetExceeded"), "pysome.exceptions"),
+    "Budget": "pysome.budget",
+    "SomeArray": "pysome.SomeArray",
+    "SomeDataFrame": "pysome.SomeDataFrame",
+    "SomeStruct": "pysome.SomeStruct",
+    "expect": "pysome.expect",
+    **dict.fromkeys(("infer", "Schema"), "pysome.infer"),
+    **dict.fromkeys(("generate", "DataGenerator"), "pysome.generate"),
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(type(sys)):
+    def __setattr__(self, name, value):
+        # importing a submodule binds it to the package, but names like `pysome.Some` or `pysome.expect` refer to
+        # the class or function of the same name (the submodules stay available in sys.modules)
+        if name in _exports and isinstance(value, type(sys)):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,5 @@
+import sys
+
+from pysome.cli import main
+
+sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+evaluation budgets that bound the cost of a single comparison no matter what data is compared
+"""
+from __future__ import annotations
+
+from time import monotonic
+
+from pysome.exceptions import BudgetExceeded, InvalidArgument
+
+
+class Budget:
+    """
+    Budget limits a single evaluation of `expect(..., budget=...)` or `does(..., budget=...)`:
+        max_nodes:   number of matchers that are compared
+        max_items:   number of items of a single iterable (or mapping) a matcher iterates over
+        max_str_len: length of strings (or bytes) that are matched by a regex
+        deadline:    seconds an evaluation may take, checked before every matcher and item
+    If a limit is exceeded the evaluation stops with `BudgetExceeded`. The deadline is checked cooperatively, so a
+    single regex or validator function is not interrupted (that is what max_str_len is for).
+
+    examples:
+    >>> from pysome import Budget, Some, SomeList, expect
+    >>> _ = expect([1, 2, 3], budget=Budget(max_items=3)).to_be(SomeList(Some(int)))
+    >>> expect(list(range(100)), budget=Budget(max_items=10)).to_be(SomeList(Some(int)))
+    Traceback (most recent call last):
+    ...
+    pysome.exceptions.BudgetExceeded: iterable has more than 10 items
+    """
+    # the budget of the running evaluation (if any), matchers only pay for a budget if there is one
+    active = None
+
+    def __init__(self, max_nodes: int = None, max_items: int = None, max_str_len: int = None,
+                 deadline: float = None):
+        for name, value in (("max_nodes", max_nodes), ("max_items", max_items), ("max_str_len", max_str_len)):
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+                raise InvalidArgument(f"{name} must be an int >= 0 or None")
+        if deadline is not None and (not isinstance(deadline, (int, float)) or isinstance(deadline, bool)
+                                     or deadline <= 0):
+            raise InvalidArgument("deadline must be a number of seconds > 0 or None")
+        self.max_nodes = max_nodes
+        self.max_items = max_items
+        self.max_str_len = max_str_len
+        self.deadline = deadline
+        # usage of the current (or last) evaluation
+        self.nodes = 0
+        self._deadline_at = None
+
+    def _start(self):
+        """
+        starts an evaluation with this budget and returns the budget that was active before
+        """
+        previous = Budget.active
+        self.nodes = 0
+        self._deadline_at = None if self.deadline is None else monotonic() + self.deadline
+        Budget.active = self
+        return previous
+
+    def visit(self):
+        """
+        counts a compared matcher
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise BudgetExceeded(f"more than {self.max_nodes} nodes were compared")
+        if self._deadline_at is not None and monotonic() > self._deadline_at:
+            raise BudgetExceeded(f"evaluation took longer than {self.deadline}s")
+
+    def items(self, iterable):
+        """
+        returns the iterable or a generator over it that stops the evaluation after max_items items or the deadline
+        """
+        max_items = self.max_items
+        if max_items is not None and hasattr(iterable, "__len__") and len(iterable) > max_items:
+            raise BudgetExceeded(f"iterable has more than {max_items} items")
+        if max_items is None and self._deadline_at is None:
+            return iterable
+        return self._counted(iterable)
+
+    def _counted(self, iterable):
+        max_items = self.max_items
+        deadline_at = self._deadline_at
+        for i, item in enumerate(iterable):
+            if max_items is not None and i >= max_items:
+                raise BudgetExceeded(f"iterable has more than {max_items} items")
+            if deadline_at is not None and monotonic() > deadline_at:
+                raise BudgetExceeded(f"evaluation took longer than {self.deadline}s")
+            yield item
+
+    def string(self, value):
+        """
+        checks the length of a string (or bytes) before it is matched by a regex
+        """
+        if self.max_str_len is not None and len(value) > self.max_str_len:
+            raise BudgetExceeded(f"string of length {len(value)} is longer than {self.max_str_len}")
+
+    def __repr__(self):
+        limits = [f"{name}={getattr(self, name)}" for name in ("max_nodes", "max_items", "max_str_len", "deadline")
+                  if getattr(self, name) is not None]
+        return f"Budget({', '.join(limits)})"
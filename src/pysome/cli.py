@@ -0,0 +1,385 @@
+"""
+command line interface of pysome
+
+    $ python -m pysome validate my_project.templates:USER events.ndjson --workers 4 --max-errors 100
+"""
+import argparse
+import importlib
+import json
+import mmap
+import os
+import sys
+import time
+
+from pysome.exceptions import InvalidArgument
+from pysome.expect import does
+from pysome.report import Report
+from pysome.SameState import MergeableState, SameState, SharedState
+from pysome.walk import Failure, find_failures, format_path
+
+
+def load_template(spec: str):
+    """
+    loads a template from a '<module>:<attribute>' specification like 'my_project.templates:USER'
+    """
+    module_name, sep, attr = spec.partition(":")
+    if not sep or not module_name or not attr:
+        raise InvalidArgument(f"template must be given as '<module>:<attribute>' but is '{spec}'")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+_templates = {}
+
+
+def _cached_template(spec: str):
+    if spec not in _templates:
+        _templates[spec] = load_template(spec)
+    return _templates[spec]
+
+
+def split_file(path: str, parts: int) -> list:
+    """
+    splits a file into at most `parts` byte ranges (start, end) that all begin at the start of a line
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, bounds[-1]))
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_lines(buffer, start: int, end: int):
+    """
+    yields all non empty lines of the buffer (bytes or mmap) between start and end without the line break
+    """
+    pos = start
+    while pos < end:
+        nl = buffer.find(b"\n", pos, end)
+        if nl == -1:
+            nl = end
+        line = buffer[pos:nl]
+        pos = nl + 1
+        if line.strip():
+            yield line
+
+
+class _InvalidJson:
+    def __repr__(self):
+        return "<valid JSON>"
+
+
+invalid_json = _InvalidJson()
+
+
+_failed_counter = None
+
+
+def _init_worker(counter):
+    global _failed_counter
+    _failed_counter = counter
+
+
+def _count_failure(max_errors):
+    """
+    counts a failed record against the error limit shared by all workers and returns True if validation must stop
+    """
+    if max_errors is None or _failed_counter is None:
+        return False
+    with _failed_counter.get_lock():
+        _failed_counter.value += 1
+        return _failed_counter.value >= max_errors
+
+
+def _limit_reached(max_errors):
+    return max_errors is not None and _failed_counter is not None and _failed_counter.value >= max_errors
+
+
+def validate_range(template_spec: str, path: str, start: int, end: int, max_errors=None, same_state=None) -> Report:
+    """
+    validates all records of the file between the byte offsets start and end against the template. `same_state` is
+    the backend of `Same` and `NotSame` (see `SameState.use`), by default their values only live for one record.
+    """
+    template = _cached_template(template_spec)
+
+    report = Report()
+    if isinstance(same_state, MergeableState):
+        report.same_state = same_state
+    if start >= end:
+        return report
+    previous = SameState.use(same_state)
+    try:
+        _validate_lines(report, template, path, start, end, max_errors, SameState.backend.persistent)
+    finally:
+        SameState.use(previous)
+    return report
+
+
+def _validate_lines(report, template, path, start, end, max_errors, persistent):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in iter_lines(mm, start, end):
+            if _limit_reached(max_errors):
+                break
+            if not validate_line(report, template, line, persistent) and _count_failure(max_errors):
+                break
+
+
+def validate_line(report: Report, template, line: bytes, persistent: bool = False) -> bool:
+    """
+    validates one NDJSON line against the template, adds it to the report and returns True if it equals
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return report.add_failures([Failure((), invalid_json, line[:80])])
+    # persistent Same/NotSame values must only see every record once, so there is no fast path
+    if not persistent and does(record).equal(template):
+        return report.add_failures(())
+    return report.add_failures(find_failures(record, template))
+
+
+same_modes = ("record", "shared", "merge")
+
+
+def validate_file(template_spec: str, path: str, workers: int = 1, max_errors=None, same: str = "record") -> Report:
+    """
+    validates every line of a NDJSON file against the template, optionally split over multiple processes.
+    `same` sets the scope of `Same` and `NotSame`: "record" compares the values of each record on its own, "shared"
+    compares all records through a `SharedState` and "merge" validates every part with its own `MergeableState`
+    and reports values that conflict between the parts in `Report.conflicts`.
+    """
+    import multiprocessing
+
+    if same not in same_modes:
+        raise InvalidArgument(f"same must be one of {', '.join(same_modes)} but is '{same}'")
+    ranges = split_file(path, max(workers, 1))
+    counter = multiprocessing.Value("q", 0)
+    shared = SharedState() if same == "shared" else None
+
+    def same_state():
+        return MergeableState() if same == "merge" else shared
+
+    try:
+        if workers <= 1 or len(ranges) <= 1:
+            _init_worker(counter)
+            try:
+                return validate_range(template_spec, path, 0, os.path.getsize(path), max_errors, same_state())
+            finally:
+                _init_worker(None)
+
+        with multiprocessing.Pool(len(ranges), initializer=_init_worker, initargs=(counter,)) as pool:
+            results = pool.starmap(validate_range, [(template_spec, path, start, end, max_errors, same_state())
+                                                    for start, end in ranges])
+    finally:
+        if shared is not None:
+            shared.shutdown()
+    report = Report()
+    for result in results:
+        report.merge(result)
+    return report
+
+
+def print_report(report: Report, seconds: float, size: int, stopped: bool, file=None):
+    seconds = max(seconds, 1e-9)
+    print(report, file=file)
+    print(f"time:    {seconds:.3f}s", file=file)
+    print(f"speed:   {report.records / seconds:,.0f} records/s, {size / seconds / 2 ** 20:,.1f} MiB/s", file=file)
+    if stopped:
+        print("stopped early because the error limit was reached", file=file)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m pysome", description="validate data against pysome templates")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    validate = commands.add_parser("validate", help="validate every line of a NDJSON file against a template")
+    validate.add_argument("template", help="template given as '<module>:<attribute>'")
+    validate.add_argument("file", help="NDJSON file with one JSON document per line")
+    validate.add_argument("--workers", type=int, default=1, help="number of processes (default: 1)")
+    validate.add_argument("--fail-fast", action="store_true", help="stop at the first failing record")
+    validate.add_argument("--max-errors", type=int, default=None, help="stop after this many failing records")
+    validate.add_argument("--same", choices=same_modes, default="record",
+                          help="scope of Same and NotSame: each record on its own, all records through a shared "
+                               "state or per worker with conflicts merged at the end (default: record)")
+
+    document = commands.add_parser("validate-document",
+                                   help="validate a single (huge) JSON document and only parse what the template uses")
+    document.add_argument("template", help="template given as '<module>:<attribute>'")
+    document.add_argument("file", help="file with one JSON document")
+    document.add_argument("--max-errors", type=int, default=20, help="number of failures to print (default: 20)")
+
+    infer = commands.add_parser("infer", help="infer a template from the records of a NDJSON file")
+    infer.add_argument("file", help="NDJSON file with one JSON document per line")
+    infer.add_argument("--name", default="TEMPLATE", help="name of the template in the source (default: TEMPLATE)")
+    infer.add_argument("--max-values", type=int, default=10,
+                       help="largest set of repeated values that becomes a SomeIn (default: 10)")
+    infer.add_argument("--max-keys", type=int, default=100,
+                       help="dicts with more keys are inferred as SomeMapping.each (default: 100)")
+
+    generate = commands.add_parser("generate", help="write random records that equal a template as NDJSON")
+    generate.add_argument("template", help="template given as '<module>:<attribute>'")
+    generate.add_argument("--count", type=int, default=1000, help="number of records (default: 1000)")
+    generate.add_argument("--seed", type=int, default=None, help="seed for reproducible records")
+    generate.add_argument("--output", default=None, help="NDJSON file to write (default: stdout)")
+
+    follow = commands.add_parser("follow", help="validate the lines that are appended to a NDJSON file (like tail -F)")
+    follow.add_argument("template", help="template given as '<module>:<attribute>'")
+    follow.add_argument("file", help="NDJSON file that is appended to, may be rotated or truncated")
+    follow.add_argument("--state", default=None, help="file to checkpoint the offset to, to resume after a restart")
+    follow.add_argument("--interval", type=float, default=10.0,
+                        help="seconds between printing the failures and checkpointing (default: 10)")
+    follow.add_argument("--from-start", action="store_true",
+                        help="validate the lines that are already in the file if there is no checkpoint")
+    follow.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    return parser
+
+
+def follow_file(template_spec: str, path: str, state=None, interval: float = 10.0, from_start=False,
+                duration=None) -> int:
+    """
+    validates the lines that are appended to a file until it is interrupted (or for duration seconds)
+    """
+    from pysome.follow import Follower
+
+    with Follower(_cached_template(template_spec), path, state_file=state, interval=interval,
+                  from_start=from_start) as follower:
+        try:
+            follower.run(duration=duration)
+        except KeyboardInterrupt:
+            pass
+    return 1 if follower.total.failed else 0
+
+
+def generate_file(template_spec: str, count: int, output=None, seed=None, file=None) -> int:
+    """
+    writes count records that equal the template to the output file (or stdout) and prints the throughput
+    """
+    from pysome.generate import DataGenerator
+
+    generator = DataGenerator(_cached_template(template_spec), seed=seed)
+    start = time.perf_counter()
+    size = generator.write_ndjson(output if output is not None else sys.stdout, count)
+    seconds = max(time.perf_counter() - start, 1e-9)
+    if output is not None:
+        print(f"records: {count}", file=file)
+        print(f"time:    {seconds:.3f}s", file=file)
+        print(f"speed:   {count / seconds:,.0f} records/s, {size / seconds / 2 ** 20:,.1f} MiB/s", file=file)
+    return 0
+
+
+def infer_file(path: str, name: str = "TEMPLATE", max_values: int = 10, max_keys: int = 100, file=None) -> int:
+    """
+    prints the source of a template inferred from all records of a NDJSON file, the records are read one by one
+    """
+    from pysome.infer import Schema
+
+    schema = Schema(max_values=max_values, max_keys=max_keys)
+    invalid = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                invalid += 1
+                continue
+            schema.add(record)
+    print(f"# inferred from {schema.records} records", file=file)
+    if invalid:
+        print(f"# skipped {invalid} lines that are not valid JSON", file=file)
+    print(schema.source(name), file=file)
+    return 0
+
+
+def validate_document(template_spec: str, path: str, max_errors: int = 20, file=None) -> int:
+    """
+    validates a single JSON document that is parsed lazily so only the projected values are materialized
+    """
+    from pysome.projection import load
+
+    template = _cached_template(template_spec)
+    start = time.perf_counter()
+    document = load(path, template)
+    failures = find_failures(document, template)
+    seconds = max(time.perf_counter() - start, 1e-9)
+
+    size = os.path.getsize(path)
+    print(f"failed:     {len(failures)} paths", file=file)
+    print(f"time:       {seconds:.3f}s", file=file)
+    print(f"throughput: {size / seconds / 2 ** 20:,.1f} MiB/s", file=file)
+    for failure in failures[:max_errors]:
+        value = repr(failure.value)
+        if len(value) > 60:
+            value = value[:57] + "..."
+        print(f"  {format_path(failure.path)}: {value} does not equal {failure.template}", file=file)
+    if len(failures) > max_errors:
+        print(f"  ... and {len(failures) - max_errors} more", file=file)
+    return 1 if failures else 0
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "infer":
+        try:
+            return infer_file(args.file, name=args.name, max_values=args.max_values, max_keys=args.max_keys)
+        except InvalidArgument as e:
+            parser.error(str(e))
+
+    if args.command == "follow":
+        if args.interval <= 0:
+            parser.error("--interval must be > 0")
+        try:
+            _cached_template(args.template)
+        except (InvalidArgument, ImportError, AttributeError) as e:
+            parser.error(f"could not load template '{args.template}': {e}")
+        return follow_file(args.template, args.file, state=args.state, interval=args.interval,
+                           from_start=args.from_start, duration=args.duration)
+
+    if args.command == "generate":
+        if args.count < 0:
+            parser.error("--count must be at least 0")
+        try:
+            _cached_template(args.template)
+            return generate_file(args.template, args.count, output=args.output, seed=args.seed)
+        except (InvalidArgument, ImportError, AttributeError) as e:
+            parser.error(f"could not generate records of '{args.template}': {e}")
+
+    if args.command == "validate-document":
+        try:
+            _cached_template(args.template)
+        except (InvalidArgument, ImportError, AttributeError) as e:
+            parser.error(f"could not load template '{args.template}': {e}")
+        return validate_document(args.template, args.file, max_errors=args.max_errors)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    max_errors = 1 if args.fail_fast else args.max_errors
+    if max_errors is not None and max_errors < 1:
+        parser.error("--max-errors must be at least 1")
+    try:
+        _cached_template(args.template)
+    except (InvalidArgument, ImportError, AttributeError) as e:
+        parser.error(f"could not load template '{args.template}': {e}")
+
+    start = time.perf_counter()
+    report = validate_file(args.template, args.file, workers=args.workers, max_errors=max_errors, same=args.same)
+    seconds = time.perf_counter() - start
+    stopped = max_errors is not None and report.failed >= max_errors
+    print_report(report, seconds, os.path.getsize(args.file), stopped)
+    return 1 if report.failed or report.conflicts else 0
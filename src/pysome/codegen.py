@@ -0,0 +1,559 @@
+"""
+code generating backend that turns a template into a specialized python function
+
+Instead of evaluating a template through `Some.__eq__`, validator closures and nested `==` calls, the template is
+translated once into python source with inline type checks (`type(x) is int`), direct dict lookups, unrolled dict
+checks and plain `for` loops for `SomeIterable`. The source is compiled into a single function that is cached per
+template. Matchers without a specialized translation (e.g. `NotSome` or user defined subclasses) are compared
+with `==` like before.
+
+The generated function gives the same result (or raises the same exception) as the interpreted path in a single
+evaluation. If it returns False, `expect` only repeats the comparison on the interpreted path to add the error
+messages. The results of the validator functions (e.g. `Some(lambda x: ...)`) the generated code called are
+recorded and replayed (see `pysome.Some._Recording`), so every function is called once per value like on the
+interpreted path. The backend is selected with `set_backend` or the environment variable `PYSOME_BACKEND`, the
+default is "auto". It interprets a template until it was used `compile_after` times and only then compiles it, so
+templates that are only used a few times never pay for the code generation.
+
+Prepared templates are kept in a bounded LRU cache. Literals and common matchers like `Some(int)`, `SomeList` or
+`SomeDict` are looked up by their structure, so a template that is rebuilt on every call finds the function of an
+equal template. Other matchers are looked up by identity and are only weakly referenced until they are compiled (a
+compiled function refers to its matchers). Literals may be changed between two uses, an entry keeps a copy of the
+literals it was created from. Matchers must not be changed after they were used.
+"""
+from __future__ import annotations
+
+import os
+from collections import OrderedDict, namedtuple
+
+from pysome.Some import (AllOf, Some, SomeDict, SomeIn, SomeIterable, SomeList, SomeMapping, SomeOneOf, SomeOrNone,
+                         SomeStr, _call)
+from pysome.exceptions import InvalidArgument, MustReturnBool
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+backends = ("auto", "interpreted", "codegen")
+
+_backend = os.environ.get("PYSOME_BACKEND", "auto")
+if _backend not in backends:
+    raise InvalidArgument(f"PYSOME_BACKEND must be one of {', '.join(backends)} but is {_backend!r}")
+
+# types whose __eq__ returns NotImplemented for matchers so `value == matcher` is decided by the matcher
+_plain_types = frozenset((int, float, complex, str, bytes, bool, type(None), list, tuple, dict, set, frozenset))
+_scalar_types = frozenset((int, float, complex, str, bytes, bool, type(None)))
+# deeper templates are split into several functions to stay below the nesting limits of the compiler
+_max_depth = 12
+# number of uses after which the auto backend compiles a template, compiling costs about as much as interpreting
+# a template 100 to 200 times
+compile_after = 100
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+_missing = _Missing()
+
+
+def set_backend(name: str):
+    """
+    selects the backend `expect` uses: "auto" (the default, compiles templates that are used often), "interpreted"
+    (never compiles templates) or "codegen" (compiles every template)
+    """
+    global _backend
+    if name not in backends:
+        raise InvalidArgument(f"backend must be one of {', '.join(backends)} but is {name!r}")
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def compile_template(template: Any) -> Callable[[Any], bool]:
+    """
+    returns a function that is True if data equals the template and False otherwise. Functions are cached (see
+    `cache_info`), matchers must not be changed after they were compiled. The generated code is available as the
+    `source` attribute of the function.
+
+    examples:
+    >>> check = compile_template({"id": Some(int), "tags": SomeList(Some(str))})
+    >>> check({"id": 1, "tags": ["a", "b"]})
+    True
+    >>> check({"id": 1, "tags": ["a", 2]})
+    False
+    >>> print(compile_template(Some(int, float)).source)
+    def _check1(x):
+        if not isinstance(x, _c2):
+            return False
+        return True
+    """
+    return _cache.prepare(template, 1)
+
+
+def prepare(template: Any) -> Callable[[Any], bool] | None:
+    """
+    the compiled function of the template for the current backend or None if it should be interpreted
+    """
+    if _backend == "interpreted":
+        return None
+    return _cache.prepare(template, 1 if _backend == "codegen" else compile_after)
+
+
+def cache_info() -> CacheInfo:
+    """
+    statistics of the cache of prepared templates, the number of lookups that found (hits) or did not find (misses)
+    a prepared template, the maximum and the current number of templates
+
+    examples:
+    >>> cache_clear()
+    >>> template = SomeList(Some(int))
+    >>> _ = compile_template(template), compile_template(template), compile_template([1, 2]), compile_template([1, 2])
+    >>> cache_info()
+    CacheInfo(hits=2, misses=2, maxsize=256, currsize=2)
+    """
+    return CacheInfo(_cache.hits, _cache.misses, _cache.maxsize, len(_cache.entries))
+
+
+def cache_clear():
+    """
+    removes all prepared templates and resets the statistics
+    """
+    _cache.clear()
+
+
+def set_cache_size(maxsize: int):
+    """
+    sets the maximum number of prepared templates, the least recently used ones are removed first
+    """
+    if not isinstance(maxsize, int) or isinstance(maxsize, bool) or maxsize < 1:
+        raise InvalidArgument("maxsize must be an int >= 1")
+    _cache.maxsize = maxsize
+    _cache.shrink()
+
+
+class _Entry:
+    __slots__ = ("uses", "function", "template")
+
+    def __init__(self, template):
+        self.uses = 0
+        self.function = None
+        # the template (or a weak reference to it), it keeps the matchers of a structural key alive so their ids
+        # are not reused while the entry exists
+        self.template = template
+
+
+class _TemplateCache:
+    """
+    LRU cache of prepared templates. An entry counts the uses of its template and holds its compiled function once
+    it was used `threshold` times.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        # id of a template with a structural key -> (template, key)
+        self.aliases = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, template, threshold):
+        # the structure of a matcher that is used again is not computed again, literals (dicts and lists) may have
+        # been changed in place since they were used, so their key is always computed
+        alias = self.aliases.get(id(template))
+        if alias is not None and alias[0] is template:
+            key = alias[1]
+            alias = None
+        else:
+            key = _key(template)
+            alias = template if type(key) is not int and isinstance(template, Some) else None
+        try:
+            entry = self.entries.get(key)
+        except TypeError:
+            # e.g. a set in a literal, such templates are not cached
+            self.misses += 1
+            return _Generator().generate(template) if threshold <= 1 else None
+        if entry is None:
+            self.misses += 1
+            entry = self.add(key, template if type(key) is int else _copy_literals(template))
+            # only the template of an entry gets an alias, an equal template that is rebuilt on every call would
+            # only fill the aliases
+            if alias is not None:
+                self.aliases[id(template)] = (template, key)
+                if len(self.aliases) > self.maxsize:
+                    self.aliases.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        if entry.function is None:
+            entry.uses += 1
+            if entry.uses >= threshold:
+                # the copy of a structural key does not change with the template it was made from
+                entry.function = _Generator().generate(template if type(key) is int else entry.template)
+        return entry.function
+
+    def add(self, key, template):
+        if type(key) is int:
+            import weakref
+
+            # matchers are removed when they are garbage collected, so their id can not be reused by another one
+            def remove(_, entries=self.entries):
+                entries.pop(key, None)
+
+            try:
+                template = weakref.ref(template, remove)
+            except TypeError:
+                pass
+        entry = self.entries[key] = _Entry(template)
+        self.shrink()
+        return entry
+
+    def shrink(self):
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.aliases.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_cache = _TemplateCache()
+
+
+def _key(template):
+    """
+    the cache key of a template: the structure of literals and common matchers or the id of other matchers. The key
+    is not hashable if the template contains unhashable values.
+    """
+    t = type(template)
+    if t is dict:
+        return "dict", tuple([(type(key), key, (type(value), value) if type(value) in _scalar_types else _key(value))
+                              for key, value in template.items()])
+    if t is list or t is tuple:
+        return t, tuple([(type(value), value) if type(value) in _scalar_types else _key(value) for value in template])
+    if t in _plain_types:
+        return t, template
+    if (t is Some or t is SomeOrNone) and not template.adaptive:
+        # e.g. Some(int) or SomeOrNone(str) that are often created inline
+        types = template.types
+        if types is None:
+            return t, None
+        for arg in types:
+            if type(arg) is not type:
+                return id(template)
+        return t, tuple(types)
+    if t is SomeList or t is SomeIterable:
+        return t, _key(template.arg), template.length, template.is_type, template.columnar
+    if t is SomeDict:
+        return t, _key(template.partial_dict), template.extra, template.required
+    return id(template)
+
+
+def _copy_literals(template):
+    """
+    copy of the dicts, lists and tuples of a template, matchers and other values are not copied
+    """
+    t = type(template)
+    if t is dict:
+        return {key: _copy_literals(value) for key, value in template.items()}
+    if t is list or t is tuple:
+        return t([_copy_literals(value) for value in template])
+    return template
+
+
+def _checked(result):
+    if not isinstance(result, bool):
+        raise MustReturnBool(f"validator function must return bool (True or False) but returned {result} of type "
+                             f"{type(result)} instead")
+    return result
+
+
+class _Generator:
+    """
+    translates a template into python source. Every check is emitted as statements that `return False` if the
+    value of a variable does not equal the template.
+    """
+    count = 0
+
+    def __init__(self):
+        self.namespace = {"_plain_types": _plain_types, "_missing": _missing, "_checked": _checked, "_call": _call}
+        self.functions = []
+        self.tables = []
+        self.names = 0
+
+    def generate(self, template):
+        name = self.function(template)
+        source = "\n\n".join(reversed(self.functions))
+        _Generator.count += 1
+        filename = f"<pysome template {_Generator.count}>"
+        exec(compile(source, filename, "exec"), self.namespace)
+        # SomeOneOf dispatch tables refer to functions that only exist after exec
+        for table, variants in self.tables:
+            self.namespace[table].update((tag, self.namespace[function]) for tag, function in variants.items())
+        # makes the generated code visible in tracebacks and debuggers
+        import linecache
+
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        function = self.namespace[name]
+        function.source = source
+        return function
+
+    def name(self, prefix):
+        self.names += 1
+        return f"{prefix}{self.names}"
+
+    def constant(self, value):
+        name = self.name("_c")
+        self.namespace[name] = value
+        return name
+
+    def key(self, key):
+        if type(key) in (str, int):
+            return repr(key)
+        return self.constant(key)
+
+    def function(self, template, data_left=False):
+        name = self.name("_check")
+        lines = [f"def {name}(x):"]
+        self.statements(template, "x", lines, 1, data_left)
+        lines.append("    return True")
+        self.functions.append("\n".join(lines))
+        return name
+
+    def statements(self, template, var, lines, depth, data_left=False):
+        """
+        emits the check of `template == var` (or `var == template` if data_left) at the given indentation
+        """
+        pad = "    " * depth
+        if depth > _max_depth:
+            lines.append(f"{pad}if not {self.function(template, data_left)}({var}):")
+            lines.append(f"{pad}    return False")
+            return
+        if isinstance(template, Some):
+            if data_left:
+                # other objects may compare themselves to a matcher with their own __eq__
+                body = []
+                self.matcher(template, var, body, depth + 1)
+                if not body:
+                    lines.append(f"{pad}if type({var}) not in _plain_types and not {var} == {self.constant(template)}:")
+                    lines.append(f"{pad}    return False")
+                    return
+                self.delegate(template, var, f"type({var}) not in _plain_types", lines, depth, data_left)
+                lines.extend(body)
+                return
+            self.matcher(template, var, lines, depth)
+        elif type(template) is dict:
+            self.dict_literal(template, var, lines, depth, data_left)
+        elif type(template) in (list, tuple):
+            self.sequence_literal(template, var, lines, depth, data_left)
+        else:
+            c = self.constant(template)
+            self.fail(f"not {var} == {c}" if data_left else f"not {c} == {var}", lines, depth)
+
+    @staticmethod
+    def fail(condition, lines, depth):
+        pad = "    " * depth
+        lines.append(f"{pad}if {condition}:")
+        lines.append(f"{pad}    return False")
+
+    @staticmethod
+    def close(lines, start, depth):
+        """
+        makes sure the block that started at `start` is not empty
+        """
+        if len(lines) == start:
+            lines.append(f"{'    ' * depth}pass")
+
+    def delegate(self, template, var, condition, lines, depth, data_left=False):
+        """
+        compares with `==` if the condition holds and opens an else block for the specialized checks
+        """
+        pad = "    " * depth
+        c = self.constant(template)
+        lines.append(f"{pad}if {condition}:")
+        lines.append(f"{pad}    if not {var} == {c}:" if data_left else f"{pad}    if not {c} == {var}:")
+        lines.append(f"{pad}        return False")
+        lines.append(f"{pad}else:")
+
+    def dict_literal(self, template, var, lines, depth, data_left):
+        self.delegate(template, var, f"type({var}) is not dict", lines, depth, data_left)
+        depth += 1
+        self.fail(f"len({var}) != {len(template)}", lines, depth)
+        for key, value in template.items():
+            v = self.name("_v")
+            lines.append(f"{'    ' * depth}{v} = {var}.get({self.key(key)}, _missing)")
+            self.fail(f"{v} is _missing", lines, depth)
+            self.item(value, v, lines, depth, data_left)
+
+    def sequence_literal(self, template, var, lines, depth, data_left):
+        self.delegate(template, var, f"type({var}) is not {type(template).__name__}", lines, depth, data_left)
+        depth += 1
+        self.fail(f"len({var}) != {len(template)}", lines, depth)
+        for i, value in enumerate(template):
+            v = self.name("_v")
+            lines.append(f"{'    ' * depth}{v} = {var}[{i}]")
+            self.item(value, v, lines, depth, data_left)
+
+    def item(self, value, var, lines, depth, data_left):
+        """
+        emits the check of an item of a dict or list literal, python compares items that are identical as equal
+        (e.g. `[nan] == [nan]`)
+        """
+        if isinstance(value, Some) or type(value) in (dict, list, tuple):
+            self.statements(value, var, lines, depth, data_left)
+            return
+        c = self.constant(value)
+        self.fail(f"{var} is not {c} and not " + (f"{var} == {c}" if data_left else f"{c} == {var}"), lines, depth)
+
+    def matcher(self, template, var, lines, depth):
+        cls = type(template)
+        if cls.__eq__ is not Some.__eq__:
+            self.fail(f"not {self.constant(template)} == {var}", lines, depth)
+        elif template.types is None:
+            return
+        elif cls is SomeDict or cls is SomeMapping and template.each_item is None:
+            self.some_dict(template, var, lines, depth)
+        elif cls is SomeMapping:
+            self.some_mapping_each(template, var, lines, depth)
+        elif cls in (SomeIterable, SomeList):
+            self.some_iterable(template, var, lines, depth)
+        elif cls is SomeIn:
+            self.fail(f"{var} not in {self.constant(template.container)}", lines, depth)
+        elif cls is SomeStr:
+            self.some_str(template, var, lines, depth)
+        elif cls is SomeOneOf:
+            self.some_one_of(template, var, lines, depth)
+        elif cls is AllOf:
+            for arg in template.args:
+                self.alternative(arg, var, lines, depth)
+        elif len(template.types) == 1:
+            self.alternative(template.types[0], var, lines, depth)
+        elif all(isinstance(t, type) for t in template.types):
+            self.fail(f"not isinstance({var}, {self.constant(tuple(template.types))})", lines, depth)
+        elif template.adaptive:
+            # the order of the alternatives changes at runtime
+            self.fail(f"not {self.constant(template)} == {var}", lines, depth)
+        else:
+            conditions = []
+            types = []
+            for t in template.types + [None]:
+                if isinstance(t, type):
+                    # consecutive types are checked with a single isinstance call
+                    types.append(t)
+                    continue
+                if types:
+                    conditions.append(f"isinstance({var}, {self.constant(tuple(types))})")
+                    types = []
+                if t is None:
+                    break
+                elif isinstance(t, Some):
+                    conditions.append(f"{self.function(t)}({var})")
+                else:
+                    conditions.append(f"_checked(_call({self.constant(t)}, {var}))")
+            self.fail(f"not ({' or '.join(conditions)})", lines, depth)
+
+    def alternative(self, arg, var, lines, depth):
+        """
+        emits the check of a single argument of Some (a type, a Some or a function)
+        """
+        if isinstance(arg, type):
+            c = self.constant(arg)
+            self.fail(f"type({var}) is not {c} and not isinstance({var}, {c})", lines, depth)
+        elif isinstance(arg, Some):
+            self.matcher(arg, var, lines, depth)
+        else:
+            self.fail(f"not _checked(_call({self.constant(arg)}, {var}))", lines, depth)
+
+    def some_dict(self, template, var, lines, depth):
+        self.delegate(template, var, f"type({var}) is not dict", lines, depth)
+        depth += 1
+        pad = "    " * depth
+        start = len(lines)
+        required, allowed = template.required, template.allowed
+        if allowed is not None and allowed == required:
+            self.fail(f"{var}.keys() != {self.constant(allowed)}", lines, depth)
+        else:
+            if required:
+                self.fail(f"not {var}.keys() >= {self.constant(required)}", lines, depth)
+            if allowed is not None:
+                self.fail(f"not {self.constant(allowed)}.issuperset({var})", lines, depth)
+        for key, value in template.partial_dict.items():
+            if type(value) is Some and value.types is None:
+                continue
+            v = self.name("_v")
+            if key in required:
+                lines.append(f"{pad}{v} = {var}[{self.key(key)}]")
+            else:
+                lines.append(f"{pad}{v} = {var}.get({self.key(key)})")
+            self.statements(value, v, lines, depth, data_left=True)
+        self.close(lines, start, depth)
+
+    def some_mapping_each(self, template, var, lines, depth):
+        key, value = template.each_item
+        self.delegate(template, var, f"type({var}) is not dict", lines, depth)
+        depth += 1
+        k, v = self.name("_k"), self.name("_v")
+        if type(value) is Some and value.types is None:
+            lines.append(f"{'    ' * depth}for {k} in {var}:")
+            start = len(lines)
+            self.statements(key, k, lines, depth + 1, data_left=True)
+        else:
+            lines.append(f"{'    ' * depth}for {k}, {v} in {var}.items():")
+            start = len(lines)
+            self.statements(key, k, lines, depth + 1, data_left=True)
+            self.statements(value, v, lines, depth + 1, data_left=True)
+        self.close(lines, start, depth + 1)
+
+    def some_iterable(self, template, var, lines, depth):
+        # other iterables may not be iterable twice so they are compared with ==
+        self.delegate(template, var, f"type({var}) is not list and type({var}) is not tuple", lines, depth)
+        depth += 1
+        self.fail(f"not isinstance({var}, {self.constant(template.is_type)})", lines, depth)
+        if template.length is not None:
+            self.fail(f"len({var}) != {self.constant(template.length)}", lines, depth)
+        arg = template.arg
+        if isinstance(arg, Some) and type(arg).__eq__ is Some.__eq__ and arg.types is None:
+            return
+        v = self.name("_v")
+        lines.append(f"{'    ' * depth}for {v} in {var}:")
+        start = len(lines)
+        self.statements(arg, v, lines, depth + 1)
+        self.close(lines, start, depth + 1)
+
+    def some_str(self, template, var, lines, depth):
+        self.fail(f"type({var}) is not str and not isinstance({var}, str)", lines, depth)
+        if template.startswith is not None:
+            self.fail(f"not {var}.startswith({self.constant(template.startswith)})", lines, depth)
+        if template.endswith is not None:
+            self.fail(f"not {var}.endswith({self.constant(template.endswith)})", lines, depth)
+        for compiled in template.compiled:
+            self.fail(f"{self.constant(compiled.match)}({var}) is None", lines, depth)
+
+    def some_one_of(self, template, var, lines, depth):
+        self.delegate(template, var, f"type({var}) is not dict", lines, depth)
+        depth += 1
+        pad = "    " * depth
+        tag, function = self.name("_tag"), self.name("_variant")
+        table = self.name("_variants")
+        self.namespace[table] = {}
+        self.tables.append((table, {tag: self.function(variant) for tag, variant in template.variants.items()}))
+        lines.append(f"{pad}{tag} = {var}.get({self.key(template.discriminator)}, _missing)")
+        if template.fallback:
+            # dicts without the discriminator may equal any variant
+            self.delegate(template, var, f"{tag} is _missing", lines, depth)
+            depth += 1
+            pad = "    " * depth
+        else:
+            self.fail(f"{tag} is _missing", lines, depth)
+        lines.append(f"{pad}try:")
+        lines.append(f"{pad}    {function} = {table}.get({tag})")
+        lines.append(f"{pad}except TypeError:")
+        lines.append(f"{pad}    return False")
+        self.fail(f"{function} is None or not {function}({var})", lines, depth)
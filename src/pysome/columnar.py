@@ -0,0 +1,235 @@
+"""
+columnar validation of lists of homogeneous records
+
+Instead of comparing every record with the template, the records are transposed once into one column per key and
+every leaf of the template checks its whole column at once: type checks look only at the distinct types of a
+column, pure matchers only at its distinct values and nested lists are flattened into a single column. Only
+columns of opaque matchers (e.g. functions) are still checked cell by cell.
+"""
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Callable, Sequence
+
+from pysome.Same import Same
+from pysome.Some import (AllOf, Some, SomeDict, SomeIterable, SomeMapping, SomeObject, SomeOneOf, SomeOrNone,
+                         SomeStr)
+
+ColumnChecker = Callable[[Sequence[Any]], bool]
+
+_literal_types = (int, float, str, bytes, bool, type(None))
+
+
+def contains_same(template: Any) -> bool:
+    """
+    True if the template contains a Same (or NotSame) whose result would depend on the order of evaluation
+
+    examples:
+    >>> contains_same({"a": SomeIterable(SomeDict(id=Same()))})
+    True
+    >>> contains_same({"a": SomeIterable(SomeDict(id=Some(int)))})
+    False
+    """
+    if isinstance(template, Same):
+        return True
+    if type(template) is dict:
+        return any(contains_same(value) for value in template.values())
+    if type(template) in (list, tuple):
+        return any(contains_same(value) for value in template)
+    if isinstance(template, SomeMapping) and template.each_item is not None:
+        return contains_same(template.each_item)
+    if isinstance(template, SomeDict):
+        return contains_same(template.partial_dict)
+    if isinstance(template, SomeIterable):
+        return contains_same(template.arg)
+    if isinstance(template, SomeOneOf):
+        return contains_same(template.variants)
+    if isinstance(template, AllOf):
+        return any(contains_same(arg) for arg in template.args)
+    if isinstance(template, SomeObject):
+        return contains_same(template.some) or contains_same(template.attributes)
+    if isinstance(template, Some) and template.types:
+        return any(contains_same(t) for t in template.types)
+    return False
+
+
+def range_contains(values: Any, numbers: range) -> bool:
+    """
+    True if all values of a numeric numpy array or pandas Series are in the range. The range is compared by its
+    bounds and step, so it is never materialized.
+
+    examples:
+    >>> import numpy as np
+    >>> range_contains(np.array([0, 4, 8]), range(0, 10**12, 2)), range_contains(np.array([1, 2.5]), range(5))
+    (True, False)
+    """
+    if not numbers:
+        return len(values) == 0
+    low, high, step = min(numbers[0], numbers[-1]), max(numbers[0], numbers[-1]), abs(numbers.step)
+    if low < -2 ** 63 or high >= 2 ** 63 or step >= 2 ** 63:
+        # numpy can not compute with these numbers
+        return all(_in_range(value, numbers) for value in values.tolist())
+    if not bool(((values >= low) & (values <= high)).all()):
+        return False
+    if step == 1 and values.dtype.kind != "f":
+        return True
+    return bool((values % step == numbers[0] % step).all())
+
+
+def _in_range(value, numbers):
+    # `in` is only a constant time lookup for ints, other numbers are compared with every number of the range
+    if type(value) is float:
+        return value.is_integer() and int(value) in numbers
+    if type(value) is bool:
+        return int(value) in numbers
+    return value in numbers
+
+
+def records_checker(template: Any) -> ColumnChecker:
+    """
+    returns a function that checks a list of records column by column. It returns True only if every record
+    equals the template. A False result may be pessimistic and should be confirmed row by row.
+
+    examples:
+    >>> check = records_checker(SomeDict(id=Some(int), tags=SomeIterable(SomeStr())))
+    >>> check([{"id": 1, "tags": ["a"]}, {"id": 2, "tags": []}])
+    True
+    >>> check([{"id": 1, "tags": ["a"]}, {"id": "2", "tags": []}])
+    False
+    """
+    if contains_same(template):
+        return _never
+    return column_checker(template)
+
+
+def column_checker(template: Any) -> ColumnChecker:
+    """
+    returns a function that is True if all values of a column equal the template
+    """
+    if type(template) in (Some, SomeOrNone):
+        if template.types is None:
+            return _always
+        if all(type(t) is type for t in template.types):
+            return _type_checker(tuple(template.types))
+    if type(template) is dict:
+        keys = frozenset(template)
+        return _dict_checker(template, required=keys, allowed=keys)
+    if isinstance(template, SomeMapping) and template.each_item is not None:
+        return _cell_checker(template)
+    if isinstance(template, SomeDict):
+        return _dict_checker(template.partial_dict, required=template.required, allowed=template.allowed)
+    if isinstance(template, SomeIterable):
+        return _iterable_checker(template)
+    if type(template) in _literal_types:
+        return _literal_checker(template)
+    if isinstance(template, Some) and getattr(template, "pure", False):
+        # the result only depends on the compared value so every distinct value is only compared once
+        return _distinct_checker(template)
+    return _cell_checker(template)
+
+
+def _always(column):
+    return True
+
+
+def _never(column):
+    return False
+
+
+def _type_checker(types):
+    # only used for classes with the plain metaclass `type` where isinstance(x, t) == issubclass(type(x), t)
+    known = {}
+
+    def check(column):
+        for t in set(map(type, column)):
+            ok = known.get(t)
+            if ok is None:
+                ok = known[t] = issubclass(t, types)
+            if not ok:
+                return False
+        return True
+
+    return check
+
+
+def _literal_checker(literal):
+    def check(column):
+        return column.count(literal) == len(column)
+
+    return check
+
+
+def _distinct_checker(template):
+    def check(column):
+        try:
+            distinct = set(zip(map(type, column), column))
+        except (TypeError, ValueError):
+            # unhashable values like lists or writable memoryviews
+            return all(value == template for value in column)
+        return all(value == template for _, value in distinct)
+
+    return check
+
+
+def _cell_checker(template):
+    def check(column):
+        return all(value == template for value in column)
+
+    return check
+
+
+def _dict_checker(partial_dict, required, allowed):
+    checkers = [(key, itemgetter(key), column_checker(value)) for key, value in partial_dict.items()
+                if not (type(value) is Some and value.types is None)]
+    exact = allowed is not None and allowed == required
+
+    def check(column):
+        types = set(map(type, column))
+        for t in types:
+            if not issubclass(t, dict):
+                return False
+        # subclasses like defaultdict could change on item access so they are read with .get only
+        plain = types == {dict}
+        if exact:
+            for record in column:
+                if record.keys() != allowed:
+                    return False
+        else:
+            if required:
+                for record in column:
+                    if not record.keys() >= required:
+                        return False
+            if allowed is not None:
+                for record in column:
+                    if not allowed.issuperset(record):
+                        return False
+        for key, getter, checker in checkers:
+            try:
+                if not plain:
+                    raise KeyError(key)
+                values = list(map(getter, column))
+            except KeyError:
+                values = [record.get(key, None) for record in column]
+            if not checker(values):
+                return False
+        return True
+
+    return check
+
+
+def _iterable_checker(template):
+    inner = column_checker(template.arg)
+    is_type = template.is_type
+    length = template.length
+
+    def check(column):
+        for t in set(map(type, column)):
+            if t is not list and t is not tuple:
+                # other iterables may not be iterable twice
+                return all(value == template for value in column)
+            if not issubclass(t, is_type):
+                return False
+        if length is not None and set(map(len, column)) - {length}:
+            return False
+        return inner(list(chain.from_iterable(column)))
+
+    return check
@@ -20,3 +20,7 @@ class InvalidFunction(InvalidArgument):
 
 class SameOutsideExpect(PySomeException):
     pass
+
+
+class BudgetExceeded(PySomeException):
+    pass
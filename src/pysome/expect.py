@@ -1,23 +1,95 @@
-from typing import Any
-from pysome import SameState, ExpectException, SomeStr, Some
+from __future__ import annotations
+
+import sys
+import time
+from collections import namedtuple
+
+from pysome import codegen
+from pysome.budget import Budget
+from pysome.SameState import SameState
+from pysome.Some import Some, _Recording
+from pysome.exceptions import ExpectException, InvalidArgument
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+
+# a finished `expect` call: the method (to_be, not_to_be or report), the template, its duration, whether it returned
+# without raising and the location of the call
+Observation = namedtuple("Observation", ["method", "template", "seconds", "passed", "filename", "lineno"])
 
 
 class expect:
-    def __init__(self, *data: Any):
+    # callables that are called with an `Observation` after every to_be, not_to_be and report call (e.g. by the
+    # pytest plugin), calls are only timed if there is an observer
+    observers = []
+
+    def __init__(self, *data: Any, budget: Budget = None):
+        """
+        `budget` limits the cost of every single comparison, see `Budget`
+        """
+        if budget is not None and not isinstance(budget, Budget):
+            raise InvalidArgument(f"budget must be a Budget but is {budget!r}")
         self.data = data
+        self.budget = budget
 
     def to_be(self, other):
+        if expect.observers:
+            return self._observe("to_be", self._to_be, other)
+        return self._to_be(other)
+
+    def not_to_be(self, other):
+        if expect.observers:
+            return self._observe("not_to_be", self._not_to_be, other)
+        return self._not_to_be(other)
+
+    def report(self, other, report=None):
+        """
+        validates all data against other without raising and returns a Report of all failures. Pass an existing
+        report to accumulate the results of multiple calls.
+        """
+        if expect.observers:
+            return self._observe("report", self._report, other, report)
+        return self._report(other, report)
+
+    def _to_be(self, other):
         for da in self.data:
-            if does(da).not_equal(other):
+            if does(da, budget=self.budget).not_equal(other):
                 raise ExpectException(self.format_error_msg())
         return self
 
-    def not_to_be(self, other):
+    def _not_to_be(self, other):
         for da in self.data:
-            if does(da).equal(other):
+            if does(da, budget=self.budget).equal(other):
                 raise ExpectException()
         return self
 
+    def _report(self, other, report):
+        from pysome.report import Report
+
+        if report is None:
+            report = Report()
+        for da in self.data:
+            report.add(da, other, budget=self.budget)
+        return report
+
+    @staticmethod
+    def _observe(name, method, other, *args):
+        # the caller of to_be, not_to_be or report
+        caller = sys._getframe(2)  # noqa
+        passed = False
+        start = time.perf_counter()
+        try:
+            result = method(other, *args)
+            passed = True
+            return result
+        finally:
+            observation = Observation(name, other, time.perf_counter() - start, passed, caller.f_code.co_filename,
+                                      caller.f_lineno)
+            for observer in list(expect.observers):
+                observer(observation)
+
     @staticmethod
     def format_error_msg():
         out = "\n"
@@ -25,21 +97,75 @@ class expect:
             out += f"  - {ue}\n"
         return out
 
+    @staticmethod
+    def cache_info():
+        """
+        hits, misses and size of the cache of prepared templates that is shared by all `expect` and `does` calls
+        """
+        return codegen.cache_info()
+
+    @staticmethod
+    def cache_clear():
+        codegen.cache_clear()
+
 
 class does:
-    def __init__(self, data):
+    def __init__(self, data, budget: Budget = None):
         self.data = data
+        self.budget = budget
         Some.unequals = []
 
     def equal(self, other):
-        SameState._start()  # noqa
-        result = other == self.data
-        SameState._end()  # noqa
-        return result
+        previous = self._start()
+        try:
+            if self._compiled():
+                return self._compiled_equal(other, messages=False)
+            return other == self.data
+        finally:
+            self._end(previous)
 
     def not_equal(self, other):
-        SameState._start()  # noqa
+        previous = self._start()
         Some.unequals = []
-        result = other != self.data
+        try:
+            if self._compiled():
+                return not self._compiled_equal(other, messages=True)
+            return other != self.data
+        finally:
+            self._end(previous)
+
+    def _start(self):
+        SameState._start()  # noqa
+        if self.budget is not None:
+            return self.budget._start()  # noqa
+        return Budget.active
+
+    def _end(self, previous_budget):
         SameState._end()  # noqa
-        return result
+        Budget.active = previous_budget
+
+    @staticmethod
+    def _compiled():
+        # values kept across comparisons (e.g. in a SharedState) must only be compared once and budgets are only
+        # checked by the interpreted matchers
+        return codegen.get_backend() != "interpreted" and not SameState.backend.persistent and Budget.active is None
+
+    def _compiled_equal(self, other, messages: bool):
+        function = codegen.prepare(other)
+        if function is None:
+            return other == self.data
+        previous = Some.recording
+        Some.recording = recording = _Recording()
+        try:
+            if function(self.data):
+                return True
+            if messages:
+                # the interpreted path only adds the error messages, it gets the recorded results of the validator
+                # functions instead of calling them again
+                SameState._start()  # noqa
+                Some.unequals = []
+                recording.position = 0
+                other == self.data
+            return False
+        finally:
+            Some.recording = previous
@@ -0,0 +1,195 @@
+"""
+follows growing NDJSON files (like `tail -F`) and validates every new line against a template
+
+    $ python -m pysome follow my_project.templates:EVENT events.log --state events.state --interval 10
+"""
+import json
+import os
+import time
+
+from pysome.cli import validate_line
+from pysome.exceptions import InvalidArgument
+from pysome.report import Report
+
+
+class Follower:
+    """
+    Follower validates the lines that are appended to a file. It keeps reading when the file is rotated (renamed
+    or removed and created again) or truncated. Every `interval` seconds the failures of the lines since the last
+    flush are passed to `on_flush` and the byte offset of the last complete line is checkpointed to `state_file`,
+    so a restarted follower resumes where it stopped instead of reading the file again.
+    Without a checkpoint only lines that are appended after the start are validated, unless `from_start` is True.
+    If the file was rotated while the follower was not running, the new file is read from its start.
+    """
+
+    def __init__(self, template, path: str, state_file: str = None, interval: float = 10.0, from_start=False,
+                 on_flush=None, chunk_size: int = 2 ** 20):
+        if interval <= 0:
+            raise InvalidArgument("interval must be > 0")
+        self.template = template
+        self.path = path
+        self.state_file = state_file
+        self.interval = interval
+        self.on_flush = on_flush if on_flush is not None else print_window
+        self.chunk_size = chunk_size
+        # failures since the last flush and of all flushed windows
+        self.window = Report()
+        self.total = Report()
+        # offset in the current file up to which all lines were validated
+        self.offset = 0
+        self._file = None
+        self._identity = None
+        self._buffer = b""
+        self._last_flush = time.monotonic()
+        self._stopped = False
+        self._open(from_start)
+
+    def _open(self, from_start):
+        state = self._load_state()
+        if not self._reopen():
+            return
+        size = os.fstat(self._file.fileno()).st_size
+        if state is not None and tuple(state["file"]) == self._identity and state["offset"] <= size:
+            self.offset = state["offset"]
+        elif state is not None or from_start:
+            self.offset = 0
+        else:
+            self.offset = size
+        self._file.seek(self.offset)
+
+    def _reopen(self) -> bool:
+        """
+        opens the file at path from its start (after a rotation), returns False if there is no file yet
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        if self._file is not None:
+            self._file.close()
+        self._file = f
+        st = os.fstat(f.fileno())
+        self._identity = (st.st_dev, st.st_ino)
+        self.offset = 0
+        self._buffer = b""
+        return True
+
+    def poll(self) -> int:
+        """
+        validates all complete lines that were appended since the last call and returns their number
+        """
+        if self._file is None and not self._reopen():
+            self._maybe_flush()
+            return 0
+        lines = self._read()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            # rotated and the new file was not created yet
+            st = None
+        if st is not None and (st.st_dev, st.st_ino) != self._identity:
+            # lines that were written to the old file before it was rotated and its last line without line break
+            lines += self._read()
+            if self._buffer.strip():
+                validate_line(self.window, self.template, self._buffer)
+                lines += 1
+            self._reopen()
+            lines += self._read()
+        elif st is not None and st.st_size < self.offset + len(self._buffer):
+            # truncated, everything that is in the file now is new
+            self._file.seek(0)
+            self.offset = 0
+            self._buffer = b""
+            lines += self._read()
+        self._maybe_flush()
+        return lines
+
+    def _read(self) -> int:
+        lines = 0
+        read, validate, report, template = self._file.read, validate_line, self.window, self.template
+        while True:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                return lines
+            data = self._buffer + chunk if self._buffer else chunk
+            end = data.rfind(b"\n")
+            if end == -1:
+                self._buffer = data
+                continue
+            self._buffer = data[end + 1:]
+            for line in data[:end].split(b"\n"):
+                if line.strip():
+                    validate(report, template, line)
+                    lines += 1
+            self.offset += end + 1
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """
+        passes the failures since the last flush to on_flush and checkpoints the offset
+        """
+        self._last_flush = time.monotonic()
+        window, self.window = self.window, Report()
+        self.on_flush(window)
+        self.total.merge(window)
+        self._save_state()
+
+    def run(self, duration: float = None, poll_interval: float = 0.1):
+        """
+        follows the file until `stop` is called or for `duration` seconds, the last window is flushed at the end
+        """
+        end = None if duration is None else time.monotonic() + duration
+        self._stopped = False
+        try:
+            while not self._stopped and (end is None or time.monotonic() < end):
+                if not self.poll():
+                    time.sleep(poll_interval)
+        finally:
+            self.flush()
+
+    def stop(self):
+        self._stopped = True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _load_state(self):
+        if self.state_file is None or not os.path.exists(self.state_file):
+            return None
+        with open(self.state_file) as f:
+            state = json.load(f)
+        if state.get("path") != os.path.abspath(self.path):
+            raise InvalidArgument(f"state file {self.state_file} belongs to {state.get('path')}")
+        return state
+
+    def _save_state(self):
+        if self.state_file is None or self._identity is None:
+            return
+        state = {"path": os.path.abspath(self.path), "file": list(self._identity), "offset": self.offset}
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        # atomic, a crash leaves either the old or the new checkpoint
+        os.replace(tmp, self.state_file)
+
+
+def print_window(report: Report, file=None):
+    """
+    prints the failures of one window of a Follower
+    """
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{now} records: {report.records}, failed: {report.failed}", file=file, flush=True)
+    if report.failed:
+        lines = str(report).splitlines()[2:]
+        print("\n".join(lines), file=file, flush=True)
@@ -0,0 +1,486 @@
+"""
+generates data that equals a template, e.g. for load tests
+
+    >>> from pysome import Some, SomeDict, SomeIn, SomeList, SomeStr
+    >>> generator = DataGenerator(SomeDict(id=Some(int), role=SomeIn({"admin", "user"}),
+    ...                                    tags=SomeList(SomeStr(regex="[a-z]{3}-[0-9]{2}"))), seed=1)
+    >>> records = generator.batch(100)
+    >>> all(record["role"] in ("admin", "user") for record in records)
+    True
+    >>> DataGenerator(SomeStr(regex="[a-z]{3}-[0-9]{2}"), seed=1).batch(3)
+    ['idp-76', 'pam-90', 'xzh-50']
+"""
+from __future__ import annotations
+
+import json
+import random
+import string
+
+from pysome.exceptions import InvalidArgument
+from pysome.Same import NotSame, Same
+from pysome.Some import (AllOf, Some, SomeBytes, SomeDict, SomeEmail, SomeIn, SomeIterable, SomeList,
+                         SomeMapping, SomeOneOf, SomeOrNone, SomeStr, SomeUuid, SomeWithLen)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
+# how often a value that does not equal the template is generated again before giving up
+_attempts = 100
+_alphanumeric = string.ascii_letters + string.digits
+# values that are tried for matchers and validator functions without a dedicated generator
+_candidates = (0, 1, -1, 42, 0.5, "", "a", "abc", "2020-01-01", True, False, None, (), b"")
+
+
+class DataGenerator:
+    """
+    DataGenerator generates random values that equal a template. The template is translated once into nested
+    generator functions, values of the same seed are always the same. Dicts, lists and literals are generated as is,
+    matchers to typical values of their types, picks from `SomeIn` containers, strings of `SomeStr` regexes, valid
+    uuids and emails and nested structures of `SomeList`, `SomeDict`, `SomeMapping.each` and `SomeOneOf`. Values
+    for validator functions and other matchers are picked from a few candidates that equal them.
+    `max_items` is the largest number of items of lists and mappings without a fixed length.
+    """
+
+    def __init__(self, template: Any, seed=None, max_items: int = 5):
+        if not isinstance(max_items, int) or max_items < 0:
+            raise InvalidArgument("max_items must be an int >= 0")
+        self.template = template
+        self.random = random.Random(seed)
+        self.max_items = max_items
+        self._generate = _Planner(max_items).plan(template)
+
+    def sample(self) -> Any:
+        return self._generate(self.random, {})
+
+    def batch(self, size: int) -> list:
+        generate, rng = self._generate, self.random
+        # every record has its own scope of Same and NotSame values
+        return [generate(rng, {}) for _ in range(size)]
+
+    def __iter__(self) -> Iterator:
+        while True:
+            yield from self.batch(1000)
+
+    def write_ndjson(self, file, count: int, batch_size: int = 10_000) -> int:
+        """
+        writes count records as NDJSON to a file object or path, generated and written in batches. Returns the
+        number of written bytes.
+        """
+        if isinstance(file, str):
+            with open(file, "w", encoding="utf-8") as f:
+                return self.write_ndjson(f, count, batch_size)
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        written = 0
+        while count > 0:
+            records = self.batch(min(batch_size, count))
+            count -= len(records)
+            chunk = "\n".join(map(encode, records)) + "\n"
+            file.write(chunk)
+            written += len(chunk.encode("utf-8"))
+        return written
+
+
+def generate(template: Any, count: int = None, seed=None) -> Iterator:
+    """
+    yields count (or endless) values that equal the template
+    """
+    generator = DataGenerator(template, seed=seed)
+    if count is None:
+        return iter(generator)
+    return iter(generator.batch(count))
+
+
+class _Planner:
+    """
+    translates templates into functions `f(rng, scope)` that return a value equal to the template. The scope keeps
+    the values of Same and NotSame in one record.
+    """
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.matchers = {
+            Some: self.some,
+            SomeOrNone: self.some,
+            AllOf: self.all_of,
+            SomeIterable: self.some_iterable,
+            SomeList: self.some_iterable,
+            SomeDict: self.some_dict,
+            SomeMapping: self.some_dict,
+            SomeIn: self.some_in,
+            SomeWithLen: self.some_with_len,
+            SomeStr: self.some_str,
+            SomeEmail: self.some_email,
+            SomeUuid: self.some_uuid,
+            SomeBytes: self.some_bytes,
+            SomeOneOf: self.some_one_of,
+            Same: self.same,
+            NotSame: self.not_same,
+        }
+
+    def plan(self, template):
+        cls = type(template)
+        if cls is dict:
+            items = [(key, self.plan(value)) for key, value in template.items()]
+            return lambda rng, scope: {key: generate(rng, scope) for key, generate in items}
+        if cls is list or cls is tuple:
+            generators = [self.plan(value) for value in template]
+            if cls is tuple:
+                return lambda rng, scope: tuple([generate(rng, scope) for generate in generators])
+            return lambda rng, scope: [generate(rng, scope) for generate in generators]
+        if not isinstance(template, Some):
+            # other values only equal themselves
+            return lambda rng, scope: template
+        method = self.matchers.get(cls)
+        if method is None:
+            return self.candidates(template, lambda value: _equals(template, value))
+        return method(template)
+
+    def some(self, template):
+        if template.types is None:
+            return _random_int
+        generators = []
+        for t in template.types:
+            if isinstance(t, type):
+                generators.append(self.instance(t))
+            elif isinstance(t, Some):
+                generators.append(self.plan(t))
+            else:
+                generators.append(self.candidates(t, lambda value, t=t: t(value) is True))
+        return _one_of(generators)
+
+    def instance(self, t):
+        generate = _type_generators.get(t)
+        if generate is not None:
+            return generate
+        return self.candidates(t, lambda value: isinstance(value, t))
+
+    def candidates(self, template, check):
+        def safe_check(value):
+            try:
+                return check(value)
+            except Exception:  # noqa
+                return False
+
+        values = [value for value in _candidates if safe_check(value)]
+        if not values:
+            raise InvalidArgument(f"can not generate values that equal {template}")
+        return lambda rng, scope: values[rng.randrange(len(values))]
+
+    def all_of(self, template):
+        generate = self.plan(Some(template.args[0])) if template.args else _random_int
+        return _checked(generate, lambda value: _equals(template, value), template)
+
+    def some_iterable(self, template):
+        generate = self.plan(template.arg)
+        length, max_items = template.length, self.max_items
+        container = template.is_type if template.is_type in (tuple, set, frozenset) else list
+
+        def some_iterable(rng, scope):
+            n = length if length is not None else rng.randint(0, max_items)
+            return container([generate(rng, scope) for _ in range(n)])
+
+        return some_iterable
+
+    def some_dict(self, template):
+        if getattr(template, "each_item", None) is not None:
+            return self.each_item(template)
+        items = [(key, self.plan(value)) for key, value in template.partial_dict.items()]
+        items.extend((key, _random_int) for key in sorted(template.required - template.partial_dict.keys(), key=repr))
+        return lambda rng, scope: {key: generate(rng, scope) for key, generate in items}
+
+    def each_item(self, template):
+        key_template, value_template = template.each_item
+        generate_key, generate_value = self.plan(key_template), self.plan(value_template)
+        max_items = self.max_items
+
+        def each_item(rng, scope):
+            # duplicated keys are dropped, so a mapping can have less items
+            return {generate_key(rng, scope): generate_value(rng, scope) for _ in range(rng.randint(0, max_items))}
+
+        return each_item
+
+    def some_in(self, template):
+        try:
+            values = list(template.container)
+        except TypeError:
+            return self.candidates(template, lambda value: value in template.container)
+        if isinstance(template.container, (set, frozenset)):
+            # the iteration order of sets depends on the hash seed of the process
+            values.sort(key=repr)
+        if not values:
+            raise InvalidArgument(f"can not generate values that equal {template}")
+        return lambda rng, scope: values[rng.randrange(len(values))]
+
+    def some_with_len(self, template):
+        # like the matcher a length of 0 means no condition
+        low = template.length or template.min_length or 0
+        high = template.length or template.max_length or low + 10
+
+        def some_with_len(rng, scope):
+            return "".join(rng.choices(_alphanumeric, k=rng.randint(low, high)))
+
+        return _checked(some_with_len, template.types[0], template)
+
+    def some_str(self, template):
+        regexes = template.regex or tuple(p.replace("_", ".") + "$" for p in template.pattern or ())
+        if regexes:
+            generators = [_regex_generator(regex) for regex in regexes]
+
+            def some_str(rng, scope):
+                return generators[rng.randrange(len(generators))](rng)
+        else:
+            prefixes, suffixes = template.startswith or ("",), template.endswith or ("",)
+
+            def some_str(rng, scope):
+                return (prefixes[rng.randrange(len(prefixes))] + _random_str(rng, scope)
+                        + suffixes[rng.randrange(len(suffixes))])
+
+        # the conditions that were not used to generate the string are checked by the matcher itself
+        return _checked(some_str, template.types[0], template)
+
+    def some_email(self, template):
+        tlds = ("com", "de", "org", "net", "io")
+
+        def some_email(rng, scope):
+            local = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+            domain = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+            return f"{local}.{rng.randrange(1000)}@{domain}.{tlds[rng.randrange(len(tlds))]}"
+
+        return some_email
+
+    def some_uuid(self, template):
+        import uuid
+
+        version, upper = template.version, template.case == "upper"
+
+        def some_uuid(rng, scope):
+            n = rng.getrandbits(128)
+            if version is not None:
+                # RFC 4122 variant and version bits
+                n = (n & ~(0xc000 << 48) | 0x8000 << 48) & ~(0xf000 << 64) | version << 76
+            value = str(uuid.UUID(int=n))
+            return value.upper() if upper else value
+
+        return some_uuid
+
+    def some_bytes(self, template):
+        prefix, suffix = template.prefix or b"", template.suffix or b""
+        if template.regex is not None:
+            generate = _regex_generator(template.regex.pattern.decode("latin-1"))
+
+            def some_bytes(rng, scope):
+                return generate(rng).encode("latin-1")
+        else:
+            low = template.length if template.length is not None else len(prefix) + len(suffix)
+            high = template.length if template.length is not None else template.max_length or low + 16
+            high = max(high, low)
+
+            def some_bytes(rng, scope):
+                n = rng.randint(low, high) - len(prefix) - len(suffix)
+                return prefix + bytes(rng.choices(range(256), k=max(n, 0))) + suffix
+
+        return _checked(some_bytes, template.types[0], template)
+
+    def some_one_of(self, template):
+        discriminator = template.discriminator
+        variants = [(tag, self.plan(variant)) for tag, variant in template.variants.items()]
+        if not variants:
+            raise InvalidArgument(f"can not generate values that equal {template}")
+
+        def some_one_of(rng, scope):
+            tag, generate = variants[rng.randrange(len(variants))]
+            value = generate(rng, scope)
+            if isinstance(value, dict):
+                value[discriminator] = tag
+            return value
+
+        return some_one_of
+
+    def same(self, template):
+        generate, key = self.plan(template.some), ("Same", template.name)
+
+        def same(rng, scope):
+            if key not in scope:
+                scope[key] = generate(rng, scope)
+            return scope[key]
+
+        return same
+
+    def not_same(self, template):
+        generate, key = self.plan(template.some), ("NotSame", template.name)
+
+        def not_same(rng, scope):
+            seen = scope.setdefault(key, [])
+            for _ in range(_attempts):
+                value = generate(rng, scope)
+                if not any(value == other for other in seen):
+                    seen.append(value)
+                    return value
+            raise InvalidArgument(f"can not generate enough unique values that equal {template}")
+
+        return not_same
+
+
+def _equals(template, value) -> bool:
+    from pysome.expect import does
+
+    return does(value).equal(template)
+
+
+def _checked(generate, check, template):
+    """
+    wraps a generator whose values do not always equal the template, values are generated again until one does
+    """
+
+    def checked(rng, scope):
+        for _ in range(_attempts):
+            value = generate(rng, scope)
+            if check(value):
+                return value
+        raise InvalidArgument(f"can not generate values that equal {template} (no value of {_attempts} did)")
+
+    return checked
+
+
+def _one_of(generators):
+    if len(generators) == 1:
+        return generators[0]
+    return lambda rng, scope: generators[rng.randrange(len(generators))](rng, scope)
+
+
+def _random_int(rng, scope):
+    return rng.randint(0, 1_000_000)
+
+
+def _random_str(rng, scope):
+    return "".join(rng.choices(_alphanumeric, k=rng.randint(1, 12)))
+
+
+_type_generators = {
+    bool: lambda rng, scope: rng.random() < 0.5,
+    int: _random_int,
+    float: lambda rng, scope: round(rng.uniform(-1000, 1000), 3),
+    str: _random_str,
+    bytes: lambda rng, scope: bytes(rng.choices(range(256), k=rng.randint(0, 16))),
+    type(None): lambda rng, scope: None,
+    list: lambda rng, scope: [],
+    dict: lambda rng, scope: {},
+    tuple: lambda rng, scope: (),
+    object: _random_int,
+}
+
+
+def _regex_generator(regex: str):
+    """
+    returns a function `f(rng)` that generates strings that (usually) match the regex. Lookarounds and flags are
+    ignored, so the strings are checked by the matcher.
+
+    examples:
+    >>> generate = _regex_generator(r"(?P<a>[a-c]{2})-\\d+-(?P=a)|x")
+    >>> rng = random.Random(2)
+    >>> [generate(rng) for _ in range(3)]
+    ['ab-449-ab', 'cc-668-cc', 'x']
+    """
+    try:
+        from re import _parser as sre_parse
+    except ImportError:  # python < 3.11
+        import sre_parse
+
+    return _RegexGenerator(sre_parse).compile(sre_parse.parse(regex))
+
+
+class _RegexGenerator:
+    # the largest number of repetitions that is generated for unbounded repeats like `*` and `+`
+    max_repeat = 8
+
+    def __init__(self, sre_parse):
+        self.sre = sre_parse
+        categories = {
+            sre_parse.CATEGORY_DIGIT: string.digits,
+            sre_parse.CATEGORY_NOT_DIGIT: string.ascii_letters,
+            sre_parse.CATEGORY_WORD: _alphanumeric + "_",
+            sre_parse.CATEGORY_NOT_WORD: " -.,:;",
+            sre_parse.CATEGORY_SPACE: " ",
+            sre_parse.CATEGORY_NOT_SPACE: _alphanumeric,
+        }
+        self.categories = categories
+
+    def compile(self, pattern):
+        parts = [self.node(op, av) for op, av in pattern]
+
+        def sequence(rng, groups=None):
+            if groups is None:
+                groups = {}
+            return "".join([part(rng, groups) for part in parts])
+
+        return sequence
+
+    def node(self, op, av):
+        sre = self.sre
+        if op is sre.LITERAL:
+            char = chr(av)
+            return lambda rng, groups: char
+        if op is sre.NOT_LITERAL:
+            chars = _alphanumeric.replace(chr(av), "")
+            return lambda rng, groups: chars[rng.randrange(len(chars))]
+        if op is sre.ANY:
+            return lambda rng, groups: _alphanumeric[rng.randrange(len(_alphanumeric))]
+        if op is sre.IN:
+            return self.char_set(av)
+        if op is sre.BRANCH:
+            branches = [self.compile(branch) for branch in av[1]]
+            return lambda rng, groups: branches[rng.randrange(len(branches))](rng, groups)
+        if op is sre.SUBPATTERN:
+            group, body = av[0], self.compile(av[-1])
+
+            def subpattern(rng, groups):
+                value = body(rng, groups)
+                if group is not None:
+                    groups[group] = value
+                return value
+
+            return subpattern
+        if op in (sre.MAX_REPEAT, sre.MIN_REPEAT, getattr(sre, "POSSESSIVE_REPEAT", None)):
+            low, high, body = av[0], av[1], self.compile(av[2])
+            high = min(high, low + self.max_repeat)
+            return lambda rng, groups: "".join([body(rng, groups) for _ in range(rng.randint(low, high))])
+        if op is getattr(sre, "ATOMIC_GROUP", None):
+            return self.compile(av)
+        if op is sre.GROUPREF:
+            return lambda rng, groups: groups.get(av, "")
+        if op is sre.GROUPREF_EXISTS:
+            group, yes = av[0], self.compile(av[1])
+            no = self.compile(av[2]) if av[2] is not None else None
+
+            def groupref_exists(rng, groups):
+                if group in groups:
+                    return yes(rng, groups)
+                return no(rng, groups) if no is not None else ""
+
+            return groupref_exists
+        # anchors, lookarounds and everything else do not produce characters
+        return lambda rng, groups: ""
+
+    def char_set(self, items):
+        sre = self.sre
+        chars = []
+        negate = False
+        for op, av in items:
+            if op is sre.NEGATE:
+                negate = True
+            elif op is sre.LITERAL:
+                chars.append(chr(av))
+            elif op is sre.RANGE:
+                # large ranges are sampled so the set stays small
+                low, high = av
+                step = max(1, (high - low) // 64)
+                chars.extend(chr(c) for c in range(low, high + 1, step))
+            elif op is sre.CATEGORY:
+                chars.extend(self.categories.get(av, ""))
+        if negate:
+            chars = [c for c in _alphanumeric + " -.,:;_" if c not in set(chars)]
+        chars = "".join(dict.fromkeys(chars))
+        if not chars:
+            return lambda rng, groups: ""
+        return lambda rng, groups: chars[rng.randrange(len(chars))]
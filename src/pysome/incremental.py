@@ -0,0 +1,562 @@
+"""
+incremental revalidation of documents that change by small edits (e.g. JSON patches)
+
+The validator walks the template alongside the document once (like `walk.iter_failures`) and keeps one node per
+dict or list the template looks into. Every node remembers the failures of its keys and items, so after an edit
+only the changed slot is checked again and the failure counts of its ancestors are adjusted. `Same` leaves are
+collected per name and a name only fails if its values are not all equal.
+"""
+import copy
+from collections import Counter
+from collections.abc import Mapping
+from typing import Any, Iterable, List, Tuple
+
+from pysome.Same import Same
+from pysome.Some import Some, SomeDict, SomeIterable, SomeMapping, SomeOneOf
+from pysome.columnar import contains_same
+from pysome.walk import Failure, find_failures, missing
+
+
+class _RootKey:
+    def __repr__(self):
+        return "<root>"
+
+
+# key of the document in the holder node above the root
+_ROOT = _RootKey()
+
+
+class _Node:
+    __slots__ = ("parent", "key", "template", "kind", "spec", "length", "keys", "leaves", "children", "same",
+                 "failed")
+
+    def __init__(self, parent, key, template, kind, spec):
+        self.parent = parent
+        self.key = key
+        self.template = template
+        self.kind = kind
+        self.spec = spec
+        self.length = None
+        # failures of the key itself (missing, unexpected or invalid key): key -> [(template, value), ...]
+        self.keys = {}
+        # failing leaf checks: key -> (path suffix, template, value)
+        self.leaves = {}
+        self.children = {}
+        # values of `Same` leaves: key -> _Occurrence
+        self.same = {}
+        # number of failures in the subtree (without failing Same names)
+        self.failed = 0
+
+    def path(self) -> Tuple:
+        keys = []
+        node = self
+        while node.parent is not None:
+            if node.key is not _ROOT:
+                keys.append(node.key)
+            node = node.parent
+        return tuple(reversed(keys))
+
+    def slot_failed(self, key) -> int:
+        failed = len(self.keys.get(key, ())) + (key in self.leaves)
+        child = self.children.get(key)
+        if child is not None:
+            failed += child.failed
+        return failed
+
+
+class _Occurrence:
+    __slots__ = ("node", "key", "template", "value", "frozen")
+
+    def __init__(self, node, key, template, value, frozen):
+        self.node = node
+        self.key = key
+        self.template = template
+        self.value = value
+        self.frozen = frozen
+
+
+class _Unhashable:
+    pass
+
+
+_unhashable = _Unhashable()
+_LIST = object()
+_TUPLE = object()
+_DICT = object()
+
+
+def _freeze(value):
+    """
+    hashable value that is equal for equal JSON like values (1 == 1.0, lists, dicts, ...) or `_unhashable`
+    """
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        pass
+    if isinstance(value, (list, tuple)):
+        items = tuple(_freeze(v) for v in value)
+        if _unhashable in items:
+            return _unhashable
+        return (_LIST if isinstance(value, list) else _TUPLE, items)
+    if isinstance(value, dict):
+        items = frozenset((k, _freeze(v)) for k, v in value.items())
+        if any(v is _unhashable for _, v in items):
+            return _unhashable
+        return (_DICT, items)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return _unhashable
+
+
+def _path_order(path):
+    return tuple((0, key) if isinstance(key, int) else (1, str(key)) for key in path)
+
+
+def _is_bare_some(template):
+    return type(template) is Some and template.types is None
+
+
+def supports(template: Any) -> bool:
+    """
+    True if the template can be revalidated incrementally. This is the case if every `Same` is a direct leaf of
+    dicts and lists (and there is no `NotSame` whose result depends on the order of evaluation)
+
+    examples:
+    >>> supports({"a": SomeIterable(SomeDict(id=Same()))})
+    True
+    >>> supports({"a": Some(Same(), int)})
+    False
+    """
+    if type(template) is Same:
+        return True
+    if type(template) is dict:
+        return all(supports(value) for value in template.values())
+    if type(template) in (list, tuple):
+        return all(supports(value) for value in template)
+    if isinstance(template, SomeMapping) and template.each_item is not None:
+        return not contains_same(template.each_item[0]) and supports(template.each_item[1])
+    if isinstance(template, SomeDict):
+        return all(supports(value) for value in template.partial_dict.values())
+    if isinstance(template, SomeIterable):
+        return supports(template.arg)
+    if isinstance(template, SomeOneOf):
+        return all(supports(value) for value in template.variants.values())
+    return not contains_same(template)
+
+
+def parse_pointer(document: Any, pointer: str) -> Tuple:
+    """
+    converts a JSON pointer (RFC 6901) into a path. Tokens that address list items become ints.
+
+    examples:
+    >>> parse_pointer({"a": [{"b/c": 1}]}, "/a/0/b~1c")
+    ('a', 0, 'b/c')
+    """
+    if pointer == "":
+        return ()
+    if not pointer.startswith("/"):
+        raise ValueError(f"invalid JSON pointer {pointer!r}")
+    path = []
+    data = document
+    for token in pointer[1:].split("/"):
+        key = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(data, list):
+            key = len(data) if key == "-" else int(key)
+        path.append(key)
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            data = None
+    return tuple(path)
+
+
+class IncrementalValidator:
+    """
+    IncrementalValidator validates a document once and afterwards only revalidates the parts of it that changed.
+    The document can either be changed in place and the changed paths passed to `update` or changed by `apply`
+    with a JSON patch. The cost of an update follows the size of the edit, not the size of the document.
+
+    examples:
+    >>> doc = {"users": [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]}
+    >>> validator = IncrementalValidator(doc, {"users": SomeIterable(SomeDict(id=Some(int), name=Some(str)))})
+    >>> validator.valid
+    True
+    >>> validator.apply([{"op": "add", "path": "/users/-", "value": {"id": "3", "name": "c"}}]).valid
+    False
+    >>> [failure.path for failure in validator.failures()]
+    [('users', 2, 'id')]
+    >>> doc["users"][2]["id"] = 3
+    >>> validator.update(("users", 2, "id")).valid
+    True
+    """
+
+    def __init__(self, document: Any, template: Any):
+        self.document = document
+        self.template = template
+        self.incremental = supports(template)
+        self._build_all()
+
+    # public interface
+
+    @property
+    def valid(self) -> bool:
+        if not self.incremental:
+            return not self._failures
+        return self._holder.failed == 0 and not self._inconsistent
+
+    def failures(self) -> List[Failure]:
+        """
+        all failures of the current document. Values of a `Same` name that are not all equal are reported
+        against the first occurrence in path order.
+        """
+        if not self.incremental:
+            return list(self._failures)
+        out = []
+        self._collect(self._holder, out)
+        for name in self._inconsistent:
+            occurrences = sorted(self._groups[name], key=lambda o: _path_order(o.node.path() + (o.key,)))
+            first = occurrences[0].value
+            for occurrence in occurrences[1:]:
+                if not occurrence.value == first:
+                    out.append(Failure(occurrence.node.path() + (occurrence.key,), occurrence.template,
+                                       occurrence.value))
+        return out
+
+    def update(self, *paths) -> "IncrementalValidator":
+        """
+        revalidates the document after the values at the given paths (tuples of keys or JSON pointers) were
+        replaced, added or removed in place. Items inserted into or removed from the middle of a list shift the
+        following items, in that case pass the path of the list (or use `apply`).
+        """
+        if not self.incremental:
+            self._build_all()
+            return self
+        for path in paths:
+            if isinstance(path, str):
+                path = parse_pointer(self.document, path)
+            self._update(tuple(path))
+        Some.unequals = []
+        return self
+
+    def apply(self, patch: Iterable[dict]) -> "IncrementalValidator":
+        """
+        applies a JSON patch (RFC 6902) to the document and revalidates the changed parts
+        """
+        for operation in patch:
+            op = operation["op"]
+            if op == "add":
+                self._add(operation["path"], operation["value"])
+            elif op == "remove":
+                self._remove(operation["path"])
+            elif op == "replace":
+                self._remove(operation["path"])
+                self._add(operation["path"], operation["value"])
+            elif op == "move":
+                value = self._get(parse_pointer(self.document, operation["from"]))
+                self._remove(operation["from"])
+                self._add(operation["path"], value)
+            elif op == "copy":
+                self._add(operation["path"], copy.deepcopy(self._get(parse_pointer(self.document, operation["from"]))))
+            elif op == "test":
+                if not self._get(parse_pointer(self.document, operation["path"])) == operation["value"]:
+                    raise ValueError(f"test failed at {operation['path']}")
+            else:
+                raise ValueError(f"unknown patch operation {op!r}")
+        Some.unequals = []
+        return self
+
+    # patch operations
+
+    def _get(self, path):
+        data = self.document
+        for key in path:
+            data = data[key]
+        return data
+
+    def _add(self, pointer, value):
+        path = parse_pointer(self.document, pointer)
+        if not path:
+            self.document = value
+            return self.update(())
+        container = self._get(path[:-1])
+        key = path[-1]
+        if isinstance(container, list):
+            container.insert(key, value)
+            return self._shifted(path, key, 1)
+        container[key] = value
+        return self.update(path)
+
+    def _remove(self, pointer):
+        path = parse_pointer(self.document, pointer)
+        if not path:
+            raise ValueError("the whole document can not be removed")
+        container = self._get(path[:-1])
+        key = path[-1]
+        del container[key]
+        if isinstance(container, list):
+            return self._shifted(path, key, -1)
+        return self.update(path)
+
+    def _shifted(self, path, index, delta):
+        """
+        revalidates a list after an item was inserted (delta=1) or removed (delta=-1) at the index
+        """
+        if not self.incremental:
+            return self.update(path)
+        node = self._node_at(path[:-1])
+        if node is None or node.kind != "iter" or node.spec.length is not None:
+            # the list is a leaf or its length is part of the template
+            return self.update(path[:-1])
+        if delta < 0:
+            self._replace_slot(node, index, remove_only=True)
+        # only the items behind the index move, appending or popping the last item moves nothing
+        last = node.length - 1 if delta < 0 else node.length
+        for attr in (node.keys, node.leaves, node.children, node.same) if index < last else ():
+            moved = {key: value for key, value in attr.items() if key > index or (delta > 0 and key == index)}
+            for key in moved:
+                del attr[key]
+            for key, value in moved.items():
+                attr[key + delta] = value
+                if attr is node.children or attr is node.same:
+                    value.key = key + delta
+        node.length += delta
+        if delta > 0:
+            self._recheck(node, index)
+        Some.unequals = []
+        return self
+
+    # building and updating the trie
+
+    def _build_all(self):
+        if not self.incremental:
+            self._failures = find_failures(self.document, self.template)
+            return
+        self._holder = _Node(None, None, None, "holder", None)
+        self._groups = {}
+        self._value_counts = {}
+        self._inconsistent = set()
+        self._build(self._holder, _ROOT, self.document, self.template)
+        self._holder.failed = self._holder.slot_failed(_ROOT)
+        Some.unequals = []
+
+    def _node_at(self, path):
+        node = self._holder.children.get(_ROOT)
+        for key in path:
+            if node is None:
+                return None
+            node = node.children.get(key)
+        return node
+
+    def _update(self, path):
+        node = self._holder.children.get(_ROOT)
+        if node is None:
+            return self._replace_slot(self._holder, _ROOT)
+        for key in path:
+            if isinstance(node.template, SomeOneOf) and key == node.template.discriminator:
+                # another tag selects another variant
+                return self._replace_slot(node.parent, node.key)
+            child = node.children.get(key)
+            if child is None:
+                return self._recheck(node, key)
+            node = child
+        return self._replace_slot(node.parent, node.key)
+
+    def _container(self, node):
+        if node.parent is None:
+            return None
+        return self._get(node.path())
+
+    def _recheck(self, node, key):
+        """
+        checks a single key (or list index) of a node again
+        """
+        try:
+            container = self._container(node)
+        except (KeyError, IndexError, TypeError):
+            self._build_all()
+            return
+        kind, spec = self._resolve(node.template, container)
+        length = len(container) if kind in ("seq", "iter") else None
+        if kind != node.kind or spec is not node.spec or (node.kind == "iter" and length != node.length):
+            # the shape of the node changed (e.g. another variant or items were shifted)
+            return self._replace_slot(node.parent, node.key)
+        self._replace_slot(node, key)
+
+    def _replace_slot(self, node, key, remove_only=False):
+        before = node.slot_failed(key)
+        self._clear(node, key)
+        if not remove_only:
+            if node.kind == "holder":
+                self._build(node, key, self.document, self.template)
+            else:
+                try:
+                    container = self._container(node)
+                except (KeyError, IndexError, TypeError):
+                    self._build_all()
+                    return
+                self._check_key(node, key, container)
+        delta = node.slot_failed(key) - before
+        while node is not None:
+            node.failed += delta
+            node = node.parent
+
+    def _clear(self, node, key):
+        node.keys.pop(key, None)
+        node.leaves.pop(key, None)
+        occurrence = node.same.pop(key, None)
+        if occurrence is not None:
+            self._unregister(occurrence)
+        child = node.children.pop(key, None)
+        if child is not None:
+            self._clear_subtree(child)
+
+    def _clear_subtree(self, node):
+        for occurrence in node.same.values():
+            self._unregister(occurrence)
+        for child in node.children.values():
+            self._clear_subtree(child)
+
+    # Same names
+
+    def _register(self, node, key, template, value):
+        frozen = _freeze(value)
+        occurrence = _Occurrence(node, key, template, value, frozen)
+        node.same[key] = occurrence
+        group = self._groups.setdefault(template.name, set())
+        group.add(occurrence)
+        counts = self._counts(template.name)
+        counts[frozen] += 1
+        self._check_group(template.name)
+
+    def _unregister(self, occurrence):
+        name = occurrence.template.name
+        self._groups[name].discard(occurrence)
+        counts = self._counts(name)
+        counts[occurrence.frozen] -= 1
+        if not counts[occurrence.frozen]:
+            del counts[occurrence.frozen]
+        self._check_group(name)
+
+    def _counts(self, name) -> Counter:
+        return self._value_counts.setdefault(name, Counter())
+
+    def _check_group(self, name):
+        counts = self._counts(name)
+        if _unhashable in counts:
+            occurrences = list(self._groups[name])
+            consistent = all(o.value == occurrences[0].value for o in occurrences[1:])
+        else:
+            consistent = len(counts) <= 1
+        if consistent:
+            self._inconsistent.discard(name)
+        else:
+            self._inconsistent.add(name)
+
+    # walking
+
+    @staticmethod
+    def _resolve(template, data):
+        """
+        kind of node the template makes of the data and the template of its keys or (None, failure) if the data
+        fails before its keys are looked at
+        """
+        if type(template) is dict:
+            return ("dict", template) if isinstance(data, dict) else (None, ((), template, data))
+        if type(template) in (list, tuple):
+            if type(data) is not type(template) or len(data) != len(template):
+                return None, ((), template, data)
+            return "seq", template
+        if isinstance(template, SomeMapping) and template.each_item is not None:
+            return ("each", template) if isinstance(data, Mapping) else (None, ((), template, data))
+        if isinstance(template, SomeDict):
+            return ("somedict", template) if isinstance(data, Mapping) else (None, ((), template, data))
+        if isinstance(template, SomeIterable) and isinstance(data, (list, tuple)):
+            if not isinstance(data, template.is_type):
+                return None, ((), template, data)
+            if template.length is not None and len(data) != template.length:
+                return None, ((), template, data)
+            return "iter", template
+        if isinstance(template, SomeOneOf):
+            if isinstance(data, dict) and template.discriminator in data:
+                tag = data[template.discriminator]
+                try:
+                    variant = template.variants[tag]
+                except (KeyError, TypeError):
+                    return None, ((template.discriminator,), template, tag)
+                return IncrementalValidator._resolve(variant, data)
+            if isinstance(data, dict) and not template.fallback:
+                return None, ((template.discriminator,), template, missing)
+        return None, None
+
+    def _build(self, parent, key, data, template):
+        kind, spec = self._resolve(template, data)
+        if kind is None:
+            if spec is not None:
+                parent.leaves[key] = spec
+            elif type(template) is Same:
+                if template.some == data:
+                    self._register(parent, key, template, data)
+                else:
+                    parent.leaves[key] = ((), template, data)
+            elif not template == data:
+                parent.leaves[key] = ((), template, data)
+            return
+        node = _Node(parent, key, template, kind, spec)
+        parent.children[key] = node
+        if kind == "dict":
+            keys = list(spec)
+            keys.extend(k for k in data if k not in spec)
+        elif kind in ("seq", "iter"):
+            node.length = len(data)
+            keys = range(len(data))
+        elif kind == "each":
+            keys = data
+        else:
+            keys = list(spec.required)
+            keys.extend(k for k in spec.partial_dict if k not in spec.required)
+            if spec.allowed is not None:
+                keys.extend(k for k in data if k not in spec.allowed)
+        for k in keys:
+            self._check_key(node, k, data)
+        node.failed = sum(map(node.slot_failed, set(node.keys) | set(node.leaves) | set(node.children)))
+
+    def _check_key(self, node, key, container):
+        kind, spec = node.kind, node.spec
+        if kind == "dict":
+            if key in spec:
+                if key in container:
+                    self._build(node, key, container[key], spec[key])
+                else:
+                    node.keys[key] = [(spec[key], missing)]
+            elif key in container:
+                node.keys[key] = [(missing, container[key])]
+        elif kind in ("seq", "iter"):
+            if isinstance(key, int) and 0 <= key < len(container):
+                self._build(node, key, container[key], spec[key] if kind == "seq" else spec.arg)
+        elif kind == "each":
+            if key in container:
+                key_template, value_template = spec.each_item
+                if not key == key_template:
+                    node.keys[key] = [(key_template, key)]
+                if not _is_bare_some(value_template):
+                    self._build(node, key, container[key], value_template)
+        else:
+            absent = key in spec.required and key not in container
+            if absent:
+                node.keys[key] = [(spec.partial_dict.get(key, spec), missing)]
+            elif spec.allowed is not None and key not in spec.allowed and key in container:
+                node.keys[key] = [(missing, container[key])]
+            if key in spec.partial_dict and not absent and not _is_bare_some(spec.partial_dict[key]):
+                self._build(node, key, container.get(key, None), spec.partial_dict[key])
+
+    def _collect(self, node, out):
+        path = node.path() if node.parent is not None else ()
+        for key, failures in node.keys.items():
+            for template, value in failures:
+                out.append(Failure(path + (key,), template, value))
+        for key, (suffix, template, value) in node.leaves.items():
+            out.append(Failure((path if key is _ROOT else path + (key,)) + suffix, template, value))
+        for child in node.children.values():
+            if child.failed:
+                self._collect(child, out)
@@ -0,0 +1,376 @@
+"""
+infers templates from sample data in a single pass
+"""
+from __future__ import annotations
+
+from pysome.exceptions import InvalidArgument
+from pysome.Some import Some, SomeDict, SomeEmail, SomeIn, SomeList, SomeMapping, SomeOrNone, SomeUuid
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterable
+
+_none_type = type(None)
+# types whose distinct values are counted to find small value sets
+_enum_types = (str, int)
+
+# types are emitted in a fixed order, so the source does not depend on the order of the records
+_type_order = {t: i for i, t in enumerate((bool, int, float, str, bytes))}
+
+
+def _type_key(t):
+    return _type_order.get(t, len(_type_order)), t.__module__, t.__qualname__
+
+
+_matchers = None
+
+
+def _string_matchers():
+    global _matchers
+    if _matchers is None:
+        _matchers = (SomeUuid(case="any").compiled[0].match, SomeUuid().compiled[0].match,
+                     SomeEmail().compiled[0].match)
+    return _matchers
+
+
+class _Node:
+    """
+    statistics of all values that were seen at one path. Memory does not grow with the number of values: at most
+    `max_values` distinct values and `max_keys` keys are kept per node.
+    """
+
+    def __init__(self):
+        # number of values at this path
+        self.count = 0
+        # scalar type -> number of values of this type (including NoneType)
+        self.types = {}
+        # distinct values of str and int or None if there were more than max_values
+        self.values = {}
+        self.dicts = 0
+        # key -> _Node, None once there were more than max_keys keys and all values were merged into `each`
+        self.keys = {}
+        self.each = None
+        self.key_types = {}
+        self.lists = 0
+        self.items = None
+        # strings that are uuids (any case), lowercase uuids and email addresses
+        self.uuids = 0
+        self.lower_uuids = 0
+        self.emails = 0
+
+    def add(self, value, options):
+        self.count += 1
+        if isinstance(value, dict):
+            self.dicts += 1
+            if self.keys is None:
+                self._add_each(value, options)
+                return
+            keys = self.keys
+            for key, item in value.items():
+                node = keys.get(key)
+                if node is None:
+                    node = keys[key] = _Node()
+                node.add(item, options)
+            if len(keys) > options.max_keys:
+                self._collapse(options)
+            return
+        t = type(value)
+        if t is list:
+            self.lists += 1
+            if self.items is None:
+                self.items = _Node()
+            for item in value:
+                self.items.add(item, options)
+            return
+        self.types[t] = self.types.get(t, 0) + 1
+        if t in _enum_types:
+            self._add_value(t, value, options.max_values)
+        if t is str:
+            self._add_str(value)
+
+    def _add_value(self, t, value, max_values):
+        values = self.values.get(t, ())
+        if values is None:
+            return
+        if not values:
+            values = self.values[t] = set()
+        values.add(value)
+        if len(values) > max_values:
+            self.values[t] = None
+
+    def _add_str(self, value):
+        # a flag only has to be checked as long as all previous strings had it
+        n = self.types[str] - 1
+        if self.uuids == n or self.emails == n:
+            any_uuid, lower_uuid, email = _string_matchers()
+            if self.uuids == n and len(value) == 36 and any_uuid(value) is not None:
+                self.uuids += 1
+                if self.lower_uuids == n and lower_uuid(value) is not None:
+                    self.lower_uuids += 1
+            elif self.emails == n and email(value) is not None:
+                self.emails += 1
+
+    def _add_each(self, value, options):
+        key_types = self.key_types
+        for key, item in value.items():
+            t = type(key)
+            key_types[t] = key_types.get(t, 0) + 1
+            self.each.add(item, options)
+
+    def _collapse(self, options):
+        # too many keys, they are probably ids or names so the dict is a mapping of values with the same shape
+        each = _Node()
+        for key, node in self.keys.items():
+            t = type(key)
+            self.key_types[t] = self.key_types.get(t, 0) + node.count
+            each.merge(node, options)
+        self.keys = None
+        self.each = each
+
+    def merge(self, other: "_Node", options):
+        self.count += other.count
+        for t, n in other.types.items():
+            self.types[t] = self.types.get(t, 0) + n
+        for t, theirs in other.values.items():
+            ours = self.values.get(t, ())
+            if ours is None or theirs is None or len(set(ours) | theirs) > options.max_values:
+                self.values[t] = None
+            else:
+                self.values[t] = set(ours) | theirs
+        self.dicts += other.dicts
+        if other.keys is None and self.keys is not None:
+            self._collapse(options)
+        if self.keys is None:
+            if other.keys is not None:
+                for key, node in other.keys.items():
+                    t = type(key)
+                    self.key_types[t] = self.key_types.get(t, 0) + node.count
+                    self.each.merge(node, options)
+            else:
+                self.each.merge(other.each, options)
+                for t, n in other.key_types.items():
+                    self.key_types[t] = self.key_types.get(t, 0) + n
+        else:
+            for key, node in other.keys.items():
+                self.keys.setdefault(key, _Node()).merge(node, options)
+            if len(self.keys) > options.max_keys:
+                self._collapse(options)
+        self.lists += other.lists
+        if other.items is not None:
+            if self.items is None:
+                self.items = _Node()
+            self.items.merge(other.items, options)
+        self.uuids += other.uuids
+        self.lower_uuids += other.lower_uuids
+        self.emails += other.emails
+
+
+class _Options:
+    def __init__(self, max_values, max_keys):
+        self.max_values = max_values
+        self.max_keys = max_keys
+
+
+class Schema:
+    """
+    Schema collects the shape of any number of sample documents in a single pass and infers a template that equals
+    all of them. Per path it merges the observed types, finds optional keys and values (`SomeOrNone`), small sets of
+    repeated values (`SomeIn`), uuid and email strings and the shape of list items. Dicts with more than `max_keys`
+    keys are treated as mappings (`SomeMapping.each`). The template is available as matcher tree and as python
+    source. Schemas of different workers can be merged.
+
+    examples:
+    >>> schema = Schema()
+    >>> _ = schema.add({"id": 1, "kind": "user", "tags": ["a"]}).add({"id": 2, "kind": "user", "tags": []})
+    >>> _ = schema.add({"id": 3, "kind": "admin", "tags": None, "email": "john.doe@internet.com"})
+    >>> print(schema.source())
+    from pysome import Some, SomeDict, SomeEmail, SomeList, SomeOrNone
+    <BLANKLINE>
+    TEMPLATE = SomeDict({
+        "id": Some(int),
+        "kind": Some(str),
+        "tags": SomeOrNone(SomeList(Some(str))),
+        "email": SomeOrNone(SomeEmail()),
+    }, required=["id", "kind", "tags"])
+    >>> schema.template() == {"id": 4, "kind": "x", "tags": ["b"]}
+    True
+    """
+
+    def __init__(self, max_values: int = 10, max_keys: int = 100):
+        for name, value in (("max_values", max_values), ("max_keys", max_keys)):
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise InvalidArgument(f"{name} must be an int >= 1")
+        self._options = _Options(max_values, max_keys)
+        self._root = _Node()
+
+    @property
+    def records(self) -> int:
+        return self._root.count
+
+    def add(self, record: Any) -> "Schema":
+        self._root.add(record, self._options)
+        return self
+
+    def add_all(self, records: Iterable) -> "Schema":
+        for record in records:
+            self._root.add(record, self._options)
+        return self
+
+    def merge(self, other: "Schema") -> "Schema":
+        """
+        adds the observations of another schema (e.g. of another worker) to this one
+        """
+        self._root.merge(other._root, self._options)
+        return self
+
+    def template(self) -> Any:
+        """
+        the inferred template as matcher tree
+        """
+        return _Builder(self._options).build(self._root)[0]
+
+    def source(self, name: str = "TEMPLATE") -> str:
+        """
+        python source of a module that defines the inferred template as `name`
+        """
+        builder = _Builder(self._options)
+        _, source = builder.build(self._root)
+        lines = []
+        if builder.names:
+            lines.append(f"from pysome import {', '.join(sorted(builder.names))}")
+        lines.extend(f"import {module}" for module in sorted(builder.modules))
+        if lines:
+            lines.append("")
+        lines.append(f"{name} = {source}")
+        return "\n".join(lines)
+
+
+def infer(records: Iterable, max_values: int = 10, max_keys: int = 100) -> Schema:
+    """
+    infers a template from an iterable of sample documents, the records are consumed one by one so it can be a
+    generator over a file of any size
+
+    examples:
+    >>> template = infer({"id": i, "role": ("admin", "user")[i % 2]} for i in range(10)).template()
+    >>> template == {"id": 10, "role": "user"}, template == {"id": 11, "role": "guest"}
+    (True, False)
+    """
+    return Schema(max_values=max_values, max_keys=max_keys).add_all(records)
+
+
+class _Builder:
+    """
+    turns the nodes into a template and its source, collecting the names that have to be imported
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.names = set()
+        self.modules = set()
+
+    def call(self, name, template, args):
+        self.names.add(name)
+        return template, f"{name}({', '.join(args)})"
+
+    def build(self, node, optional=False, indent=""):
+        alternatives = []
+        types = []
+        if node.dicts:
+            alternatives.append(self.some_dict(node, indent))
+        if node.lists:
+            alternatives.append(self.some_list(node, indent))
+        for t in sorted(node.types, key=_type_key):
+            if t is _none_type:
+                continue
+            if t is str:
+                alternative = self.some_str(node)
+            elif t is int:
+                alternative = self.some_in(node, t)
+            else:
+                alternative = None
+            if alternative is None:
+                types.append(t)
+            else:
+                alternatives.append(alternative)
+        args = [source for _, source in alternatives] + [self.type_source(t) for t in types]
+        templates = [template for template, _ in alternatives] + types
+
+        if optional or _none_type in node.types:
+            if not templates:
+                return None, "None"
+            return self.call("SomeOrNone", SomeOrNone(*templates), args)
+        if not templates:
+            # e.g. the items of lists that were always empty
+            return self.call("Some", Some(), [])
+        if len(alternatives) == 1 and not types:
+            return alternatives[0]
+        return self.call("Some", Some(*templates), args)
+
+    def some_dict(self, node, indent):
+        if node.keys is None:
+            key_types = sorted(node.key_types, key=_type_key)
+            key = self.call("Some", Some(*key_types), [self.type_source(t) for t in key_types])
+            value = self.build(node.each, indent=indent)
+            self.names.add("SomeMapping")
+            return (SomeMapping.each(key[0], value[0]),
+                    f"SomeMapping.each({key[1]}, {value[1]})")
+        if not node.keys:
+            return self.call("SomeDict", SomeDict(), [])
+        inner = indent + "    "
+        partial = {}
+        lines = []
+        required = []
+        for key, child in node.keys.items():
+            template, source = self.build(child, optional=child.count < node.dicts, indent=inner)
+            partial[key] = template
+            lines.append(f"{inner}{_repr(key)}: {source},")
+            if child.count == node.dicts:
+                required.append(key)
+        source = "SomeDict({\n" + "\n".join(lines) + f"\n{indent}}}"
+        self.names.add("SomeDict")
+        if len(required) == len(partial):
+            return SomeDict(partial, required=True), source + ", required=True)"
+        if required:
+            return (SomeDict(partial, required=required),
+                    source + f", required=[{', '.join(_repr(key) for key in required)}])")
+        return SomeDict(partial), source + ")"
+
+    def some_list(self, node, indent):
+        if node.items is None or not node.items.count:
+            return self.call("SomeList", SomeList(), [])
+        template, source = self.build(node.items, indent=indent)
+        return self.call("SomeList", SomeList(template), [source])
+
+    def some_str(self, node):
+        n = node.types[str]
+        in_ = self.some_in(node, str)
+        if in_ is not None:
+            return in_
+        if node.uuids == n:
+            if node.lower_uuids == n:
+                return self.call("SomeUuid", SomeUuid(), [])
+            return self.call("SomeUuid", SomeUuid(case="any"), ['case="any"'])
+        if node.emails == n:
+            return self.call("SomeEmail", SomeEmail(), [])
+        return None
+
+    def some_in(self, node, t):
+        # only values that repeat are an enumeration, not e.g. the first few ids
+        values = node.values.get(t)
+        if not values or node.types[t] < 2 * len(values) or len(values) == 1 and node.types[t] < 3:
+            return None
+        values = sorted(values)
+        return self.call("SomeIn", SomeIn(set(values)), ["{" + ", ".join(_repr(v) for v in values) + "}"])
+
+    def type_source(self, t):
+        if t.__module__ == "builtins":
+            return t.__qualname__
+        self.modules.add(t.__module__)
+        return f"{t.__module__}.{t.__qualname__}"
+
+
+def _repr(value):
+    if isinstance(value, str):
+        # json style double quotes like most templates
+        return '"' + repr(value)[1:-1].replace('"', '\\"') + '"' if "'" not in value else repr(value)
+    return repr(value)
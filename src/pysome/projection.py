@@ -0,0 +1,298 @@
+"""
+lazy parsing of (huge) JSON documents that only materializes the parts a template looks at
+"""
+import json
+import mmap
+import os
+import re
+from typing import Any
+
+from pysome.Some import Some, SomeDict, SomeIterable, SomeMapping, SomeOneOf
+
+
+class _Skipped:
+    def __repr__(self):
+        return "<skipped>"
+
+
+# placeholder for values that were not materialized because the template does not look at them
+skipped = _Skipped()
+
+
+class _Full:
+    def __repr__(self):
+        return "FULL"
+
+
+class _Skip:
+    def __repr__(self):
+        return "SKIP"
+
+
+class _Drop:
+    def __repr__(self):
+        return "DROP"
+
+
+# materialize the whole value
+FULL = _Full()
+# do not materialize the value but keep a placeholder (e.g. because the length of a list matters)
+SKIP = _Skip()
+# do not materialize the value and drop its key
+DROP = _Drop()
+
+
+class DictProjection:
+    __slots__ = ("keys", "other")
+
+    def __init__(self, keys: dict, other=DROP):
+        self.keys = keys
+        self.other = other
+
+    def __repr__(self):
+        return f"DictProjection({self.keys}, other={self.other})"
+
+
+class ListProjection:
+    __slots__ = ("item", "items")
+
+    def __init__(self, item=FULL, items: list = None):
+        self.item = item
+        self.items = items
+
+    def __repr__(self):
+        if self.items is not None:
+            return f"ListProjection(items={self.items})"
+        return f"ListProjection({self.item})"
+
+
+def projection(template: Any):
+    """
+    derives from a template which parts of a document have to be materialized
+
+    examples:
+    >>> projection({"a": SomeDict(b=Some(int)), "c": Some()})
+    DictProjection({'a': DictProjection({'b': FULL}, other=DROP), 'c': SKIP}, other=SKIP)
+    >>> projection(SomeIterable(SomeDict(id=Some(int))))
+    ListProjection(DictProjection({'id': FULL}, other=DROP))
+    """
+    if type(template) is dict:
+        # a dict literal only equals dicts with exactly the same keys so unknown keys must be kept
+        return DictProjection({key: projection(value) for key, value in template.items()}, other=SKIP)
+    if type(template) in (list, tuple):
+        return ListProjection(items=[projection(value) for value in template])
+    if isinstance(template, SomeMapping) and template.each_item is not None:
+        # every key is checked so no key may be dropped
+        return DictProjection({}, other=projection(template.each_item[1]))
+    if isinstance(template, SomeDict):
+        # required keys only have to be present and forbidden extra keys must be kept to fail the comparison
+        keys = {key: SKIP for key in template.required}
+        keys.update((key, projection(value)) for key, value in template.partial_dict.items())
+        return DictProjection(keys, other=DROP if template.allowed is None else SKIP)
+    if isinstance(template, SomeIterable):
+        return ListProjection(projection(template.arg))
+    if isinstance(template, SomeOneOf):
+        proj = DictProjection({template.discriminator: FULL}, other=DROP)
+        for variant in template.variants.values():
+            proj = union(proj, projection(variant))
+        return proj
+    if type(template) is Some and template.types is None:
+        return SKIP
+    return FULL
+
+
+def union(a, b):
+    """
+    projection that materializes everything that a or b materializes
+    """
+    if a is DROP or a is SKIP:
+        return b if b is not DROP else a
+    if b is DROP or b is SKIP:
+        return a
+    if a is FULL or b is FULL:
+        return FULL
+    if isinstance(a, DictProjection) and isinstance(b, DictProjection):
+        keys = dict(a.keys)
+        for key, value in b.keys.items():
+            keys[key] = union(keys[key], value) if key in keys else value
+        return DictProjection(keys, other=SKIP if SKIP in (a.other, b.other) else DROP)
+    if isinstance(a, ListProjection) and isinstance(b, ListProjection) and a.items is None and b.items is None:
+        return ListProjection(union(a.item, b.item))
+    return FULL
+
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_COLON = ord(":")
+_COMMA = ord(",")
+_LBRACE = ord("{")
+_RBRACE = ord("}")
+_LBRACKET = ord("[")
+_RBRACKET = ord("]")
+
+_whitespace = re.compile(rb"[ \t\n\r]*")
+_scalar = re.compile(rb"[^,:\[\]{}\s\"]+")
+# everything up to the next bracket including complete strings that may contain brackets themselves
+_no_brackets = re.compile(rb'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+
+def _error(msg, pos):
+    return ValueError(f"invalid JSON: {msg} at byte {pos}")
+
+
+def _skip_ws(buf, pos):
+    return _whitespace.match(buf, pos).end()
+
+
+def _char(buf, pos):
+    if pos >= len(buf):
+        raise _error("unexpected end of document", pos)
+    return buf[pos]
+
+
+def _skip_string(buf, pos):
+    end = pos
+    while True:
+        end = buf.find(b'"', end + 1)
+        if end == -1:
+            raise _error("unterminated string", pos)
+        backslash = end - 1
+        while buf[backslash] == _BACKSLASH:
+            backslash -= 1
+        if (end - 1 - backslash) % 2 == 0:
+            return end + 1
+
+
+def _skip_value(buf, pos):
+    """
+    returns the end of the value starting at pos. Skipped containers are only checked for balanced brackets
+    """
+    c = _char(buf, pos)
+    if c == _QUOTE:
+        return _skip_string(buf, pos)
+    if c == _LBRACE or c == _LBRACKET:
+        start = pos
+        depth = 0
+        while True:
+            pos = _no_brackets.match(buf, pos).end()
+            if pos >= len(buf):
+                raise _error("unterminated container", start)
+            c = buf[pos]
+            if c == _QUOTE:
+                raise _error("unterminated string", pos)
+            depth += 1 if c == _LBRACE or c == _LBRACKET else -1
+            pos += 1
+            if depth == 0:
+                return pos
+    m = _scalar.match(buf, pos)
+    if m is None:
+        raise _error("unexpected character", pos)
+    return m.end()
+
+
+def _parse_key(buf, pos):
+    end = _skip_string(buf, pos)
+    raw = buf[pos + 1:end - 1]
+    if b"\\" in raw:
+        return json.loads(buf[pos:end]), end
+    return raw.decode("utf-8"), end
+
+
+def _parse(buf, pos, proj):
+    if proj is FULL:
+        end = _skip_value(buf, pos)
+        return json.loads(buf[pos:end]), end
+    if proj is SKIP or proj is DROP:
+        return skipped, _skip_value(buf, pos)
+    c = _char(buf, pos)
+    if isinstance(proj, DictProjection) and c == _LBRACE:
+        return _parse_object(buf, pos, proj)
+    if isinstance(proj, ListProjection) and c == _LBRACKET:
+        return _parse_array(buf, pos, proj)
+    # the value has another shape than the template expects so it is materialized to fail the comparison properly
+    return _parse(buf, pos, FULL)
+
+
+def _parse_object(buf, pos, proj):
+    out = {}
+    keys = proj.keys
+    other = proj.other
+    pos = _skip_ws(buf, pos + 1)
+    if _char(buf, pos) == _RBRACE:
+        return out, pos + 1
+    while True:
+        if _char(buf, pos) != _QUOTE:
+            raise _error("expected string as object key", pos)
+        key, pos = _parse_key(buf, pos)
+        pos = _skip_ws(buf, pos)
+        if _char(buf, pos) != _COLON:
+            raise _error("expected ':'", pos)
+        pos = _skip_ws(buf, pos + 1)
+        sub = keys.get(key, other)
+        if sub is DROP:
+            pos = _skip_value(buf, pos)
+        else:
+            out[key], pos = _parse(buf, pos, sub)
+        pos = _skip_ws(buf, pos)
+        c = _char(buf, pos)
+        if c == _RBRACE:
+            return out, pos + 1
+        if c != _COMMA:
+            raise _error("expected ',' or '}'", pos)
+        pos = _skip_ws(buf, pos + 1)
+
+
+def _parse_array(buf, pos, proj):
+    out = []
+    items = proj.items
+    item = proj.item
+    pos = _skip_ws(buf, pos + 1)
+    if _char(buf, pos) == _RBRACKET:
+        return out, pos + 1
+    while True:
+        if items is not None:
+            sub = items[len(out)] if len(out) < len(items) else SKIP
+        else:
+            sub = item
+        value, pos = _parse(buf, pos, sub)
+        out.append(value)
+        pos = _skip_ws(buf, pos)
+        c = _char(buf, pos)
+        if c == _RBRACKET:
+            return out, pos + 1
+        if c != _COMMA:
+            raise _error("expected ',' or ']'", pos)
+        pos = _skip_ws(buf, pos + 1)
+
+
+def loads(buffer, template: Any):
+    """
+    parses a JSON document from bytes (or any buffer like mmap) but only materializes the values the template
+    looks at. Skipped values are replaced by `skipped` or left out for keys a `SomeDict` does not mention.
+
+    examples:
+    >>> loads(b'{"a": {"b": 1, "big": [1, 2, 3]}, "c": [4, 5]}', {"a": SomeDict(b=Some(int)), "c": Some()})
+    {'a': {'b': 1}, 'c': <skipped>}
+    >>> loads(b'[{"id": 1, "x": {}}, {"id": 2}]', SomeIterable(SomeDict(id=Some(int))))
+    [{'id': 1}, {'id': 2}]
+    """
+    proj = projection(template)
+    pos = _skip_ws(buffer, 0)
+    value, pos = _parse(buffer, pos, proj)
+    if _skip_ws(buffer, pos) != len(buffer):
+        raise _error("extra data after document", pos)
+    return value
+
+
+def load(source, template: Any):
+    """
+    like `loads` but reads the document from a path or a binary file. The file is memory mapped so only the
+    materialized values are held in memory.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, "rb") as f:
+            return load(f, template)
+    if os.fstat(source.fileno()).st_size == 0:
+        raise _error("unexpected end of document", 0)
+    with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return loads(mm, template)
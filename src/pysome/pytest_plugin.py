@@ -0,0 +1,167 @@
+"""
+pytest plugin that times every `expect` call. It is registered when pysome is installed but stays inactive unless
+one of its options is given:
+
+    $ pytest --pysome-slowest=10 --pysome-budget=0.05
+
+`--pysome-slowest=N` prints the N templates with the highest total time per call site at the end of the session and
+`--pysome-budget=SECONDS` fails every test in which a single `expect` call takes longer. The cache of prepared
+templates (see `pysome.codegen`) is shared by all tests of a session, its statistics are printed with the slowest
+templates unless the "interpreted" backend (which does not use the cache) is selected.
+"""
+import os
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("pysome")
+    group.addoption("--pysome-slowest", type=int, default=0, metavar="N",
+                    help="print the N slowest templates of expect calls at the end of the session")
+    group.addoption("--pysome-budget", type=float, default=None, metavar="SECONDS",
+                    help="fail tests in which a single expect call takes longer than SECONDS")
+
+
+def pytest_configure(config):
+    slowest = config.getoption("pysome_slowest")
+    budget = config.getoption("pysome_budget")
+    if not slowest and budget is None:
+        return
+    from pysome import codegen
+    from pysome.expect import expect
+
+    timer = TemplateTimer(slowest=slowest, budget=budget, root=str(config.rootdir))
+    config.pluginmanager.register(timer, "pysome-timer")
+    expect.observers.append(timer)
+    # the statistics of the cache are those of this session
+    codegen.cache_clear()
+
+
+def pytest_unconfigure(config):
+    timer = config.pluginmanager.get_plugin("pysome-timer")
+    if timer is None:
+        return
+    from pysome.expect import expect
+
+    expect.observers.remove(timer)
+    config.pluginmanager.unregister(timer)
+
+
+class _Stats:
+    __slots__ = ("calls", "seconds", "max_seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+
+class TemplateTimer:
+    """
+    observer of `expect` calls that aggregates their durations by template signature and call site and collects the
+    calls of the running test that exceeded the budget
+    """
+
+    def __init__(self, slowest: int = 0, budget: float = None, root: str = None):
+        self.slowest = slowest
+        self.budget = budget
+        self.root = root
+        # (signature, filename, lineno) -> _Stats
+        self.stats = {}
+        # calls over budget of the running test, None outside of tests
+        self._over_budget = None
+
+    def __call__(self, observation):
+        seconds = observation.seconds
+        signature = template_signature(observation.template)
+        key = (signature, observation.filename, observation.lineno)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = _Stats()
+        stats.calls += 1
+        stats.seconds += seconds
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+        if self.budget is not None and seconds > self.budget and self._over_budget is not None:
+            self._over_budget.append(f"expect(...).{observation.method}({signature}) took {seconds:.4f}s, the budget "
+                                     f"is {self.budget}s ({self._location(key)})")
+
+    def _location(self, key):
+        _, filename, lineno = key
+        if self.root is not None:
+            try:
+                filename = os.path.relpath(filename, self.root)
+            except ValueError:
+                # e.g. another drive on windows
+                pass
+        return f"{filename}:{lineno}"
+
+    def most_expensive(self, n: int) -> list:
+        """
+        the n call sites and templates with the highest total time as (location, signature, stats)
+        """
+        ordered = sorted(self.stats.items(), key=lambda item: item[1].seconds, reverse=True)
+        return [(self._location(key), key[0], stats) for key, stats in ordered[:n]]
+
+    def pytest_runtest_setup(self, item):
+        self._over_budget = []
+
+    def pytest_runtest_teardown(self, item):
+        self._over_budget = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        # fails a passed test if one of its expect calls was over budget
+        outcome = yield
+        report = outcome.get_result()
+        if report.when == "call" and report.passed and self._over_budget:
+            report.outcome = "failed"
+            report.longrepr = "\n".join(self._over_budget)
+        if report.when == "call":
+            self._over_budget = []
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.slowest:
+            return
+        from pysome import codegen
+
+        write = terminalreporter.write_line
+        terminalreporter.write_sep("=", f"slowest {self.slowest} pysome templates")
+        for location, signature, stats in self.most_expensive(self.slowest):
+            write(f"{stats.seconds:10.4f}s {stats.calls:>8} calls  max {stats.max_seconds:.4f}s  {location}  "
+                  f"{signature}")
+        if codegen.get_backend() != "interpreted":
+            info = codegen.cache_info()
+            write(f"template cache: {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize} templates")
+
+
+def template_signature(template, length: int = 80) -> str:
+    """
+    short description of a template that does not depend on the identity of its matchers
+
+    examples:
+    >>> from pysome import Some, SomeList
+    >>> template_signature({"id": Some(int), "tags": SomeList(Some(str)), "kind": "user"})
+    "{'id': Some(int), 'tags': SomeList(Some(str)), 'kind': 'user'}"
+    >>> template_signature([Some(int)] * 30, length=20)
+    '[Some(int), Some(...'
+    """
+    from pysome.Some import Some
+
+    out = _signature(template, Some)
+    if len(out) > length:
+        return out[:length - 3] + "..."
+    return out
+
+
+def _signature(template, some):
+    t = type(template)
+    if t is dict:
+        return "{" + ", ".join(f"{key!r}: {_signature(value, some)}" for key, value in template.items()) + "}"
+    if t is list:
+        return "[" + ", ".join(_signature(value, some) for value in template) + "]"
+    if t is tuple:
+        return "(" + ", ".join(_signature(value, some) for value in template) + (",)" if len(template) == 1 else ")")
+    if isinstance(template, some):
+        return str(template)
+    return repr(template)
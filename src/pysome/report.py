@@ -0,0 +1,199 @@
+import random
+from collections import Counter
+from typing import Any, Iterable
+
+from pysome.budget import Budget
+from pysome.exceptions import BudgetExceeded
+from pysome.SameState import default_name
+from pysome.Some import Some
+from pysome.walk import Failure, find_failures, format_path, missing
+
+
+def matcher_name(template: Any) -> str:
+    """
+    short name of a template node that is used to group failures
+
+    examples:
+    >>> matcher_name(Some(int))
+    'Some(int)'
+    >>> matcher_name({"a": 1})
+    '<dict>'
+    >>> matcher_name(12)
+    '12'
+    """
+    if isinstance(template, Some):
+        return str(template)
+    if template is missing:
+        return "<unexpected key>"
+    if isinstance(template, (dict, list, tuple, set)):
+        return f"<{type(template).__name__}>"
+    return repr(template)
+
+
+class Report:
+    """
+    Report aggregates the failures of any number of records instead of raising on the first one. It counts
+    failing records per path (list indices are merged to '[*]') and failures per matcher and keeps a few
+    reservoir sampled offending values per path. Reports of different workers can be merged.
+
+    examples:
+    >>> report = Report()
+    >>> for record in [{"z-index": 1}, {"z-index": "1"}, {"z-index": 2}, {"z-index": 3}]:
+    ...     _ = report.add(record, {"z-index": Some(int)})
+    >>> report.records, report.failed, report.pass_rate
+    (4, 1, 0.75)
+    >>> report.paths
+    Counter({'$.z-index': 1})
+    >>> report.samples("$.z-index")
+    ['1']
+    """
+
+    def __init__(self, max_samples: int = 5, seed=None):
+        self.records = 0
+        self.failed = 0
+        self.paths = Counter()
+        self.matchers = Counter()
+        self.max_samples = max_samples
+        self._samples = {}
+        self._seen = Counter()
+        self._random = random.Random(seed)
+        # a MergeableState of the Same/NotSame values of the records, merged with the report
+        self.same_state = None
+
+    @property
+    def passed(self) -> int:
+        return self.records - self.failed
+
+    @property
+    def pass_rate(self) -> float:
+        if not self.records:
+            return 1.0
+        return self.passed / self.records
+
+    def failure_rate(self, path: str) -> float:
+        """
+        share of all records that failed at the given path
+        """
+        if not self.records:
+            return 0.0
+        return self.paths[path] / self.records
+
+    @property
+    def conflicts(self) -> list:
+        """
+        Same values and NotSame duplicates that conflict between the merged reports
+        """
+        if self.same_state is None:
+            return []
+        return self.same_state.conflicts
+
+    def samples(self, path: str) -> list:
+        return list(self._samples.get(path, []))
+
+    def add(self, data: Any, template: Any, budget: Budget = None) -> bool:
+        """
+        validates one record against the template and returns True if it equals. A record that exceeds the budget
+        fails as a whole, the budget is its matcher.
+        """
+        if budget is None:
+            return self.add_failures(find_failures(data, template))
+        previous = budget._start()  # noqa
+        try:
+            failures = find_failures(data, template)
+        except BudgetExceeded:
+            failures = [Failure((), budget, data)]
+        finally:
+            Budget.active = previous
+        return self.add_failures(failures)
+
+    def add_all(self, records: Iterable, template: Any) -> "Report":
+        for record in records:
+            self.add(record, template)
+        return self
+
+    def add_failures(self, failures: Iterable[Failure]) -> bool:
+        """
+        records one record with the given (already collected) failures and returns True if there were none
+        """
+        self.records += 1
+        paths = set()
+        for failure in failures:
+            path = format_path(failure.path, wildcard=True)
+            paths.add(path)
+            self.matchers[matcher_name(failure.template)] += 1
+            self._sample(path, failure.value)
+        if not paths:
+            return True
+        self.failed += 1
+        self.paths.update(paths)
+        return False
+
+    def _sample(self, path, value):
+        self._seen[path] += 1
+        samples = self._samples.setdefault(path, [])
+        if len(samples) < self.max_samples:
+            samples.append(value)
+            return
+        i = self._random.randrange(self._seen[path])
+        if i < self.max_samples:
+            samples[i] = value
+
+    def merge(self, other: "Report") -> "Report":
+        """
+        adds the counts and samples of another report (e.g. of another worker) to this one
+        """
+        for path, theirs in other._samples.items():
+            self._samples[path] = self._merge_samples(self._samples.get(path, []), self._seen[path],
+                                                      list(theirs), other._seen[path])
+        self.records += other.records
+        self.failed += other.failed
+        self.paths.update(other.paths)
+        self.matchers.update(other.matchers)
+        self._seen.update(other._seen)
+        if self.same_state is None:
+            self.same_state = other.same_state
+        elif other.same_state is not None:
+            self.same_state.merge(other.same_state)
+        return self
+
+    def _merge_samples(self, ours, n_ours, theirs, n_theirs):
+        # every remaining sample stands for n / len(samples) failures of its reservoir
+        ours = list(ours)
+        merged = []
+        while len(merged) < self.max_samples and (ours or theirs):
+            if not theirs or (ours and self._random.random() * (n_ours + n_theirs) < n_ours):
+                n_ours -= n_ours / len(ours)
+                merged.append(ours.pop(self._random.randrange(len(ours))))
+            else:
+                n_theirs -= n_theirs / len(theirs)
+                merged.append(theirs.pop(self._random.randrange(len(theirs))))
+        return merged
+
+    def __str__(self):
+        lines = [
+            f"records: {self.records}",
+            f"passed:  {self.passed} ({100 * self.pass_rate:.2f}%)",
+        ]
+        if self.paths:
+            lines.append("failures per path:")
+            width = max(len(path) for path in self.paths)
+            for path, count in self.paths.most_common():
+                samples = ", ".join(_short_repr(value) for value in self._samples.get(path, []))
+                lines.append(f"  {path:<{width}}  {count:>10}  {100 * self.failure_rate(path):>6.2f}%  e.g. {samples}")
+        if self.matchers:
+            lines.append("failures per matcher:")
+            for name, count in self.matchers.most_common():
+                lines.append(f"  {count:>10}  {name}")
+        if self.conflicts:
+            lines.append("conflicts between workers:")
+            for conflict in self.conflicts:
+                name = "" if conflict.name is default_name else repr(conflict.name)
+                lines.append(f"  {conflict.kind}({name}): {_short_repr(conflict.value)}")
+        return "\n".join(lines)
+
+
+def _short_repr(value, length=40):
+    out = repr(value)
+    if len(out) > length:
+        return out[:length - 3] + "..."
+    return out
@@ -0,0 +1,157 @@
+import re
+from collections.abc import Mapping
+from typing import Any, Iterator, NamedTuple, Tuple
+
+from pysome.budget import Budget
+from pysome.Some import Some, SomeDict, SomeIterable, SomeMapping, SomeOneOf
+from pysome.SameState import SameState
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+# placeholder for a key that is expected by the template but missing in the data (or vice versa)
+missing = _Missing()
+
+
+class Failure(NamedTuple):
+    path: Tuple
+    template: Any
+    value: Any
+
+
+def iter_failures(data: Any, template: Any, path: Tuple = ()) -> Iterator[Failure]:
+    """
+    walks the template alongside the data and yields a Failure for every node of the template that does not
+    equal the data. Unlike `template == data` it does not stop at the first mismatch.
+
+    examples:
+    >>> [format_path(f.path) for f in iter_failures({"a": 1, "b": "x"}, {"a": Some(int), "b": Some(int)})]
+    ['$.b']
+    >>> [format_path(f.path) for f in iter_failures([{"id": 1}, {"id": "2"}], SomeIterable(SomeDict(id=Some(int))))]
+    ['$[1].id']
+    >>> list(iter_failures({"a": [1, 2]}, {"a": SomeIterable(Some(int))}))
+    []
+    """
+    if type(template) is dict:
+        if not isinstance(data, dict):
+            yield Failure(path, template, data)
+            return
+        for key, value in template.items():
+            if key not in data:
+                yield Failure(path + (key,), value, missing)
+            else:
+                yield from iter_failures(data[key], value, path + (key,))
+        for key in data.keys() - template.keys():
+            yield Failure(path + (key,), missing, data[key])
+        return
+
+    if type(template) in (list, tuple):
+        if type(data) is not type(template) or len(data) != len(template):
+            yield Failure(path, template, data)
+            return
+        for i, (value, sub_template) in enumerate(zip(data, template)):
+            yield from iter_failures(value, sub_template, path + (i,))
+        return
+
+    if isinstance(template, SomeMapping) and template.each_item is not None:
+        if not isinstance(data, Mapping):
+            yield Failure(path, template, data)
+            return
+        key_template, value_template = template.each_item
+        items = data.items()
+        if Budget.active is not None:
+            items = Budget.active.items(items)
+        for key, value in items:
+            if not key == key_template:
+                yield Failure(path + (key,), key_template, key)
+            yield from iter_failures(value, value_template, path + (key,))
+        return
+
+    if isinstance(template, SomeDict):
+        if not isinstance(data, Mapping):
+            yield Failure(path, template, data)
+            return
+        absent = {key for key in template.required if key not in data}
+        for key in absent:
+            yield Failure(path + (key,), template.partial_dict.get(key, template), missing)
+        if template.allowed is not None:
+            for key in data:
+                if key not in template.allowed:
+                    yield Failure(path + (key,), missing, data[key])
+        for key, value in template.partial_dict.items():
+            if key not in absent:
+                yield from iter_failures(data.get(key, None), value, path + (key,))
+        return
+
+    if isinstance(template, SomeIterable):
+        if not isinstance(data, template.is_type):
+            yield Failure(path, template, data)
+            return
+        if template.length is not None and len(data) != template.length:
+            yield Failure(path, template, data)
+            return
+        if Budget.active is not None:
+            data = Budget.active.items(data)
+        for i, value in enumerate(data):
+            yield from iter_failures(value, template.arg, path + (i,))
+        return
+
+    if isinstance(template, SomeOneOf):
+        if isinstance(data, dict) and template.discriminator in data:
+            tag = data[template.discriminator]
+            try:
+                variant = template.variants[tag]
+            except (KeyError, TypeError):
+                yield Failure(path + (template.discriminator,), template, tag)
+                return
+            yield from iter_failures(data, variant, path)
+            return
+        if isinstance(data, dict) and not template.fallback:
+            yield Failure(path + (template.discriminator,), template, missing)
+            return
+
+    if not template == data:
+        yield Failure(path, template, data)
+
+
+def find_failures(data: Any, template: Any) -> list:
+    """
+    collects all failures of one object inside its own `Same` scope (like a single `expect(...)`)
+    """
+    Some.unequals = []
+    SameState._start()  # noqa
+    try:
+        return list(iter_failures(data, template))
+    finally:
+        SameState._end()  # noqa
+        Some.unequals = []
+
+
+_simple_key = re.compile(r"^[A-Za-z_][\w-]*$")
+
+
+def format_path(path: Tuple, wildcard: bool = False) -> str:
+    """
+    formats a path as JSON path. With wildcard=True all list indices are replaced by '*' so that the paths of
+    different list elements fall together
+
+    examples:
+    >>> format_path(("menu", "tags", 3, "z-index"))
+    '$.menu.tags[3].z-index'
+    >>> format_path(("menu", "tags", 3, "z-index"), wildcard=True)
+    '$.menu.tags[*].z-index'
+    >>> format_path(("a b", 1.5))
+    "$['a b'][1.5]"
+    """
+    out = "$"
+    for key in path:
+        if isinstance(key, int) and not isinstance(key, bool):
+            out += "[*]" if wildcard else f"[{key}]"
+        elif isinstance(key, str) and _simple_key.match(key):
+            out += "." + key
+        else:
+            out += f"[{key!r}]"
+    return out
@@ -1,7 +1,18 @@
+import multiprocessing
 import unittest
-from collections import Hashable
+from collections.abc import Hashable
 
+from pysome import *
 from pysome import default_name, SameState, Same, SameOutsideExpect
+from pysome.expect import does
+
+
+def claim_ids(state, ids):
+    previous = SameState.use(state)
+    try:
+        return [does({"id": i, "version": 1}).equal({"id": NotSame(), "version": Same()}) for i in ids]
+    finally:
+        SameState.use(previous)
 
 
 class DefaultNameTest(unittest.TestCase):
@@ -30,3 +41,49 @@ class SameStateTest(unittest.TestCase):
         SameState._end()
         with self.assertRaises(SameOutsideExpect):
             _ = same == 12
+
+
+class BackendTest(unittest.TestCase):
+    def tearDown(self):
+        SameState.use(None)
+
+    def test_not_same_is_unique(self):
+        template = [NotSame(), NotSame(), NotSame()]
+        self.assertTrue(does([1, 2, 3]).equal(template))
+        self.assertFalse(does([1, 2, 1]).equal(template))
+        self.assertFalse(does([[1], [2], [1]]).equal(template))
+        self.assertTrue(does([[1], 2, {"a": 1}]).equal(template))
+
+    def test_local_state_is_reset(self):
+        self.assertTrue(claim_ids(None, [1, 1]) == [True, True])
+
+    def test_use(self):
+        state = MergeableState()
+        previous = SameState.use(state)
+        self.assertTrue(isinstance(previous, LocalState))
+        self.assertTrue(SameState.use(None) is state)
+        self.assertTrue(isinstance(SameState.backend, LocalState))
+
+    def test_mergeable_state(self):
+        first, second = MergeableState(), MergeableState()
+        self.assertTrue(claim_ids(first, [1, 2, 2]) == [True, True, False])
+        self.assertTrue(claim_ids(second, [3, [4], 2]) == [True, True, True])
+        first.merge(second)
+        self.assertTrue([(c.kind, c.name) for c in first.conflicts] == [("NotSame", default_name)])
+        self.assertTrue(claim_ids(first, [3, [4], 5]) == [False, False, True])
+
+        other = MergeableState()
+        claim_ids(other, [])
+        self.assertTrue(other.same("version", 2))
+        first.merge(other)
+        self.assertTrue(len(first.conflicts) == 1)
+        first.clear()
+        self.assertTrue(first.conflicts == [] and first.values == {})
+
+    def test_shared_state(self):
+        with SharedState() as state, multiprocessing.Pool(2) as pool:
+            results = pool.starmap(claim_ids, [(state, range(0, 50)), (state, range(25, 75))])
+            self.assertTrue(sum(results[0]) + sum(results[1]) == 75)
+            self.assertTrue(claim_ids(state, [74, 75, [1], [1]]) == [False, True, True, False])
+            state.clear()
+            self.assertTrue(claim_ids(state, [1]) == [True])
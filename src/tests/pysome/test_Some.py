@@ -1,4 +1,14 @@
+import array
+import mmap
+import os
+import re
+import shelve
+import tempfile
 import unittest
+import uuid
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
 
 from pysome import *
 
@@ -87,6 +97,42 @@ class SomeTests(unittest.TestCase):
         with self.assertRaises(TypeError):
             _ = {Some(), Some()}
 
+    def test_pure(self):
+        self.assertTrue(Some(int, SomeIn({1}), SomeStr(regex="a"), SomeEmail(), SomeOrNone(int)).pure)
+        self.assertTrue(AllOf(int, SomeWithLen(1)).pure)
+        self.assertFalse(Some(int, lambda x: True).pure)
+        self.assertFalse(Some(int, SomeList()).pure)
+        self.assertFalse(AllOf(int, lambda x: True).pure)
+        self.assertFalse(Some(Same()).pure)
+
+    def test_adaptive(self):
+        some = Some(type(None), SomeStr(regex="[0-9]+$"), float, int, adaptive=True)
+        some.adapt_interval = 10
+        values = [None, "1", 1.5] + list(range(20))
+        for value in values:
+            self.assertTrue(some == value)
+        self.assertEqual(some.types[0], int)
+        self.assertEqual(str(some), "Some(NoneType, SomeStr(regex=[0-9]+$), float, int)")
+        for value in ("a", b"1", [1]):
+            self.assertFalse(some == value)
+        expect(values).to_be(SomeList(some))
+
+        with self.assertRaises(InvalidArgument):
+            Some(int, lambda x: True, adaptive=True)
+        with self.assertRaises(InvalidArgument):
+            Some(int, Same(), adaptive=True)
+
+    def test_adaptive_messages(self):
+        some = Some(SomeStr(regex="a"), int, adaptive=True)
+        some.adapt_interval = 1
+        for value in range(5):
+            self.assertTrue(some == value)
+        with self.assertRaises(ExpectException) as adaptive:
+            expect("b").to_be(some)
+        with self.assertRaises(ExpectException) as ordered:
+            expect("b").to_be(Some(SomeStr(regex="a"), int))
+        self.assertEqual(str(adaptive.exception), str(ordered.exception))
+
 
 class AllOfTests(unittest.TestCase):
     def test_basics(self):
@@ -270,10 +316,47 @@ class SomeDictTests(unittest.TestCase):
         with self.assertRaises(InvalidArgument):
             _ = SomeDict(12)
 
+    def test_required(self):
+        self.assertTrue(SomeDict(a=SomeOrNone(int)) == {})
+        self.assertTrue(SomeDict(a=SomeOrNone(int), required=True) != {})
+        self.assertTrue(SomeDict(a=SomeOrNone(int), required=True) == {"a": None})
+        self.assertTrue(SomeDict(a=Some(), required=True) != {"b": 1})
+        self.assertTrue(SomeDict(a=Some(), required=True) == {"a": 1, "b": 1})
+        self.assertTrue(SomeDict(a=Some(), b=Some(), required=["a"]) == {"a": 1})
+        self.assertTrue(SomeDict(a=Some(), required=["a", "c"]) != {"a": 1})
+        self.assertTrue(SomeDict(required={"c"}) == {"c": 1})
+        with self.assertRaises(InvalidArgument):
+            _ = SomeDict(a=1, required="a")
+
+    def test_extra(self):
+        self.assertTrue(SomeDict(a=Some(int), extra="forbid") == {"a": 1})
+        self.assertTrue(SomeDict(a=SomeOrNone(int), extra="forbid") == {})
+        self.assertTrue(SomeDict(a=Some(int), extra="forbid") != {"a": 1, "b": 2})
+        self.assertTrue(SomeDict(a=Some(int), extra="forbid") != {"a": "1"})
+        self.assertTrue(SomeDict(extra="forbid") == {})
+        self.assertTrue(SomeDict(extra="forbid") != {"a": 1})
+        self.assertTrue(SomeDict(a=SomeOrNone(int), extra="forbid", required=["b"]) == {"b": 1})
+        self.assertTrue(SomeDict(a=Some(int), extra="forbid", required=["b"]) != {"a": 1})
+        self.assertTrue(SomeDict(extra="allow", a=1) == {"a": 1, "b": 2})
+        self.assertTrue(SomeDict({"extra": 1}, extra="forbid") == {"extra": 1})
+        with self.assertRaises(InvalidArgument):
+            _ = SomeDict(extra="ignore")
+
+    def test_closed(self):
+        template = SomeDict(a=Some(int), b=Some(), extra="forbid", required=True)
+        self.assertTrue(template == {"a": 1, "b": None})
+        self.assertTrue(template != {"a": 1})
+        self.assertTrue(template != {"a": 1, "b": None, "c": 2})
+        self.assertTrue(template != {"a": "1", "b": None})
+        self.assertTrue(template == {"a": 1, "b": None} == {"a": Some(int), "b": Some()})
+
     def test_signature(self):
         def always_true(x):
             return True
 
+        self.assertTrue(str(SomeDict(a=1, extra="forbid", required=True)) ==
+                        "SomeDict(a=1, extra=forbid, required=True)")
+        self.assertTrue(str(SomeDict(required=["b", "a"])) == "SomeDict(required=['a', 'b'])")
         self.assertTrue(str(SomeDict()) == "SomeDict()")
         self.assertTrue(str(SomeDict({"a": Some(int), "b": Some(str)})) == "SomeDict(a=Some(int), b=Some(str))")
         self.assertTrue(str(SomeDict({"a": 12, "b": int}, c=SomeOrNone())) == "SomeDict(a=12, b=int, c=SomeOrNone())")
@@ -281,6 +364,68 @@ class SomeDictTests(unittest.TestCase):
                         "SomeDict(a=SomeList(Some(int, str, always_true)))")
 
 
+class CountingMapping(Mapping):
+    def __init__(self, data):
+        self.data = data
+        self.loaded = []
+
+    def __getitem__(self, key):
+        value = self.data[key]
+        self.loaded.append(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+
+class SomeMappingTests(unittest.TestCase):
+    def test_lazy_mapping(self):
+        data = CountingMapping({f"k{i}": i for i in range(100)})
+        self.assertTrue(SomeDict(k1=Some(int), k2=2) == data)
+        self.assertEqual(set(data.loaded), {"k1", "k2"})
+        self.assertTrue(SomeDict(k1=Some(int), k200=SomeOrNone(int)) == data)
+        self.assertTrue(SomeDict(k1=Some(), required=["k3"]) == data)
+        self.assertTrue(SomeDict(k1=Some(), required=["k200"]) != data)
+        self.assertTrue(SomeDict(k1=Some(), extra="forbid") != data)
+        self.assertTrue(SomeDict({f"k{i}": Some() for i in range(100)}, extra="forbid", required=True) == data)
+        self.assertEqual(set(data.loaded), {"k1", "k2"})
+        self.assertTrue(SomeDict(k1=Some(str)) != data)
+        self.assertTrue(SomeMapping(k1=Some(int)) == MappingProxyType({"k1": 1}))
+
+    def test_shelve(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with shelve.open(os.path.join(tmp, "store")) as store:
+                for i in range(20):
+                    store[f"user{i}"] = {"id": i, "name": f"user {i}"}
+                expect(store).to_be(SomeDict(user3=SomeDict(id=3, name=Some(str))))
+                expect(store).to_be(SomeMapping.each(SomeStr(startswith="user"), SomeDict(id=Some(int))))
+                expect(store).not_to_be(SomeMapping.each(value=SomeDict(id=SomeIn(range(10)))))
+
+    def test_each(self):
+        self.assertTrue(SomeMapping.each() == {})
+        self.assertTrue(SomeMapping.each() == {"a": 1})
+        self.assertTrue(SomeMapping.each() != [("a", 1)])
+        self.assertTrue(SomeMapping.each(Some(str), Some(int)) == {"a": 1, "b": 2})
+        self.assertTrue(SomeMapping.each(Some(str), Some(int)) != {"a": 1, 2: 2})
+        self.assertTrue(SomeMapping.each(Some(str), Some(int)) != {"a": 1, "b": "2"})
+        self.assertTrue(SomeDict(a=SomeMapping.each(value=Some(int))) == {"a": {"x": 1}})
+        data = CountingMapping({"a": 1, "b": 2})
+        self.assertTrue(SomeMapping.each(Some(str)) == data)
+        self.assertEqual(data.loaded, [])
+        self.assertTrue(SomeMapping.each(Some(str), Some(int)) == data)
+        self.assertEqual(data.loaded, ["a", "b"])
+
+    def test_signature(self):
+        self.assertTrue(str(SomeMapping(a=1)) == "SomeMapping(a=1)")
+        self.assertTrue(str(SomeMapping.each(Some(str))) == "SomeMapping.each(key=Some(str), value=Some())")
+
+
 class SomeInTests(unittest.TestCase):
     def test_alias(self):
         self.assertTrue(SomeIn is is_in)
@@ -418,7 +563,46 @@ class SomeStrTests(unittest.TestCase):
         self.assertTrue(SomeStr(startswith="py") != " pysome")
         self.assertTrue(SomeStr(startswith="py") != "pxthon")
 
+    def test_alternatives(self):
+        self.assertTrue(SomeStr(startswith=("http://", "https://")) == "https://pysome.de")
+        self.assertTrue(SomeStr(startswith=["http://", "https://"]) != "ftp://pysome.de")
+        self.assertTrue(SomeStr(endswith={".de", ".com"}) == "pysome.com")
+        self.assertTrue(SomeStr(endswith={".de", ".com"}) != "pysome.org")
+        self.assertTrue(SomeStr(regex=["[0-9]+$", "0x[0-9a-f]+$"]) == "0x1f")
+        self.assertTrue(SomeStr(regex=["[0-9]+$", "0x[0-9a-f]+$"]) == "42")
+        self.assertTrue(SomeStr(regex=["[0-9]+$", "0x[0-9a-f]+$"]) != "0x1g")
+        self.assertTrue(SomeStr(pattern=("a_", "b__")) == "ax")
+        self.assertTrue(SomeStr(pattern=("a_", "b__")) == "bxy")
+        self.assertTrue(SomeStr(pattern=("a_", "b__")) != "axy")
+
+    def test_all_conditions(self):
+        template = SomeStr(regex="[a-z]+", pattern="____.de", startswith="py", endswith=".de")
+        self.assertTrue(template == "pyso.de")
+        self.assertTrue(template != "pyso.com")
+        self.assertTrue(template != "xyso.de")
+        self.assertTrue(template != "p0so.de")
+        self.assertTrue(template != "pysome.de")
+        self.assertTrue(SomeStr(regex="[0-9]", startswith="a") != "1a")
+        self.assertTrue(SomeStr(regex=["[0-9]", "x"], pattern=["__", "___"]) == "1ab")
+        self.assertTrue(SomeStr(regex=["[0-9]", "x"], pattern=["__", "___"]) != "1abc")
+
+    def test_uncombinable_regexes(self):
+        self.assertTrue(SomeStr(regex=[r"(a)\1$", r"(b)(c)\2$"]) == "aa")
+        self.assertTrue(SomeStr(regex=[r"(a)\1$", r"(b)(c)\2$"]) == "bcc")
+        self.assertTrue(SomeStr(regex=[r"(a)\1$", r"(b)(c)\2$"]) != "bcb")
+        self.assertTrue(SomeStr(regex=["(?i)abc", "x"]) == "ABC")
+        self.assertTrue(SomeStr(regex=["(?i)abc", "x"]) != "X")
+        self.assertTrue(SomeStr(regex=["(?P<n>a)", "(?P<n>b)"]) == "b")
+        self.assertTrue(SomeStr(regex=r"(a)\1", pattern="__") == "aa")
+        self.assertTrue(SomeStr(regex=r"(a)\1", pattern="__") != "ab")
+
     def test_invalid_arguments(self):
+        with self.assertRaises(InvalidArgument):
+            _ = SomeStr(regex="(")
+        with self.assertRaises(InvalidArgument):
+            _ = SomeStr(startswith=[])
+        with self.assertRaises(InvalidArgument):
+            _ = SomeStr(startswith=["a", 1])
         with self.assertRaises(InvalidArgument):
             _ = SomeStr(regex=12)
         with self.assertRaises(InvalidArgument):
@@ -437,6 +621,7 @@ class SomeStrTests(unittest.TestCase):
         self.assertTrue(str(SomeStr(pattern="a_c")) == "SomeStr(pattern=a_c)")
         self.assertTrue(str(SomeStr(endswith="a_c")) == "SomeStr(endswith=a_c)")
         self.assertTrue(str(SomeStr(startswith="a_c")) == "SomeStr(startswith=a_c)")
+        self.assertTrue(str(SomeStr(startswith=("a", "b"))) == "SomeStr(startswith=('a', 'b'))")
 
 
 class SomeEmailTests(unittest.TestCase):
@@ -445,6 +630,10 @@ class SomeEmailTests(unittest.TestCase):
         self.assertTrue(SomeEmail() != "john.doeweb.com")
         self.assertTrue(SomeEmail() == "johdo@eweb.com")
         self.assertTrue(SomeEmail() != "j.d@ewebcom")
+        self.assertTrue(SomeEmail() != "j.d@@eweb.com")
+        self.assertTrue(SomeEmail() != "@eweb.com")
+        self.assertTrue(SomeEmail() != "x" * 10000)
+        self.assertTrue(SomeEmail() != b"john.doe@web.com")
 
     def test_signature(self):
         self.assertTrue(str(SomeEmail()) == "SomeEmail()")
@@ -458,8 +647,125 @@ class SomeUuidTests(unittest.TestCase):
         self.assertTrue(SomeUuid() != "de52743-8a1a-4782-9877-b10bf792172f")
         self.assertTrue(SomeUuid() != "not a uuid")
 
+    def test_case(self):
+        self.assertTrue(SomeUuid() != "7DE52743-8A1A-4782-9877-B10BF792172F")
+        self.assertTrue(SomeUuid(case="upper") == "7DE52743-8A1A-4782-9877-B10BF792172F")
+        self.assertTrue(SomeUuid(case="upper") != "7de52743-8a1a-4782-9877-b10bf792172f")
+        self.assertTrue(SomeUuid(case="any") == "7DE52743-8a1a-4782-9877-B10BF792172F")
+        self.assertTrue(SomeUuid(case="any") != "7DE52743-8a1a-4782-9877-B10BF792172G")
+
+    def test_version(self):
+        self.assertTrue(SomeUuid(version=4) == "7de52743-8a1a-4782-9877-b10bf792172f")
+        self.assertTrue(SomeUuid(version=4) != "7de52743-8a1a-1782-9877-b10bf792172f")
+        self.assertTrue(SomeUuid(version=4) != "7de52743-8a1a-4782-c877-b10bf792172f")
+        self.assertTrue(SomeUuid(version=1) == str(uuid.uuid1()))
+        self.assertTrue(SomeUuid(version=4, case="upper") == str(uuid.uuid4()).upper())
+        self.assertTrue(SomeUuid(version=4, case="upper") != str(uuid.uuid1()).upper())
+
+    def test_uuid_objects(self):
+        self.assertTrue(SomeUuid() == uuid.uuid4())
+        self.assertTrue(SomeUuid(case="upper") == uuid.uuid4())
+        self.assertTrue(SomeUuid(version=4) == uuid.uuid4())
+        self.assertTrue(SomeUuid(version=4) != uuid.uuid1())
+        self.assertTrue(SomeUuid(version=4) != uuid.UUID("7de52743-8a1a-4782-c877-b10bf792172f"))
+
+    def test_bytes(self):
+        self.assertTrue(SomeUuid() == b"7de52743-8a1a-4782-9877-b10bf792172f")
+        self.assertTrue(SomeUuid() == bytearray(b"7de52743-8a1a-4782-9877-b10bf792172f"))
+        self.assertTrue(SomeUuid() != b"7de52743-8a1a-4782-9877-b10bf792172")
+        self.assertTrue(SomeUuid() != uuid.uuid4().bytes)
+        self.assertTrue(SomeUuid(version=1) != b"7de52743-8a1a-4782-9877-b10bf792172f")
+
+    def test_no_partial_matches(self):
+        self.assertTrue(SomeUuid() != "7de52743-8a1a-4782-9877-b10bf792172f\n")
+        self.assertTrue(SomeUuid() != "7de52743-8a1a-4782-9877-b10bf792172f0")
+        self.assertTrue(SomeUuid() != "7de52743-8a1a-4782-9877-b10bf792172f-")
+        self.assertTrue(SomeUuid() != "7de527438a1a-4782-9877-b10bf792172f1")
+        self.assertTrue(SomeUuid() != 12)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(InvalidArgument):
+            _ = SomeUuid(version=0)
+        with self.assertRaises(InvalidArgument):
+            _ = SomeUuid(version="4")
+        with self.assertRaises(InvalidArgument):
+            _ = SomeUuid(case="mixed")
+
     def test_signature(self):
         self.assertTrue(str(SomeUuid()) == "SomeUuid()")
+        self.assertTrue(str(SomeUuid(version=4, case="any")) == "SomeUuid(version=4, case=any)")
+
+
+class SomeBytesTests(unittest.TestCase):
+    def test_basics(self):
+        self.assertTrue(SomeBytes() == b"abc")
+        self.assertTrue(SomeBytes() == bytearray(b"abc"))
+        self.assertTrue(SomeBytes() == memoryview(b"abc"))
+        self.assertTrue(SomeBytes() == array.array("i", [1, 2]))
+        self.assertTrue(SomeBytes() != "abc")
+        self.assertTrue(SomeBytes() != 42)
+        self.assertTrue(SomeBytes() != [1, 2])
+
+    def test_prefix_suffix(self):
+        self.assertTrue(SomeBytes(prefix=b"\x89PNG") == b"\x89PNG\r\n")
+        self.assertTrue(SomeBytes(prefix=b"\x89PNG") != b"\x89PN")
+        self.assertTrue(SomeBytes(prefix=b"\x89PNG") != b"PNG\x89")
+        self.assertTrue(SomeBytes(suffix=b";") == bytearray(b"abc;"))
+        self.assertTrue(SomeBytes(suffix=b";") != b"abc")
+        self.assertTrue(SomeBytes(suffix=b"abc;") != b";")
+        self.assertTrue(SomeBytes(prefix=b"a", suffix=b"c") == memoryview(b"xabcx")[1:4])
+        self.assertTrue(SomeBytes(prefix=b"", suffix=b"") == b"")
+
+    def test_regex(self):
+        self.assertTrue(SomeBytes(regex=rb"[0-9]+;") == b"123;abc")
+        self.assertTrue(SomeBytes(regex=rb"[0-9]+;") != b"abc;")
+        self.assertTrue(SomeBytes(regex=re.compile(rb"a.c$")) == bytearray(b"abc"))
+        self.assertTrue(SomeBytes(regex=rb"a.c$") != b"abcd")
+
+    def test_length(self):
+        self.assertTrue(SomeBytes(length=3) == b"abc")
+        self.assertTrue(SomeBytes(length=3) != b"ab")
+        self.assertTrue(SomeBytes(length=8) == array.array("i", [1, 2]))
+        self.assertTrue(SomeBytes(max_length=3) == b"ab")
+        self.assertTrue(SomeBytes(max_length=3) != b"abcd")
+
+    def test_mmap(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b"MAGIC" + bytes(1000) + b"END")
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.assertTrue(SomeBytes(prefix=b"MAGIC", suffix=b"END", length=1008) == mm)
+                self.assertTrue(SomeBytes(prefix=b"END") != mm)
+
+    def test_buffer_is_released(self):
+        data = bytearray(b"abc")
+        self.assertTrue(SomeBytes(prefix=b"a", regex=rb"abc") == data)
+        data.extend(b"d")
+        self.assertTrue(data == b"abcd")
+
+    def test_non_contiguous(self):
+        view = memoryview(b"abcdef")[::2]
+        self.assertTrue(SomeBytes(prefix=b"ac", suffix=b"e", length=3) == view)
+        self.assertTrue(SomeBytes(regex=rb"ace$") == view)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(InvalidArgument):
+            _ = SomeBytes(prefix="abc")
+        with self.assertRaises(InvalidArgument):
+            _ = SomeBytes(suffix="abc")
+        with self.assertRaises(InvalidArgument):
+            _ = SomeBytes(regex="abc")
+        with self.assertRaises(InvalidArgument):
+            _ = SomeBytes(regex=re.compile("abc"))
+        with self.assertRaises(InvalidArgument):
+            _ = SomeBytes(length="3")
+        with self.assertRaises(InvalidArgument):
+            _ = SomeBytes(max_length=1.5)
+
+    def test_signature(self):
+        self.assertTrue(str(SomeBytes()) == "SomeBytes()")
+        self.assertTrue(str(SomeBytes(prefix=b"ab", length=3)) == "SomeBytes(prefix=b'ab', length=3)")
+        self.assertTrue(str(SomeBytes(regex=re.compile(rb"a+"))) == "SomeBytes(regex=b'a+')")
 
 
 class SomeObjectTest(unittest.TestCase):
@@ -484,6 +790,79 @@ class SomeObjectTest(unittest.TestCase):
         expect(Foo1()).not_to_be(SomeObject(int, x=Some()))
         expect(Foo1()).to_be(SomeObject(Foo1, x=Some()))
 
+    def test_attribute_kinds(self):
+        class Base:
+            kind = "base"
+
+            def __init__(self):
+                self.x = 1
+
+            @property
+            def prop(self):
+                return self.x + 1
+
+        class Slotted:
+            __slots__ = ("x", "y")
+
+            def __init__(self):
+                self.x = 1
+
+        class Dynamic:
+            def __getattr__(self, item):
+                if item == "x":
+                    return 1
+                raise AttributeError(item)
+
+        @dataclass
+        class Data:
+            x: int
+            kind: str = "data"
+
+        template = SomeObject(x=1, kind=Some(str))
+        base = Base()
+        self.assertTrue(template == base)
+        base.kind = 12
+        self.assertTrue(template != base)
+        self.assertTrue(template == Base())
+        self.assertTrue(template == Data(1))
+        self.assertTrue(template != Data(2))
+        self.assertTrue(template != Data(1, kind=None))
+        self.assertTrue(template != Slotted())
+        self.assertTrue(template != Dynamic())
+        self.assertTrue(SomeObject(prop=2) == Base())
+        self.assertTrue(SomeObject(x=1) == Slotted())
+        self.assertTrue(SomeObject(x=1) == Dynamic())
+        self.assertTrue(SomeObject(y=Some()) != Slotted())
+        self.assertTrue(SomeObject(x=1, y=Some()) != Dynamic())
+
+        slotted = Slotted()
+        slotted.y = None
+        self.assertTrue(SomeObject(y=None) == slotted)
+        expect([Base(), Data(1), Base()]).to_be(SomeList(template))
+
+    def test_changed_class(self):
+        class Changed:
+            pass
+
+        class Child(Changed):
+            pass
+
+        changed = Changed()
+        template = SomeObject(y=1)
+        self.assertTrue(template != changed)
+        self.assertTrue(template != Child())
+        # attributes added to a class after the first comparison are found
+        Changed.y = 1
+        self.assertTrue(template == changed)
+        self.assertTrue(template == Child())
+        del Changed.y
+        Changed.y = property(lambda self: 1)
+        self.assertTrue(template == Changed())
+        Changed.y = property(lambda self: 2)
+        self.assertTrue(template != Changed())
+        del Changed.y
+        self.assertTrue(template != Changed())
+
     def test_signature(self):
         class Foo1:
             pass
@@ -491,3 +870,44 @@ class SomeObjectTest(unittest.TestCase):
         self.assertTrue(str(SomeObject(a=Some(int, str))) == "SomeObject(a=Some(int, str))")
         self.assertTrue(str(SomeObject(Foo1, a=SomeObject(b=Some(int)))) == "SomeObject(Foo1, a=SomeObject(b=Some("
                                                                             "int)))")
+
+
+class SomeOneOfTest(unittest.TestCase):
+    def test_alias(self):
+        self.assertTrue(SomeOneOf is one_of)
+
+    def test_basics(self):
+        events = SomeOneOf("type", {
+            "click": SomeDict(x=Some(int), y=Some(int)),
+            "key": SomeDict(code=Some(str)),
+            "scroll": {"type": "scroll", "delta": Some(float)},
+        })
+        self.assertTrue(events == {"type": "click", "x": 1, "y": 2})
+        self.assertTrue(events == {"type": "key", "code": "a", "x": 1})
+        self.assertTrue(events == {"type": "scroll", "delta": 1.5})
+        self.assertTrue(events != {"type": "scroll", "delta": 1.5, "x": 1})
+        self.assertTrue(events != {"type": "click", "code": "a"})
+        self.assertTrue(events != {"type": "drag"})
+        self.assertTrue(events != {"type": ["click"]})
+        self.assertTrue(events != {"x": 1, "y": 2})
+        self.assertTrue(events != [{"type": "click", "x": 1, "y": 2}])
+        expect([{"type": "click", "x": 1, "y": 2}, {"type": "key", "code": "a"}]).to_be(SomeList(events))
+
+    def test_fallback(self):
+        events = SomeOneOf("type", {"click": SomeDict(x=Some(int)), "key": SomeDict(code=Some(str))}, fallback=True)
+        self.assertTrue(events == {"x": 1})
+        self.assertTrue(events == {"code": "a"})
+        self.assertTrue(events != {"code": 1})
+        self.assertTrue(events != {"type": "drag", "x": 1})
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(InvalidArgument):
+            _ = SomeOneOf("type", [SomeDict()])
+        with self.assertRaises(InvalidArgument):
+            _ = SomeOneOf(["type"], {})
+
+    def test_signature(self):
+        self.assertTrue(str(SomeOneOf("type", {"a": SomeDict(x=Some(int))})) ==
+                        "SomeOneOf(discriminator=type, variants={a: SomeDict(x=Some(int))})")
+        self.assertTrue(str(SomeOneOf("kind", {}, fallback=True)) ==
+                        "SomeOneOf(discriminator=kind, variants={}, fallback=True)")
@@ -0,0 +1,88 @@
+import array
+import unittest
+
+from pysome import *
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class SomeArrayTest(unittest.TestCase):
+    def test_basics(self):
+        self.assertTrue(SomeArray() == np.zeros(3))
+        self.assertTrue(SomeArray() == [1, 2.5, 3])
+        self.assertTrue(SomeArray() == (1, 2))
+        self.assertTrue(SomeArray() == [])
+        self.assertTrue(SomeArray() == array.array("d", [1.0, 2.0]))
+        self.assertTrue(SomeArray() == b"abc")
+        self.assertTrue(SomeArray() != ["a", 1])
+        self.assertTrue(SomeArray() != [[1, 2], [3]])
+        self.assertTrue(SomeArray() != "abc")
+        self.assertTrue(SomeArray() != 12)
+        self.assertTrue(SomeArray() != None)  # noqa
+
+    def test_dtype(self):
+        self.assertTrue(SomeArray(dtype=int) == np.arange(3))
+        self.assertTrue(SomeArray(dtype=int) == [1, 2])
+        self.assertTrue(SomeArray(dtype=int) != [1, 2.5])
+        self.assertTrue(SomeArray(dtype=float) == np.zeros(2, dtype=np.float32))
+        self.assertTrue(SomeArray(dtype=np.float32) != np.zeros(2, dtype=np.float64))
+        self.assertTrue(SomeArray(dtype=np.uint8) == b"abc")
+        self.assertTrue(SomeArray(dtype=bool) == [True, False])
+        self.assertTrue(SomeArray(dtype=np.str_) == np.array(["a", "b"]))
+        with self.assertRaises(InvalidArgument):
+            _ = SomeArray(dtype="not a dtype")
+
+    def test_shape(self):
+        self.assertTrue(SomeArray(shape=3) == np.zeros(3))
+        self.assertTrue(SomeArray(shape=(3,)) != np.zeros(4))
+        self.assertTrue(SomeArray(shape=(None, 2)) == np.zeros((5, 2)))
+        self.assertTrue(SomeArray(shape=(None, 2)) != np.zeros((5, 3)))
+        self.assertTrue(SomeArray(shape=(None, 2)) != np.zeros(2))
+        self.assertTrue(SomeArray(shape=(2, 2)) == [[1, 2], [3, 4]])
+        with self.assertRaises(InvalidArgument):
+            _ = SomeArray(shape=[2, 2])
+
+    def test_range(self):
+        self.assertTrue(SomeArray(min=0) == np.arange(10))
+        self.assertTrue(SomeArray(min=1) != np.arange(10))
+        self.assertTrue(SomeArray(max=9) == np.arange(10))
+        self.assertTrue(SomeArray(max=8.5) != np.arange(10))
+        self.assertTrue(SomeArray(min=0, max=1) != [0.5, float("nan")])
+        self.assertTrue(SomeArray(min=0, max=1) == np.zeros(0))
+        self.assertTrue(SomeArray(min=0) != np.array(["a"]))
+
+    def test_finite(self):
+        self.assertTrue(SomeArray(finite=True) == [1.0, 2.0])
+        self.assertTrue(SomeArray(finite=True) == np.arange(3))
+        self.assertTrue(SomeArray(finite=True) != [1.0, float("inf")])
+        self.assertTrue(SomeArray(finite=True) != [1.0, float("nan")])
+        self.assertTrue(SomeArray() == [1.0, float("nan")])
+
+    def test_monotonic(self):
+        self.assertTrue(SomeArray(monotonic="increasing") == [1, 1, 2])
+        self.assertTrue(SomeArray(monotonic="strictly_increasing") != [1, 1, 2])
+        self.assertTrue(SomeArray(monotonic="strictly_increasing") == [1, 2, 3])
+        self.assertTrue(SomeArray(monotonic="decreasing") == [3, 3, 1])
+        self.assertTrue(SomeArray(monotonic="decreasing") != [3, 4, 1])
+        self.assertTrue(SomeArray(monotonic="strictly_decreasing") == [3, 2])
+        self.assertTrue(SomeArray(monotonic="increasing") == [1])
+        self.assertTrue(SomeArray(monotonic="increasing") != np.zeros((2, 2)))
+        with self.assertRaises(InvalidArgument):
+            _ = SomeArray(monotonic="up")
+
+    def test_nested(self):
+        expect({"features": np.linspace(0, 1, 1000), "id": 1}).to_be({
+            "features": SomeArray(dtype=float, shape=1000, min=0, max=1, monotonic="increasing"),
+            "id": Some(int),
+        })
+
+    def test_signature(self):
+        self.assertTrue(str(SomeArray()) == "SomeArray()")
+        self.assertTrue(str(SomeArray(dtype=float, shape=(None, 3), min=0)) ==
+                        "SomeArray(dtype=float, shape=(None, 3), min=0)")
+        self.assertTrue(str(SomeArray(finite=True, monotonic="increasing")) ==
+                        "SomeArray(finite=True, monotonic=increasing)")
@@ -0,0 +1,96 @@
+import time
+import unittest
+
+from pysome import *
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+@unittest.skipIf(pd is None, "pandas is not installed")
+class SomeDataFrameTest(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "id": [1, 2, 3, 4],
+            "score": [0.5, 1.5, None, 2.0],
+            "email": ["a@b.de", "c@d.de", None, "e@f.de"],
+            "name": ["anna", "bert", "claus", "diana"],
+            "kind": ["a", "b", "a", "b"],
+            "flag": [True, False, True, True],
+            "mixed": ["a", 1, None, 2.5],
+            "nullable": pd.array([1, None, 3, 4], dtype="Int64"),
+            "when": pd.to_datetime(["2020-01-01"] * 4),
+        })
+
+    def assertColumn(self, column, template):
+        records = self.df.to_dict("records")
+        expected = all(template == (None if pd.isna(r[column]) else r[column]) for r in records)
+        self.assertEqual(SomeDataFrame({column: template}) == self.df, expected, f"{column}: {template}")
+        return expected
+
+    def test_basics(self):
+        self.assertTrue(SomeDataFrame() == self.df)
+        self.assertTrue(SomeDataFrame() == pd.DataFrame())
+        self.assertTrue(SomeDataFrame() != {"id": [1, 2]})
+        self.assertTrue(SomeDataFrame(id=Some()) == self.df)
+        self.assertTrue(SomeDataFrame(missing=Some()) != self.df)
+        self.assertTrue(SomeDataFrame({"id": Some(int), "name": Some(str)}) == self.df)
+        with self.assertRaises(InvalidArgument):
+            _ = SomeDataFrame(["id"])
+
+    def test_types(self):
+        cases = [
+            ("id", Some(int)), ("id", Some(float)), ("id", Some(int, float)), ("id", Some(object)),
+            ("score", Some(float)), ("score", SomeOrNone(float)), ("score", SomeOrNone(int)),
+            ("email", Some(str)), ("email", SomeOrNone(str)), ("name", Some(str)), ("name", Some(int)),
+            ("flag", Some(bool)), ("flag", Some(int)), ("mixed", SomeOrNone(str, int, float)),
+            ("mixed", SomeOrNone(str, int)), ("nullable", Some(int)), ("nullable", SomeOrNone(int)),
+        ]
+        results = [self.assertColumn(column, template) for column, template in cases]
+        self.assertIn(True, results)
+        self.assertIn(False, results)
+        self.assertTrue(SomeDataFrame(when=Some(pd.Timestamp)) == self.df)
+
+    def test_matchers(self):
+        cases = [
+            ("email", SomeOrNone(SomeEmail())), ("email", SomeEmail()), ("name", SomeStr(regex="[a-c]")),
+            ("name", SomeStr(pattern="____")), ("name", SomeStr(pattern="____?")), ("name", SomeStr(endswith="a")),
+            ("name", SomeStr(startswith="a")), ("name", SomeStr()), ("id", SomeStr()),
+            ("name", SomeStr(startswith=("a", "b", "c", "d"), endswith=("a", "t", "s"))),
+            ("name", SomeStr(startswith=("a", "b", "c", "d"), endswith=("a", "t"))),
+            ("name", SomeStr(regex=["an", "b", "cl", "d"], pattern=["____", "_____"])),
+            ("name", SomeStr(regex=[r"(a)n\1", r"(b)", "c", "d"])), ("name", SomeStr(regex=[r"(a)n\1", r"(b)", "c"])),
+            ("kind", SomeIn({"a", "b"})), ("kind", SomeIn(["a"])), ("kind", SomeIn("ab")),
+            ("email", SomeIn({None, "a@b.de", "c@d.de", "e@f.de"})),
+            ("id", Some(is_even)), ("id", Some(int, is_even)), ("id", SomeOrNone(Some(int))), ("id", NotSome(str)),
+            ("kind", "a"), ("flag", True), ("id", 1),
+        ]
+        results = [self.assertColumn(column, template) for column, template in cases]
+        self.assertIn(True, results)
+        self.assertIn(False, results)
+
+    def test_ranges(self):
+        # ranges are checked by their bounds and step instead of being copied into a list
+        start = time.perf_counter()
+        huge = SomeDataFrame(id=SomeIn(range(10 ** 12)))
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertTrue(huge == self.df)
+        for column in ("id", "score", "flag", "nullable"):
+            for numbers in (range(1, 5), range(0, 10, 2), range(4, 0, -1), range(0)):
+                self.assertColumn(column, SomeIn(numbers))
+        self.assertTrue(SomeDataFrame(score=SomeIn(range(10 ** 12))) != self.df)
+        self.assertTrue(SomeDataFrame(flag=SomeIn(range(0, 10 ** 12, 2))) != self.df)
+        self.assertColumn("mixed", SomeIn(range(5)))
+
+    def test_nested(self):
+        expect({"rows": self.df}).to_be({"rows": SomeDataFrame(id=Some(int))})
+
+    def test_signature(self):
+        self.assertTrue(str(SomeDataFrame()) == "SomeDataFrame()")
+        self.assertTrue(str(SomeDataFrame(id=Some(int))) == "SomeDataFrame(id=Some(int))")
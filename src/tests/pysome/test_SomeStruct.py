@@ -0,0 +1,147 @@
+import mmap
+import random
+import struct
+import tempfile
+import time
+import unittest
+
+from pysome import *
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+FORMAT = "<IdH?x"
+NAMES = ("id", "value", "port", "ok")
+
+
+def packed_records(n, seed=0):
+    rng = random.Random(seed)
+    return [struct.pack(FORMAT, rng.randrange(10), rng.choice([0.5, 1.0, 2.5]), rng.choice([80, 443]),
+                        rng.random() < 0.9) for _ in range(n)]
+
+
+class SomeStructTest(unittest.TestCase):
+    def test_record(self):
+        header = SomeStruct("<4sHI", names=("magic", "version", "size"), fields={"magic": b"PCAP", "version": 2})
+        self.assertTrue(header == struct.pack("<4sHI", b"PCAP", 2, 1024))
+        self.assertTrue(header == bytearray(struct.pack("<4sHI", b"PCAP", 2, 0)))
+        self.assertTrue(header == memoryview(struct.pack("<4sHI", b"PCAP", 2, 0)))
+        self.assertTrue(header != struct.pack("<4sHI", b"PCAP", 3, 1024))
+        self.assertTrue(header != struct.pack("<4sHI", b"PCAP", 2, 1024) + b"\x00")
+        self.assertTrue(header != struct.pack("<4sHI", b"PCAP", 2, 1024)[:-1])
+        self.assertTrue(header != "PCAP")
+        self.assertTrue(header != 12)
+
+    def test_unnamed(self):
+        self.assertTrue(SomeStruct(">hh", fields={1: Some(lambda x: x < 0)}) == struct.pack(">hh", 1, -1))
+        self.assertTrue(SomeStruct(">hh") == struct.pack(">hh", 1, -1))
+        self.assertTrue(SomeStruct(">hh").unpack(struct.pack(">hh", 1, -1)) == {0: 1, 1: -1})
+
+    def test_many(self):
+        records = packed_records(200)
+        templates = [
+            {"id": Some(int), "value": Some(float), "ok": Some(bool)},
+            {"id": SomeIn(range(10)), "port": SomeIn({80, 443})},
+            {"id": SomeIn(range(9))},
+            {"port": 80},
+            {"value": Some(int)},
+            {"ok": True},
+            {"ok": Some(int)},
+            {"value": Some(lambda x: x > 0)},
+            {"value": Some(lambda x: x > 1)},
+            {"id": NotSome(str), "value": Some(float, int)},
+        ]
+        results = []
+        for fields in templates:
+            single = SomeStruct(FORMAT, names=NAMES, fields=fields)
+            many = SomeStruct(FORMAT, names=NAMES, fields=fields, many=True)
+            expected = all(single == record for record in records)
+            self.assertEqual(many == b"".join(records), expected, fields)
+            results.append(expected)
+        self.assertIn(True, results)
+        self.assertIn(False, results)
+
+    def test_many_shapes(self):
+        many = SomeStruct("<Ih", names=("id", "n"), fields={"n": Some(int)}, many=True)
+        self.assertTrue(many == b"")
+        self.assertTrue(many == struct.pack("<IhIh", 1, 2, 3, 4))
+        self.assertTrue(many != struct.pack("<IhIh", 1, 2, 3, 4)[:-1])
+        self.assertTrue(many != [1, 2])
+
+    def test_bool_bytes(self):
+        # struct reads every non zero byte as True
+        data = bytes([1, 2, 255])
+        self.assertTrue(SomeStruct("?", fields={0: True}) == data[1:2])
+        self.assertTrue(SomeStruct("?", fields={0: True}, many=True) == data)
+        self.assertTrue(SomeStruct("?", fields={0: Some(bool)}, many=True) == data)
+
+    def test_small_floats(self):
+        # float32 can not represent 0.1 exactly, all records must compare like single records
+        for fmt in ("<f", "<e"):
+            for template in (0.1, SomeIn({0.1, 0.2})):
+                single = SomeStruct(fmt, names=("v",), fields={"v": template})
+                many = SomeStruct(fmt, names=("v",), fields={"v": template}, many=True)
+                self.assertFalse(single == struct.pack(fmt, 0.1))
+                self.assertFalse(many == struct.pack(fmt, 0.1) * 3)
+            self.assertTrue(SomeStruct(fmt, fields={0: SomeIn({0.5, 1})}, many=True) == struct.pack(fmt, 0.5) * 3)
+
+    def test_ranges(self):
+        start = time.perf_counter()
+        many = SomeStruct("<iH", names=("a", "b"), fields={"a": SomeIn(range(-3 * 10 ** 12, 10 ** 12, 3))}, many=True)
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertTrue(many == struct.pack("<iH", -3, 1) + struct.pack("<iH", 9, 2))
+        self.assertTrue(many != struct.pack("<iH", -3, 1) + struct.pack("<iH", 10, 2))
+        self.assertTrue(SomeStruct("<f", fields={0: SomeIn(range(4))}, many=True) == struct.pack("<2f", 1, 3))
+        self.assertTrue(SomeStruct("<f", fields={0: SomeIn(range(4))}, many=True) != struct.pack("<2f", 1, 2.5))
+
+    def test_strings(self):
+        many = SomeStruct("<4sH", names=("magic", "n"), fields={"magic": SomeBytes(prefix=b"PC")}, many=True)
+        self.assertTrue(many == struct.pack("<4sH4sH", b"PCAP", 1, b"PC\x00\x00", 2))
+        self.assertTrue(many != struct.pack("<4sH4sH", b"PCAP", 1, b"XCAP", 2))
+
+    def test_native_alignment(self):
+        many = SomeStruct("@bi", names=("a", "b"), fields={"a": 1, "b": 7}, many=True)
+        self.assertTrue(many == struct.pack("@bi", 1, 7) * 3)
+        self.assertTrue(many != struct.pack("@bi", 1, 7) + struct.pack("@bi", 1, 8))
+
+    def test_mmap(self):
+        records = packed_records(1000, seed=1)
+        with tempfile.TemporaryFile() as f:
+            f.write(b"".join(records))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                expect(mm).to_be(SomeStruct(FORMAT, names=NAMES, fields={"port": SomeIn({80, 443})}, many=True))
+                expect(mm).not_to_be(SomeStruct(FORMAT, names=NAMES, fields={"ok": True}, many=True))
+
+    def test_same(self):
+        records = struct.pack("<II", 1, 5) + struct.pack("<II", 2, 5)
+        expect(records).to_be(SomeStruct("<II", names=("id", "v"), fields={"v": Same()}, many=True))
+        expect(records).not_to_be(SomeStruct("<II", names=("id", "v"), fields={"id": Same()}, many=True))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_dtype(self):
+        dtype = np.dtype([("t", "<f8"), ("id", "<u2"), ("name", "S4")])
+        array = np.zeros(3, dtype)
+        array["name"] = b"ab"
+        self.assertTrue(SomeStruct(dtype, fields={"id": Some(int), "t": 0.0}, many=True) == array)
+        self.assertTrue(SomeStruct(dtype, fields={"name": b"ab"}, many=True) == array.tobytes())
+        self.assertTrue(SomeStruct(dtype, fields={"id": 1}, many=True) != array)
+        self.assertTrue(SomeStruct(dtype, fields={"id": 0}) == array[:1].tobytes())
+        self.assertTrue(SomeStruct(dtype, fields={"id": 0}) != array.tobytes())
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(InvalidArgument):
+            _ = SomeStruct("<Z")
+        with self.assertRaises(InvalidArgument):
+            _ = SomeStruct("<II", names=("a",))
+        with self.assertRaises(InvalidArgument):
+            _ = SomeStruct("<II", names=("a", "b"), fields={"c": 1})
+        with self.assertRaises(InvalidArgument):
+            _ = SomeStruct("<II", fields=[1])
+
+    def test_signature(self):
+        self.assertTrue(str(SomeStruct("<II")) == "SomeStruct(<II)")
+        self.assertTrue(str(SomeStruct("<II", names=("a", "b"), fields={"a": Some(int)}, many=True))
+                        == "SomeStruct(<II, names=('a', 'b'), fields={a: Some(int)}, many=True)")
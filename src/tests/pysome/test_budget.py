@@ -0,0 +1,102 @@
+import time
+import unittest
+
+from pysome import *
+from pysome.codegen import get_backend, set_backend
+from pysome.expect import does
+
+TEMPLATE = SomeDict(id=Some(int), name=SomeStr(regex="(a+)+$"), tags=SomeList(Some(str)))
+
+
+def record(tags=2, name="aaa"):
+    return {"id": 1, "name": name, "tags": ["t"] * tags}
+
+
+class BudgetTest(unittest.TestCase):
+    def tearDown(self):
+        self.assertIsNone(Budget.active)
+
+    def test_within_budget(self):
+        budget = Budget(max_nodes=10, max_items=5, max_str_len=10, deadline=10)
+        expect(record(), record(tags=5), budget=budget).to_be(TEMPLATE)
+        expect(dict(record(tags=1), id="1"), budget=budget).not_to_be(TEMPLATE)
+        self.assertTrue(0 < budget.nodes <= 10)
+
+    def test_max_nodes(self):
+        with self.assertRaises(BudgetExceeded):
+            expect(record(tags=20), budget=Budget(max_nodes=10)).to_be(TEMPLATE)
+        expect(record(tags=20), budget=Budget(max_nodes=30)).to_be(TEMPLATE)
+
+    def test_max_items(self):
+        with self.assertRaises(BudgetExceeded):
+            expect(record(tags=6), budget=Budget(max_items=5)).to_be(TEMPLATE)
+        with self.assertRaises(BudgetExceeded):
+            expect(iter(range(6)), budget=Budget(max_items=5)).to_be(SomeIterable(Some(int)))
+        with self.assertRaises(BudgetExceeded):
+            expect(dict.fromkeys("abcdef", 1), budget=Budget(max_items=5)).to_be(SomeMapping.each(Some(str)))
+        expect(iter(range(5)), budget=Budget(max_items=5)).to_be(SomeIterable(Some(int)))
+
+    def test_max_str_len(self):
+        # a backtracking regex on a long string is refused before it runs
+        hostile = "a" * 5000 + "!"
+        start = time.perf_counter()
+        with self.assertRaises(BudgetExceeded):
+            expect(record(name=hostile), budget=Budget(max_str_len=100)).to_be(TEMPLATE)
+        self.assertLess(time.perf_counter() - start, 1)
+        with self.assertRaises(BudgetExceeded):
+            expect(b"x" * 11, budget=Budget(max_str_len=10)).to_be(SomeBytes(regex=b"x+"))
+        expect("x" * 11, budget=Budget(max_str_len=10)).to_be(SomeStr(startswith="x"))
+        with self.assertRaises(BudgetExceeded):
+            expect("a" * 100_000 + "@x.de", budget=Budget(max_str_len=10)).to_be(SomeEmail())
+        expect("a@x.de", budget=Budget(max_str_len=10)).to_be(SomeEmail())
+
+    def test_deadline(self):
+        def slow(x):
+            time.sleep(0.01)
+            return True
+
+        with self.assertRaises(BudgetExceeded):
+            expect(list(range(100)), budget=Budget(deadline=0.05)).to_be(SomeList(Some(slow)))
+        with self.assertRaises(BudgetExceeded):
+            expect((i for i in range(100)), budget=Budget(deadline=0.05)).to_be(SomeIterable(Some(slow)))
+
+    def test_state_is_reset(self):
+        with self.assertRaises(BudgetExceeded):
+            expect([1, 1], budget=Budget(max_nodes=1)).to_be([Same(), Same()])
+        self.assertFalse(SameState._allow["Same"])
+        expect([1, 2]).not_to_be([Same(), Same()])
+
+    def test_nested(self):
+        outer = Budget(max_nodes=100)
+        inner = Budget(max_nodes=5)
+
+        def nested(x):
+            return does(x, budget=inner).equal(SomeList(Some(int)))
+
+        expect([[1, 2], [3]], budget=outer).to_be(SomeList(Some(nested)))
+        self.assertTrue(outer.nodes > 0)
+
+    def test_report(self):
+        budget = Budget(max_items=3)
+        report = expect(record(), record(tags=4), dict(record(tags=1), id="1"), budget=budget).report(TEMPLATE)
+        self.assertEqual((report.records, report.failed), (3, 2))
+        self.assertEqual(report.matchers["Budget(max_items=3)"], 1)
+
+    def test_codegen(self):
+        backend = get_backend()
+        set_backend("codegen")
+        try:
+            with self.assertRaises(BudgetExceeded):
+                expect(record(tags=6), budget=Budget(max_items=5)).to_be(TEMPLATE)
+            expect(record(tags=6)).to_be(TEMPLATE)
+        finally:
+            set_backend(backend)
+
+    def test_invalid_arguments(self):
+        for kwargs in ({"max_nodes": -1}, {"max_items": 1.5}, {"max_str_len": True}, {"deadline": 0},
+                       {"deadline": "1"}):
+            with self.assertRaises(InvalidArgument):
+                Budget(**kwargs)
+        with self.assertRaises(InvalidArgument):
+            expect(1, budget=10)
+        self.assertEqual(repr(Budget(max_nodes=1, deadline=0.5)), "Budget(max_nodes=1, deadline=0.5)")
@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from pysome import *
+from pysome.cli import main, split_file, iter_lines, validate_file, load_template
+
+TEMPLATE = SomeDict(id=Some(int), tags=SomeList(Some(str)))
+UNIQUE = SomeDict(id=NotSame(), version=Same(int, name="version"))
+
+
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".ndjson")
+        with os.fdopen(fd, "w") as f:
+            for i in range(100):
+                record = {"id": i, "tags": ["a", "b"]}
+                if i % 10 == 0:
+                    record["id"] = str(i)
+                if i % 25 == 0:
+                    record["tags"].append(1)
+                f.write(json.dumps(record) + "\n")
+            f.write("\n")
+            f.write("{not json\n")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_load_template(self):
+        self.assertTrue(load_template("tests.pysome.test_cli:TEMPLATE") is TEMPLATE)
+        with self.assertRaises(InvalidArgument):
+            load_template("tests.pysome.test_cli")
+
+    def test_split_file(self):
+        with open(self.path, "rb") as f:
+            content = f.read()
+        for parts in (1, 2, 3, 7, 500):
+            ranges = split_file(self.path, parts)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], len(content))
+            lines = [line for start, end in ranges for line in iter_lines(content, start, end)]
+            self.assertEqual(len(lines), 101)
+
+    def test_validate_file(self):
+        for workers in (1, 3):
+            report = validate_file("tests.pysome.test_cli:TEMPLATE", self.path, workers=workers)
+            self.assertEqual(report.records, 101)
+            self.assertEqual(report.failed, 10 + 2 + 1)
+            self.assertEqual(report.paths, {"$.id": 10, "$.tags[*]": 4, "$": 1})
+            self.assertEqual(report.matchers["<valid JSON>"], 1)
+
+    def test_max_errors(self):
+        report = validate_file("tests.pysome.test_cli:TEMPLATE", self.path, max_errors=3)
+        self.assertEqual(report.failed, 3)
+        report = validate_file("tests.pysome.test_cli:TEMPLATE", self.path, workers=2, max_errors=3)
+        self.assertTrue(report.failed <= 4)
+
+    def test_main(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(["validate", "tests.pysome.test_cli:TEMPLATE", self.path])
+        self.assertEqual(code, 1)
+        self.assertIn("$.tags[*]", out.getvalue())
+        self.assertIn("records/s", out.getvalue())
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(["validate", "tests.pysome.test_cli:TEMPLATE", self.path, "--fail-fast"])
+        self.assertEqual(code, 1)
+        self.assertIn("records: 1\n", out.getvalue())
+
+    def test_same(self):
+        with open(self.path, "w") as f:
+            for i in range(100):
+                f.write(json.dumps({"id": i % 90, "version": 1}) + "\n")
+        for workers in (1, 3):
+            report = validate_file("tests.pysome.test_cli:UNIQUE", self.path, workers=workers)
+            self.assertEqual(report.failed, 0)
+            report = validate_file("tests.pysome.test_cli:UNIQUE", self.path, workers=workers, same="shared")
+            self.assertEqual(report.failed, 10)
+            self.assertEqual(report.paths, {"$.id": 10})
+            report = validate_file("tests.pysome.test_cli:UNIQUE", self.path, workers=workers, same="merge")
+            self.assertEqual(report.failed + len(report.conflicts), 10)
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(["validate", "tests.pysome.test_cli:UNIQUE", self.path, "--workers", "2", "--same", "merge"])
+        self.assertEqual(code, 1)
+        self.assertIn("conflicts between workers:\n  NotSame(): ", out.getvalue())
+        with self.assertRaises(InvalidArgument):
+            validate_file("tests.pysome.test_cli:UNIQUE", self.path, same="global")
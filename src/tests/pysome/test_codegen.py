@@ -0,0 +1,304 @@
+import gc
+import os
+import unittest
+from collections import OrderedDict
+
+from pysome import *
+from pysome import codegen
+from pysome.codegen import cache_clear, cache_info, compile_template, get_backend, set_backend, set_cache_size
+from pysome.exceptions import InvalidArgument, MustReturnBool
+
+TEMPLATE = {
+    "users": SomeList(SomeDict(
+        id=Some(int),
+        name=SomeOrNone(str),
+        email=SomeEmail(),
+        role=SomeIn({"admin", "user"}),
+        tags=SomeList(SomeStr(startswith=("a", "b"))),
+        event=SomeOneOf("type", {"click": SomeDict(x=Some(int)), "key": {"type": "key", "code": Some(str)}}),
+        extra="forbid",
+        required=["id"],
+    )),
+    "counts": SomeMapping.each(Some(str), AllOf(int, lambda x: x >= 0)),
+    "pair": [1, Some(int, str, lambda x: x is None)],
+}
+
+
+def document():
+    return {
+        "users": [{"id": 1, "name": None, "email": "a@b.de", "role": "admin", "tags": ["a", "bb"],
+                   "event": {"type": "click", "x": 1}},
+                  {"id": 2, "name": "b", "email": "c@d.de", "role": "user", "tags": [],
+                   "event": {"type": "key", "code": "Enter"}}],
+        "counts": {"a": 1, "b": 0},
+        "pair": [1, None],
+    }
+
+
+class EqualsEverything:
+    def __eq__(self, other):
+        return True
+
+
+class CompileTemplateTest(unittest.TestCase):
+    def test_equal(self):
+        self.assertTrue(compile_template(TEMPLATE)(document()))
+
+    def test_not_equal(self):
+        changes = [
+            lambda doc: doc["users"][0].update(id="1"),
+            lambda doc: doc["users"][0].update(unknown=1),
+            lambda doc: doc["users"][0].pop("id"),
+            lambda doc: doc["users"][1].update(role="guest"),
+            lambda doc: doc["users"][1]["tags"].append("c"),
+            lambda doc: doc["users"][1].update(email="x"),
+            lambda doc: doc["users"][0]["event"].update(type="scroll"),
+            lambda doc: doc["users"][1]["event"].update(x=1),
+            lambda doc: doc["counts"].update(c=-1),
+            lambda doc: doc.update(pair=[1, 2.5]),
+            lambda doc: doc.update(pair=[1]),
+            lambda doc: doc.update(other=1),
+        ]
+        check = compile_template(TEMPLATE)
+        for change in changes:
+            doc = document()
+            change(doc)
+            self.assertFalse(check(doc))
+            self.assertFalse(TEMPLATE == doc)
+
+    def test_exact(self):
+        # the generated function gives the same result as the interpreted path
+        nan = float("nan")
+        cases = [
+            (SomeOneOf("type", {"a": SomeDict(x=Some(int))}, fallback=True), [{"x": 1}, {"x": "1"}, {"type": [1]}]),
+            (SomeOneOf("type", {"a": SomeDict(x=Some(int))}), [{"x": 1}, {"type": {}}]),
+            ([nan, {"a": nan}], [[nan, {"a": nan}], [float("nan"), {"a": nan}]]),
+        ]
+        for template, values in cases:
+            check = compile_template(template)
+            for value in values:
+                self.assertEqual(check(value), template == value)
+        with self.assertRaises(MustReturnBool):
+            compile_template(Some(lambda x: 1))(1)
+
+    def test_cache_and_source(self):
+        check = compile_template(TEMPLATE)
+        self.assertIs(compile_template(TEMPLATE), check)
+        self.assertIn("type(x) is not dict", check.source)
+        self.assertIn("for ", check.source)
+
+    def test_deep_template(self):
+        template = Some(int)
+        value = 1
+        for i in range(40):
+            template = SomeList(SomeDict(a=template)) if i % 2 else [template]
+            value = [{"a": value}] if i % 2 else [value]
+        self.assertTrue(compile_template(template)(value))
+
+    def test_delegated(self):
+        # types the generated code does not specialize on are compared with ==
+        template = SomeDict(a=Some(int), b=SomeIterable(Some(int)))
+        self.assertTrue(compile_template(template)(OrderedDict(a=1, b=(i for i in [1]))))
+        self.assertFalse(compile_template(template)(OrderedDict(a=1, b=(i for i in ["1"]))))
+        self.assertTrue(compile_template({"a": SomeDict(b=Some(int))})({"a": {"b": 1}}))
+        self.assertTrue(compile_template(SomeDict(a=Some(int)))({"a": EqualsEverything()}))
+
+    def test_adaptive(self):
+        some = Some(SomeStr(regex="a"), SomeIn({None}), int, adaptive=True)
+        some.adapt_interval = 10
+        check = compile_template([SomeList(some)])
+        self.assertTrue(check([list(range(20)) + ["a", None]]))
+        self.assertFalse(check([[1.5]]))
+        self.assertEqual(some.types[0], int)
+
+
+class BackendTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = get_backend()
+        set_backend("codegen")
+
+    def tearDown(self):
+        set_backend(self.backend)
+
+    def test_invalid_backend(self):
+        with self.assertRaises(InvalidArgument):
+            set_backend("jit")
+
+    def test_expect(self):
+        expect(document()).to_be(TEMPLATE)
+        doc = document()
+        doc["users"][1]["tags"] = [1]
+        with self.assertRaises(ExpectException):
+            expect(doc).to_be(TEMPLATE)
+        expect(doc).not_to_be(TEMPLATE)
+
+    def test_error_messages(self):
+        doc = {"a": [1, "2"]}
+        messages = []
+        for backend in ("interpreted", "codegen"):
+            set_backend(backend)
+            with self.assertRaises(ExpectException) as context:
+                expect(doc).to_be({"a": SomeList(Some(int))})
+            messages.append(str(context.exception))
+        self.assertEqual(messages[0], messages[1])
+
+    def test_same(self):
+        template = SomeList(SomeDict(team=Same(), id=NotSame()))
+        expect([{"team": 1, "id": 1}, {"team": 1, "id": 2}]).to_be(template)
+        expect([{"team": 1, "id": 1}, {"team": 2, "id": 2}]).not_to_be(template)
+        expect([{"team": 1, "id": 1}, {"team": 1, "id": 1}]).not_to_be(template)
+
+    def test_must_return_bool(self):
+        with self.assertRaises(MustReturnBool):
+            expect([1]).to_be(SomeList(Some(str, lambda x: 1)))
+
+    def test_iterator_is_consumed_once(self):
+        expect(iter([1, 2])).to_be(SomeIterable(Some(int)))
+        expect(x for x in "ab").not_to_be(SomeIterable(Some(int)))
+
+    def test_validator_exception(self):
+        calls = []
+
+        def fails(x):
+            calls.append(x)
+            raise KeyError(x)
+
+        for backend in ("interpreted", "codegen"):
+            set_backend(backend)
+            calls.clear()
+            with self.assertRaises(KeyError):
+                expect([1]).to_be([Some(fails)])
+            self.assertEqual(calls, [1])
+
+    def test_read_once(self):
+        class Counter:
+            reads = 0
+
+            @property
+            def x(self):
+                Counter.reads += 1
+                return -1
+
+        set_backend("codegen")
+        with self.assertRaises(ExpectException):
+            expect({"a": Counter(), "b": (x for x in "ab")}).to_be({"a": SomeObject(x=Some(int)),
+                                                                   "b": SomeIterable(Some(int))})
+        self.assertEqual(Counter.reads, 1)
+        with self.assertRaises(ExpectException) as context:
+            expect({"a": 1, "b": (x for x in "ab")}).to_be({"a": 1, "b": SomeIterable(Some(int))})
+        self.assertIn("SomeIterable(Some(int)) does not equal", str(context.exception))
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = get_backend()
+        self.compile_after = codegen.compile_after
+        cache_clear()
+
+    def tearDown(self):
+        set_backend(self.backend)
+        codegen.compile_after = self.compile_after
+        set_cache_size(256)
+        cache_clear()
+
+    def test_literals(self):
+        # literals that are rebuilt on every call share one function
+        check = compile_template({"id": Some(int), "tags": [SomeOrNone(str), 1]})
+        self.assertIs(compile_template({"id": Some(int), "tags": [SomeOrNone(str), 1]}), check)
+        self.assertEqual(cache_info().hits, 1)
+        self.assertIsNot(compile_template({"id": Some(int), "tags": [SomeOrNone(str), True]}), check)
+        self.assertIsNot(compile_template({"id": Some(int), "tags": (SomeOrNone(str), 1)}), check)
+        self.assertTrue(compile_template([1, {"a": 3}])([1, {"a": 3}]))
+        # unhashable values are not cached
+        compile_template([{1, 2}])
+        self.assertEqual(cache_info().currsize, 4)
+
+    def test_changed_literal(self):
+        for backend in ("codegen", "auto"):
+            set_backend(backend)
+            codegen.compile_after = 1
+            template = {"a": Some(int), "b": [Some(int)]}
+            expect({"a": 1, "b": [1]}).to_be(template)
+            template["a"] = Some(str)
+            template["b"].append(1)
+            with self.assertRaises(ExpectException):
+                expect({"a": 1, "b": [1]}).to_be(template)
+            expect({"a": "1", "b": [1, 1]}).to_be(template)
+            # the function of the first template does not change with it
+            expect({"a": 1, "b": [1]}).to_be({"a": Some(int), "b": [Some(int)]})
+
+    def test_matchers(self):
+        # common matchers are cached by structure, others by identity
+        check = compile_template(SomeList(SomeDict(a=Some(int), b=[1]), length=2))
+        self.assertIs(compile_template(SomeList(SomeDict(a=Some(int), b=[1]), length=2)), check)
+        self.assertIsNot(compile_template(SomeList(SomeDict(a=Some(int), b=[1]), length=3)), check)
+        self.assertIsNot(compile_template(SomeList(SomeDict(a=Some(int), b=[1], required=True), length=2)), check)
+        template = SomeStr(regex="a")
+        check = compile_template(template)
+        self.assertIs(compile_template(template), check)
+        self.assertIsNot(compile_template(SomeStr(regex="a")), check)
+        self.assertEqual(cache_info().currsize, 5)
+
+    def test_weak_reference(self):
+        set_backend("auto")
+        template = SomeIn({1, 2})
+        expect(1).to_be(template)
+        self.assertEqual(cache_info().currsize, 1)
+        # matchers that were not compiled yet are not kept alive by the cache
+        del template
+        gc.collect()
+        self.assertEqual(cache_info().currsize, 0)
+
+    def test_size(self):
+        set_cache_size(2)
+        for i in range(3):
+            compile_template([i])
+        compile_template([2])
+        self.assertEqual(cache_info(), codegen.CacheInfo(hits=1, misses=3, maxsize=2, currsize=2))
+        compile_template([0])
+        self.assertEqual(cache_info().misses, 4)
+        with self.assertRaises(InvalidArgument):
+            set_cache_size(0)
+
+    def test_auto(self):
+        set_backend("auto")
+        codegen.compile_after = 3
+        template = {"id": Some(int)}
+        for i in range(5):
+            expect({"id": i}).to_be(template)
+            self.assertEqual(codegen._cache.entries[codegen._key(template)].function is not None, i >= 2)
+        with self.assertRaises(ExpectException):
+            expect({"id": "1"}).to_be(template)
+        self.assertEqual(expect.cache_info(), codegen.CacheInfo(hits=5, misses=1, maxsize=256, currsize=1))
+
+    def test_validator_calls(self):
+        calls = []
+
+        def positive(x):
+            calls.append(x)
+            return x > 0
+
+        messages = []
+        for backend in ("interpreted", "codegen"):
+            set_backend(backend)
+            calls.clear()
+            expect({"a": 1}).to_be({"a": Some(positive)})
+            with self.assertRaises(ExpectException) as context:
+                expect({"a": -1, "b": [2, -2]}).to_be({"a": Some(positive), "b": SomeIterable(Some(positive))})
+            # the messages of a failing compiled comparison do not call the validators again
+            self.assertEqual(calls, [1, -1])
+            messages.append(str(context.exception))
+        self.assertEqual(messages[0], messages[1])
+
+    def test_default_backend(self):
+        if "PYSOME_BACKEND" not in os.environ:
+            self.assertEqual(self.backend, "auto")
+            # expect looks up every template in the cache
+            expect(1).to_be(Some(int))
+            expect(2).to_be(Some(int))
+            self.assertEqual(cache_info(), codegen.CacheInfo(hits=1, misses=1, maxsize=256, currsize=1))
+
+    def test_interpreted(self):
+        set_backend("interpreted")
+        expect(1).to_be(Some(int))
+        self.assertEqual(expect.cache_info().currsize, 0)
@@ -0,0 +1,103 @@
+import unittest
+from collections import defaultdict
+
+from pysome import *
+from pysome.columnar import contains_same, records_checker
+
+ROWS = [
+    {"id": i, "name": f"user{i % 5}", "email": None if i % 2 else "a@b.de", "kind": "ab"[i % 2],
+     "tags": ["x", "y"][:i % 3], "nested": {"score": i / 2, "flag": i % 2 == 0}}
+    for i in range(100)
+]
+
+
+class ColumnarTest(unittest.TestCase):
+    def assertSameResult(self, template, rows):
+        expected = all(template == row for row in rows)
+        self.assertEqual(SomeList(template) == rows, expected)
+        self.assertEqual(SomeList(template, columnar=True) == rows, expected)
+        if records_checker(template)(rows):
+            self.assertTrue(expected)
+        return expected
+
+    def test_templates(self):
+        templates = [
+            SomeDict(id=Some(int), name=Some(str)),
+            SomeDict(id=Some(str)),
+            SomeDict(email=SomeOrNone(str), kind=SomeIn({"a", "b"})),
+            SomeDict(kind=SomeIn({"a"})),
+            SomeDict(tags=SomeList(SomeStr(pattern="_"))),
+            SomeDict(tags=SomeList(SomeStr(pattern="x"))),
+            SomeDict(tags=SomeList(length=2)),
+            SomeDict(nested=SomeDict(score=Some(float, int), flag=Some(bool))),
+            SomeDict(nested=SomeDict(score=Some(float))),
+            SomeDict(nested={"score": Some(float, int), "flag": Some(int)}),
+            SomeDict(nested={"score": Some()}),
+            SomeDict(missing=None),
+            SomeDict(missing=Some(int)),
+            SomeDict(id=Some(lambda x: x < 100)),
+            SomeDict(id=Some(lambda x: x < 50)),
+            SomeDict(id=NotSome(str), name=AllOf(str, SomeStr(startswith="user"))),
+            Some(dict),
+            SomeDict(),
+            SomeDict(id=Some(), name=Some(), email=Some(), kind=Some(), tags=Some(), nested=Some(), extra="forbid"),
+            SomeDict(id=Some(), name=Some(), email=Some(), kind=Some(), extra="forbid"),
+            SomeDict(id=Some(int), required=["name", "tags"]),
+            SomeDict(nested=SomeDict(score=Some(), required=["flag"])),
+            SomeDict(nested=SomeDict(score=Some(), required=True, extra="forbid")),
+            SomeDict(nested=SomeDict(score=Some(), flag=Some(bool), required=True, extra="forbid")),
+        ]
+        results = [self.assertSameResult(template, ROWS) for template in templates]
+        self.assertIn(True, results)
+        self.assertIn(False, results)
+
+    def test_shapes(self):
+        template = SomeDict(id=Some(int))
+        self.assertSameResult(template, [])
+        self.assertSameResult(template, [{"id": 1}, None])
+        self.assertSameResult(template, [{"id": 1}, [("id", 1)]])
+        self.assertSameResult({"id": Some(int)}, [{"id": 1}, {"id": 2, "x": 3}])
+        self.assertSameResult({"id": Some(int)}, [{"id": 1}, {"id": 2}])
+        self.assertSameResult(Some(int), [1, 2, True])
+        self.assertSameResult(Some(int), [1, 2.0])
+        self.assertSameResult(1, [1, 1.0, True])
+        self.assertSameResult(SomeDict(a=SomeIterable(Some(int))), [{"a": (1, 2)}, {"a": iter([1, 2])}])
+        frames = [b"\x01abc", bytearray(b"\x01de"), memoryview(bytearray(b"\x01f")), memoryview(b"\x02")]
+        self.assertSameResult(SomeBytes(prefix=b"\x01"), frames)
+        self.assertSameResult(SomeBytes(prefix=b"\x01"), frames[:3])
+
+    def test_pure(self):
+        # pure matchers (including custom ones) are only compared once per distinct value
+        calls = []
+
+        class SomeShort(Some):
+            _pure_validator = True
+
+            def __init__(self):
+                super().__init__(lambda x: calls.append(x) or len(x) < 10)
+
+        class SomeLogged(SomeShort):
+            _pure_validator = False
+
+        rows = [{"name": f"user{i % 5}"} for i in range(100)]
+        self.assertTrue(records_checker(SomeDict(name=SomeShort()))(rows))
+        self.assertEqual(len(calls), 5)
+        calls.clear()
+        self.assertTrue(records_checker(SomeDict(name=SomeLogged()))(rows))
+        self.assertEqual(len(calls), 100)
+        self.assertSameResult(SomeDict(name=AllOf(str, SomeWithLen(5))), rows)
+
+    def test_defaultdict(self):
+        rows = [defaultdict(int, id=1), defaultdict(int)]
+        self.assertTrue(SomeList(SomeDict(id=Some(int, type(None))), columnar=True) == rows)
+        self.assertTrue("id" not in rows[1])
+
+    def test_same(self):
+        self.assertTrue(contains_same(SomeDict(id=SomeObject(x=NotSame()))))
+        self.assertFalse(contains_same(SomeDict(id=SomeObject(x=Some()))))
+        expect([{"v": 1}, {"v": 1}]).to_be(SomeList(SomeDict(v=Same()), columnar=True))
+        expect([{"v": 1}, {"v": 2}]).not_to_be(SomeList(SomeDict(v=Same()), columnar=True))
+
+    def test_signature(self):
+        self.assertTrue(str(SomeList(Some(int), columnar=True)) == "SomeList(Some(int), columnar=True)")
+        self.assertTrue(str(SomeIterable(columnar=True)) == "SomeIterable(Some(), columnar=True)")
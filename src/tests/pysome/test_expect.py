@@ -235,6 +235,26 @@ class TestExpect(unittest.TestCase):
 
         })
 
+    def test_observers(self):
+        observations = []
+        expect.observers.append(observations.append)
+        try:
+            template = {"a": Some(int)}
+            expect({"a": 1}).to_be(template).not_to_be({"a": Some(str)})
+            with self.assertRaises(ExpectException):
+                expect({"a": "1"}).to_be(template)
+            expect({"a": "1"}, {"a": 2}).report(template)
+        finally:
+            expect.observers.remove(observations.append)
+        self.assertEqual([(o.method, o.passed) for o in observations],
+                         [("to_be", True), ("not_to_be", True), ("to_be", False), ("report", True)])
+        self.assertIs(observations[0].template, template)
+        self.assertEqual(observations[0].filename, __file__)
+        self.assertEqual(observations[1].lineno, observations[0].lineno)
+        self.assertTrue(all(o.seconds >= 0 for o in observations))
+        expect(1).to_be(Some(int))
+        self.assertEqual(len(observations), 4)
+
 
 class TestDoes(unittest.TestCase):
     def test_basics(self):
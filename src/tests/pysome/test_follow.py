@@ -0,0 +1,118 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from pysome import *
+from pysome.cli import main
+from pysome.follow import Follower
+
+EVENT = SomeDict(id=Some(int), kind=SomeIn({"click", "key"}))
+
+
+class FollowerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "events.log")
+        self.state = os.path.join(self.dir.name, "events.state")
+        self.windows = []
+        self.write([1, 2, "3"])
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, ids, mode="a", path=None):
+        with open(path or self.path, mode) as f:
+            for i in ids:
+                f.write(json.dumps({"id": i, "kind": "click"}) + "\n")
+
+    def follower(self, **kwargs):
+        kwargs.setdefault("state_file", self.state)
+        return Follower(EVENT, self.path, interval=3600, on_flush=self.windows.append, **kwargs)
+
+    def test_follow(self):
+        with self.follower() as follower:
+            self.assertEqual(follower.poll(), 0)
+            self.write([4, "5"])
+            with open(self.path, "a") as f:
+                f.write('{"id": 6, "kind": "cli')
+            self.assertEqual(follower.poll(), 2)
+            with open(self.path, "a") as f:
+                f.write('ck"}\n{not json\n')
+            self.assertEqual(follower.poll(), 2)
+            follower.flush()
+        self.assertEqual((self.windows[0].records, self.windows[0].failed), (4, 2))
+        self.assertEqual(self.windows[0].paths, {"$.id": 1, "$": 1})
+
+    def test_from_start(self):
+        with self.follower(from_start=True) as follower:
+            self.assertEqual(follower.poll(), 3)
+            self.assertEqual(follower.window.failed, 1)
+
+    def test_checkpoint(self):
+        with self.follower(from_start=True) as follower:
+            follower.poll()
+            follower.flush()
+        self.write([4, 5])
+        with self.follower(from_start=True) as follower:
+            self.assertEqual(follower.poll(), 2)
+        # a checkpoint of another file (e.g. rotated while the follower was not running) starts at the beginning
+        os.rename(self.path, self.path + ".1")
+        self.write([6])
+        with self.follower() as follower:
+            self.assertEqual(follower.poll(), 1)
+        with self.assertRaises(InvalidArgument):
+            Follower(EVENT, self.path + ".1", state_file=self.state)
+
+    def test_rotation(self):
+        with self.follower() as follower:
+            self.write([4])
+            with open(self.path, "a") as f:
+                f.write('{"id": 5, "kind": "key"}')
+            os.rename(self.path, self.path + ".1")
+            self.assertEqual(follower.poll(), 1)
+            # the last line of the rotated file has no line break, it is complete once there is a new file
+            self.write([6, 7, 8])
+            self.assertEqual(follower.poll(), 4)
+            os.remove(self.path)
+            self.assertEqual(follower.poll(), 0)
+            self.write([9])
+            self.assertEqual(follower.poll(), 1)
+            self.assertEqual(follower.window.records, 6)
+
+    def test_truncation(self):
+        with self.follower() as follower:
+            self.write([4, 5, 6, 7])
+            self.assertEqual(follower.poll(), 4)
+            self.write(["8"], mode="w")
+            self.assertEqual(follower.poll(), 1)
+            self.assertEqual(follower.window.failed, 1)
+            follower.flush()
+        with open(self.state) as f:
+            self.assertEqual(json.load(f)["offset"], os.path.getsize(self.path))
+
+    def test_missing_file(self):
+        os.remove(self.path)
+        with self.follower() as follower:
+            self.assertEqual(follower.poll(), 0)
+            self.write([1, 2])
+            self.assertEqual(follower.poll(), 2)
+
+    def test_run(self):
+        follower = Follower(EVENT, self.path, interval=0.01, from_start=True, on_flush=self.windows.append)
+        with follower:
+            follower.run(duration=0.1, poll_interval=0.01)
+        self.assertTrue(len(self.windows) > 1)
+        self.assertEqual((follower.total.records, follower.total.failed), (3, 1))
+
+    def test_cli(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(["follow", "tests.pysome.test_follow:EVENT", self.path, "--from-start", "--duration", "0.1",
+                         "--interval", "0.05", "--state", self.state])
+        self.assertEqual(code, 1)
+        self.assertIn("records: 3, failed: 1", out.getvalue())
+        self.assertIn("$.id", out.getvalue())
+        self.assertTrue(os.path.exists(self.state))
@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from pysome import *
+from pysome.cli import main
+from pysome.generate import _regex_generator
+
+USER = SomeDict(
+    id=NotSame(int),
+    uid=SomeUuid(version=4),
+    email=SomeEmail(),
+    role=SomeIn({"admin", "user", "guest"}),
+    name=SomeOrNone(str),
+    team=Same(str),
+    tags=SomeList(SomeStr(regex="[a-z]{2,5}(-[0-9]+)?"), length=3),
+    scores=SomeMapping.each(Some(str), AllOf(int, lambda x: x >= 0)),
+    event=SomeOneOf("type", {"click": SomeDict(x=Some(int)), "key": {"type": "key", "code": Some(str)}}),
+    extra="forbid",
+    required=True,
+)
+
+
+class GenerateTest(unittest.TestCase):
+    def test_conforming(self):
+        records = DataGenerator([USER, USER], seed=1).batch(500)
+        expect(*records).to_be([USER, USER])
+        self.assertEqual({record[0]["team"] == record[1]["team"] for record in records}, {True})
+        self.assertEqual(len({record[0]["role"] for record in records}), 3)
+
+    def test_seed(self):
+        self.assertEqual(DataGenerator(USER, seed=3).batch(20), DataGenerator(USER, seed=3).batch(20))
+        self.assertNotEqual(DataGenerator(USER, seed=3).batch(20), DataGenerator(USER, seed=4).batch(20))
+        self.assertEqual(list(generate(USER, 5, seed=2)), DataGenerator(USER, seed=2).batch(5))
+
+    def test_matchers(self):
+        templates = [
+            Some(), Some(int, float, bool), SomeOrNone(bytes), SomeWithLen(min_length=2, max_length=4),
+            SomeIterable(Some(int), is_type=tuple), SomeStr(startswith=("a", "b"), endswith=".de"),
+            SomeStr(pattern="ab_d"), SomeUuid(case="upper"), SomeBytes(prefix=b"\x89PNG", max_length=20),
+            SomeBytes(regex=b"[0-9]+;"), NotSome(int, str), Some(lambda x: x == "2020-01-01"), {"a": (1, [2])},
+        ]
+        for template in templates:
+            expect(*DataGenerator(template, seed=0).batch(50)).to_be(template)
+
+    def test_regex(self):
+        import random
+        import re
+
+        rng = random.Random(0)
+        for regex in (r"\d{3}-\w+", r"[^a-z]+x", r"(a|bc)+\1", r"(?:[A-F]{2}){1,3}\s?\.$", r"a.c*?d", r"[一-鿿]+",
+                      r"(?P<x>y)?(?(x)z|w)", r"(?i)abc"):
+            generate = _regex_generator(regex)
+            for _ in range(20):
+                self.assertTrue(re.match(regex, generate(rng)), regex)
+
+    def test_impossible(self):
+        for template in (SomeIn([]), Some(lambda x: x == 12345), AllOf(int, str), SomeObject(x=Some(int))):
+            with self.assertRaises(InvalidArgument):
+                DataGenerator(template).batch(1)
+
+    def test_write_ndjson(self):
+        out = io.StringIO()
+        size = DataGenerator(USER, seed=1).write_ndjson(out, 25, batch_size=10)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(size, len(out.getvalue().encode()))
+        expect(*map(json.loads, lines)).to_be(USER)
+
+    def test_cli(self):
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        os.close(fd)
+        try:
+            out = io.StringIO()
+            with redirect_stdout(out):
+                code = main(["generate", "tests.pysome.test_generate:USER", "--count", "100", "--seed", "1",
+                             "--output", path])
+                self.assertEqual(code, 0)
+                self.assertEqual(main(["validate", "tests.pysome.test_generate:USER", path]), 0)
+            self.assertIn("records: 100", out.getvalue())
+        finally:
+            os.remove(path)
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import pysome
+
+# upper bound for `import pysome` in microseconds as measured by `python -X importtime`, loading all matchers
+# eagerly took about twice as long even with cached bytecode
+IMPORT_BUDGET = 10_000
+# modules that must not be imported by `import pysome` or by the core matchers
+HEAVY_MODULES = {"inspect", "typing", "re", "uuid", "weakref", "linecache", "numpy", "pandas"}
+
+
+def run_python(code):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(pysome.__file__)))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=root, capture_output=True,
+                            text=True, check=True)
+    return result.stdout, result.stderr
+
+
+def cumulative_import_time(stderr, module):
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.rsplit("|", 1)[1].strip() == module:
+            return int(line.split("|")[1])
+    raise AssertionError(f"{module} was not imported")
+
+
+class ImportTest(unittest.TestCase):
+    def test_import_time(self):
+        # the first run writes the bytecode (if allowed), the best of a few runs is measured
+        times = [cumulative_import_time(run_python("import pysome")[1], "pysome") for _ in range(3)]
+        self.assertLess(min(times), IMPORT_BUDGET)
+
+    def test_no_heavy_imports(self):
+        code = ("import sys\n"
+                "before = set(sys.modules)\n"
+                "{}\n"
+                "print(' '.join(sorted(set(sys.modules) - before)))")
+        for statement in ("import pysome", "from pysome import Some, SomeDict, SomeList, Same, expect"):
+            imported = set(run_python(code.format(statement))[0].split())
+            self.assertEqual(imported & HEAVY_MODULES, set(), statement)
+
+    def test_lazy_attributes(self):
+        stdout, _ = run_python("import pysome, pysome.walk\n"
+                               "print(pysome.Some.__name__, pysome.expect.__name__, 'SomeStruct' in dir(pysome))")
+        self.assertEqual(stdout.split(), ["Some", "expect", "True"])
+        with self.assertRaises(AttributeError):
+            pysome.not_a_matcher  # noqa
@@ -0,0 +1,150 @@
+import copy
+import random
+import unittest
+
+from pysome import *
+from pysome.incremental import IncrementalValidator, parse_pointer, supports
+from pysome.walk import find_failures, missing
+
+USERS = {"users": SomeList(SomeDict(id=Some(int), name=SomeOrNone(str), tags=SomeList(Some(str)))),
+         "meta": {"version": Some(int)}}
+
+
+def document(size=3):
+    return {"users": [{"id": i, "name": "u", "tags": ["a"]} for i in range(size)], "meta": {"version": 1}}
+
+
+def failure_keys(failures):
+    return sorted((f.path, repr(f.value)) for f in failures)
+
+
+class IncrementalValidatorTest(unittest.TestCase):
+    def assertConsistent(self, validator):
+        expected = find_failures(validator.document, validator.template)
+        self.assertEqual(validator.valid, not expected)
+        self.assertEqual(failure_keys(validator.failures()), failure_keys(expected))
+
+    def test_initial(self):
+        doc = document()
+        doc["users"][1]["tags"].append(1)
+        validator = IncrementalValidator(doc, USERS)
+        self.assertFalse(validator.valid)
+        self.assertEqual([f.path for f in validator.failures()], [("users", 1, "tags", 1)])
+
+    def test_update(self):
+        doc = document()
+        validator = IncrementalValidator(doc, USERS)
+        doc["users"][0]["id"] = "0"
+        self.assertFalse(validator.update(("users", 0, "id")).valid)
+        doc["users"][0] = {"id": 0, "name": None, "tags": []}
+        self.assertTrue(validator.update("/users/0").valid)
+        del doc["meta"]["version"]
+        validator.update(("meta", "version"))
+        self.assertEqual([(f.path, f.value) for f in validator.failures()], [(("meta", "version"), missing)])
+        doc["meta"] = {"version": 2}
+        self.assertTrue(validator.update(("meta",)).valid)
+
+    def test_apply(self):
+        validator = IncrementalValidator(document(), USERS)
+        validator.apply([{"op": "replace", "path": "/users/1/name", "value": 1}])
+        self.assertEqual([f.path for f in validator.failures()], [("users", 1, "name")])
+        # inserting before the failing item shifts its path
+        validator.apply([{"op": "add", "path": "/users/0", "value": {"id": 9, "name": "x", "tags": []}}])
+        self.assertEqual([f.path for f in validator.failures()], [("users", 2, "name")])
+        validator.apply([{"op": "remove", "path": "/users/2"}])
+        self.assertTrue(validator.valid)
+        validator.apply([{"op": "move", "from": "/users/0/id", "path": "/meta/version"}])
+        self.assertEqual([f.path for f in validator.failures()], [("users", 0, "id")])
+        validator.apply([{"op": "copy", "from": "/meta/version", "path": "/users/0/id"}])
+        self.assertTrue(validator.valid)
+        self.assertEqual(validator.document["users"][0]["id"], 9)
+        self.assertConsistent(validator)
+
+    def test_apply_errors(self):
+        validator = IncrementalValidator(document(), USERS)
+        validator.apply([{"op": "test", "path": "/meta/version", "value": 1}])
+        with self.assertRaises(ValueError):
+            validator.apply([{"op": "test", "path": "/meta/version", "value": 2}])
+        with self.assertRaises(ValueError):
+            validator.apply([{"op": "rename", "path": "/meta"}])
+
+    def test_same(self):
+        template = {"users": SomeList(SomeDict(team=Same(name="team"))), "team": Same(name="team")}
+        doc = {"users": [{"team": "a"}, {"team": "a"}], "team": "a"}
+        validator = IncrementalValidator(doc, template)
+        self.assertTrue(validator.incremental)
+        self.assertTrue(validator.valid)
+        validator.apply([{"op": "replace", "path": "/users/1/team", "value": "b"}])
+        self.assertEqual([(f.path, f.value) for f in validator.failures()], [(("users", 1, "team"), "b")])
+        validator.apply([{"op": "replace", "path": "/users/1/team", "value": "a"}])
+        self.assertTrue(validator.valid)
+        validator.apply([{"op": "replace", "path": "/team", "value": "b"}])
+        self.assertFalse(validator.valid)
+        # the first occurrence in path order binds the name
+        self.assertEqual([f.path for f in validator.failures()], [("users", 0, "team"), ("users", 1, "team")])
+        validator.apply([{"op": "replace", "path": "/users", "value": []}])
+        self.assertTrue(validator.valid)
+
+    def test_not_incremental(self):
+        template = {"a": Some(int), "b": NotSame(), "c": NotSame()}
+        self.assertFalse(supports(template))
+        validator = IncrementalValidator({"a": 1, "b": 1, "c": 2}, template)
+        self.assertFalse(validator.incremental)
+        self.assertTrue(validator.valid)
+        self.assertFalse(validator.apply([{"op": "replace", "path": "/c", "value": 1}]).valid)
+
+    def test_one_of(self):
+        template = SomeList(SomeOneOf("kind", {"a": SomeDict(id=Some(int)), "b": SomeDict(tags=SomeList(Some(str)))}))
+        validator = IncrementalValidator([{"kind": "a", "id": 1}, {"kind": "b", "tags": ["x"]}], template)
+        self.assertTrue(validator.valid)
+        validator.apply([{"op": "replace", "path": "/0/kind", "value": "b"}])
+        self.assertEqual([(f.path, f.value) for f in validator.failures()], [((0, "tags"), None)])
+        self.assertConsistent(validator)
+        validator.apply([{"op": "add", "path": "/0/tags", "value": []}])
+        self.assertTrue(validator.valid)
+        validator.apply([{"op": "replace", "path": "/1/kind", "value": "c"}])
+        self.assertConsistent(validator)
+
+    def test_closed_dict(self):
+        template = SomeDict(a=Some(int), b=SomeOrNone(str), extra="forbid", required=["a"])
+        validator = IncrementalValidator({"a": 1}, template)
+        validator.apply([{"op": "add", "path": "/c", "value": 1}])
+        self.assertEqual([(f.path, f.value) for f in validator.failures()], [(("c",), 1)])
+        validator.apply([{"op": "remove", "path": "/c"}, {"op": "remove", "path": "/a"}])
+        self.assertEqual([(f.path, f.value) for f in validator.failures()], [(("a",), missing)])
+        validator.apply([{"op": "add", "path": "/b", "value": "x"}, {"op": "add", "path": "/a", "value": 1}])
+        self.assertTrue(validator.valid)
+
+    def test_parse_pointer(self):
+        doc = {"a": [{"b/c": 1, "d~e": 2}], "": 3}
+        self.assertEqual(parse_pointer(doc, ""), ())
+        self.assertEqual(parse_pointer(doc, "/a/0/b~1c"), ("a", 0, "b/c"))
+        self.assertEqual(parse_pointer(doc, "/a/0/d~0e"), ("a", 0, "d~e"))
+        self.assertEqual(parse_pointer(doc, "/a/-"), ("a", 1))
+        self.assertEqual(parse_pointer(doc, "/"), ("",))
+        with self.assertRaises(ValueError):
+            parse_pointer(doc, "a")
+
+    def test_random_patches(self):
+        rng = random.Random(7)
+        values = [1, "x", None, [], ["a", 1], {"id": 1, "name": "u", "tags": []}, {"id": "1", "tags": ["a"]}]
+        for _ in range(20):
+            validator = IncrementalValidator(document(5), USERS)
+            for _ in range(30):
+                users = validator.document["users"]
+                index = rng.randrange(len(users) + 1)
+                operation = rng.choice(["add", "remove", "replace", "field"])
+                if operation == "add" or not users:
+                    patch = {"op": "add", "path": f"/users/{index}", "value": copy.deepcopy(rng.choice(values))}
+                elif operation == "remove":
+                    patch = {"op": "remove", "path": f"/users/{index % len(users)}"}
+                elif operation == "replace":
+                    patch = {"op": "replace", "path": f"/users/{index % len(users)}",
+                             "value": copy.deepcopy(rng.choice(values))}
+                elif isinstance(users[index % len(users)], dict):
+                    patch = {"op": "add", "path": f"/users/{index % len(users)}/{rng.choice(['id', 'name', 'tags'])}",
+                             "value": copy.deepcopy(rng.choice(values))}
+                else:
+                    continue
+                validator.apply([patch])
+                self.assertConsistent(validator)
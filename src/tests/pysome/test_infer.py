@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+import uuid
+from contextlib import redirect_stdout
+
+from pysome import *
+from pysome.cli import main
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(8 if depth < 3 else 5)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.randrange(-5, 5)
+    if kind == 2:
+        return rng.choice(["a", "b", str(uuid.UUID(int=rng.getrandbits(128))), "x@y.de", "Ä'\"\\"])
+    if kind == 3:
+        return rng.random()
+    if kind == 4:
+        return rng.random() < 0.5
+    if kind == 5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(3))]
+    return {rng.choice("abcd"): random_value(rng, depth + 1) for _ in range(rng.randrange(4))}
+
+
+def evaluate(source, name="TEMPLATE"):
+    namespace = {}
+    exec(source, namespace)
+    return namespace[name]
+
+
+class InferTest(unittest.TestCase):
+    def test_infer(self):
+        records = [{"id": str(uuid.uuid4()), "n": i, "kind": ("a", "b", "c")[i % 3], "email": f"u{i}@x.de",
+                    "tags": [{"name": "t", "score": i / 2}] if i % 2 else [], "parent": None if i % 4 else i}
+                   for i in range(30)]
+        for record in records[::5]:
+            del record["email"]
+        schema = infer(iter(records))
+        self.assertEqual(schema.records, 30)
+        template = schema.template()
+        expect(*records).to_be(template)
+        self.assertEqual(schema.source(), """\
+from pysome import Some, SomeDict, SomeEmail, SomeIn, SomeList, SomeOrNone, SomeUuid
+
+TEMPLATE = SomeDict({
+    "id": SomeUuid(),
+    "n": Some(int),
+    "kind": SomeIn({"a", "b", "c"}),
+    "tags": SomeList(SomeDict({
+        "name": SomeIn({"t"}),
+        "score": Some(float),
+    }, required=True)),
+    "parent": SomeOrNone(int),
+    "email": SomeOrNone(SomeEmail()),
+}, required=["id", "n", "kind", "tags", "parent"])""")
+        expect(dict(records[1], kind="d")).not_to_be(template)
+        expect(dict(records[1], id="1")).not_to_be(template)
+
+    def test_random(self):
+        rng = random.Random(7)
+        for _ in range(30):
+            records = [random_value(rng) for _ in range(rng.randrange(1, 20))]
+            schema = infer(records, max_values=3, max_keys=3)
+            template = schema.template()
+            expect(*records).to_be(template)
+            expect(*records).to_be(evaluate(schema.source()))
+            self.assertEqual(str(evaluate(schema.source())), str(template))
+
+    def test_merge(self):
+        rng = random.Random(3)
+        records = [random_value(rng) for _ in range(200)]
+        whole = infer(records, max_values=3, max_keys=3)
+        merged = infer(records[:70], max_values=3, max_keys=3).merge(infer(records[70:], max_values=3, max_keys=3))
+        self.assertEqual(merged.records, 200)
+        self.assertEqual(merged.source(), whole.source())
+
+    def test_mapping(self):
+        records = [{"users": {f"user{i}": {"age": i} for i in range(j, j + 30)}} for j in range(5)]
+        schema = infer(records, max_keys=20)
+        self.assertIn("SomeMapping.each(Some(str), SomeDict({", schema.source())
+        expect(*records).to_be(schema.template())
+        expect({"users": {"x": {"age": "1"}}}).not_to_be(schema.template())
+
+    def test_bounded(self):
+        schema = infer({"id": i, "name": f"user {i}"} for i in range(10_000))
+        node = schema._root.keys["id"]  # noqa
+        self.assertIsNone(node.values[int])
+        self.assertIn('"name": Some(str)', schema.source())
+
+    def test_edge_cases(self):
+        self.assertEqual(infer([]).source(), "from pysome import Some\n\nTEMPLATE = Some()")
+        self.assertEqual(infer([None, None]).source(), "TEMPLATE = None")
+        self.assertIn("TEMPLATE = SomeList()", infer([[], []]).source())
+        self.assertIn("Some(int, str)", infer([1, "a", 2, "b"]).source())
+        self.assertIn("import decimal", infer([__import__("decimal").Decimal(1)]).source())
+        with self.assertRaises(InvalidArgument):
+            Schema(max_values=0)
+
+    def test_cli(self):
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        try:
+            with os.fdopen(fd, "w") as f:
+                for i in range(10):
+                    f.write(json.dumps({"id": i}) + "\n")
+                f.write("{not json\n")
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main(["infer", path, "--name", "USER"]), 0)
+            self.assertIn("# inferred from 10 records", out.getvalue())
+            self.assertIn("USER = SomeDict({", out.getvalue())
+            evaluate(out.getvalue(), "USER")
+        finally:
+            os.remove(path)
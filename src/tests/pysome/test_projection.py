@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pysome import *
+from pysome.projection import load, loads, projection, skipped, FULL, SKIP, DROP
+
+DOCUMENT = {
+    "menu": {
+        "tags": [
+            {"id": 1, "z-index": 12, "blob": {"x": [1, 2, {"y": "]}"}]}},
+            {"id": 2, "name": "a\"x\\7"},
+            {"id": 5, "name": "ax7", "z-index": 12},
+        ],
+        "randomInt": 4562,
+        "labels": {"en": {"name": "name"}, "de": {"name": "Name", "add": "hinzufügen"}},
+    },
+    "big": [[1.5e3, -2, True, False, None, "\\\\"]] * 10,
+}
+
+
+class ProjectionTest(unittest.TestCase):
+    def test_projection(self):
+        self.assertTrue(projection(Some(int)) is FULL)
+        self.assertTrue(projection(Some()) is SKIP)
+        self.assertTrue(projection(Same()) is FULL)
+        proj = projection(SomeDict(a=Some(), b={"c": SomeList(Some(int))}))
+        self.assertTrue(proj.other is DROP)
+        self.assertTrue(proj.keys["a"] is SKIP)
+        self.assertTrue(proj.keys["b"].other is SKIP)
+        self.assertTrue(proj.keys["b"].keys["c"].item is FULL)
+
+    def test_closed_dict(self):
+        proj = projection(SomeDict(a=Some(int), required=["b"]))
+        self.assertTrue(proj.keys["b"] is SKIP)
+        self.assertTrue(proj.other is DROP)
+        self.assertTrue(projection(SomeDict(a=Some(int), extra="forbid")).other is SKIP)
+
+    def test_one_of(self):
+        proj = projection(SomeOneOf("type", {"a": SomeDict(x=Some(int)), "b": {"type": "b", "y": Some()}}))
+        self.assertTrue(proj.keys["type"] is FULL)
+        self.assertTrue(proj.keys["x"] is FULL)
+        self.assertTrue(proj.keys["y"] is SKIP)
+        self.assertTrue(proj.other is SKIP)
+
+
+class LoadsTest(unittest.TestCase):
+    def check(self, template, pretty=False):
+        raw = json.dumps(DOCUMENT, indent=2 if pretty else None).encode()
+        projected = loads(raw, template)
+        self.assertEqual(template == DOCUMENT, template == projected)
+        return projected
+
+    def test_same_result(self):
+        templates = [
+            {"menu": Some(dict), "big": Some()},
+            {"menu": SomeDict(tags=SomeList(SomeDict(id=Some(int)))), "big": SomeList()},
+            {"menu": SomeDict(tags=SomeList(SomeDict(id=Some(str)))), "big": SomeList()},
+            SomeDict(menu=SomeDict(labels=SomeDict(de=SomeDict(add=Some(str))))),
+            SomeDict(menu=SomeDict(labels=SomeDict(de=SomeDict(add=Some(int))))),
+            SomeDict(menu=SomeDict(labels=SomeList())),
+            SomeDict(menu=SomeDict(tags=[SomeDict(id=1), Some(), SomeDict(name="ax7")])),
+            SomeDict(menu=SomeDict(tags=[SomeDict(id=1), Some()])),
+            SomeDict(big=SomeList(SomeList(length=6), length=10)),
+            {"menu": Some()},
+            SomeDict(menu=SomeOneOf("randomInt", {4562: SomeDict(tags=SomeList(SomeDict(id=Some(int))))})),
+            SomeDict(menu=SomeOneOf("randomInt", {4562: SomeDict(tags=SomeList(SomeDict(id=Some(str))))})),
+            SomeDict(menu=SomeOneOf("randomInt", {1: SomeDict(tags=SomeList(SomeDict(id=Some(int))))})),
+            Some(dict),
+            SomeList(),
+            SomeDict(menu=SomeDict(tags=Some(), randomInt=Some(), labels=Some(), extra="forbid")),
+            SomeDict(menu=SomeDict(tags=Some(), randomInt=Some(), extra="forbid")),
+            SomeDict(menu=SomeDict(labels=SomeDict(en=Some()), required=["tags", "randomInt"])),
+            SomeDict(menu=SomeDict(labels=SomeDict(fr=Some(), required=True))),
+            SomeDict(menu=SomeDict(labels=SomeMapping.each(Some(str), SomeDict(name=Some(str))))),
+            SomeDict(menu=SomeDict(labels=SomeMapping.each(SomeIn({"en"})))),
+        ]
+        for template in templates:
+            self.check(template)
+            self.check(template, pretty=True)
+
+    def test_materializes_only_template(self):
+        projected = loads(json.dumps(DOCUMENT).encode(), SomeDict(menu=SomeDict(tags=SomeList(SomeDict(id=Some(int))))))
+        self.assertEqual(projected, {"menu": {"tags": [{"id": 1}, {"id": 2}, {"id": 5}]}})
+
+        projected = loads(json.dumps(DOCUMENT).encode(), {"menu": Some(), "big": SomeList()})
+        self.assertTrue(projected["menu"] is skipped)
+        self.assertEqual(projected["big"], [skipped] * 10)
+
+    def test_escaped_keys(self):
+        raw = json.dumps({"a\"b": 1, "ü": 2}).encode()
+        self.assertEqual(loads(raw, SomeDict({"a\"b": Some(int), "ü": 2})), {"a\"b": 1, "ü": 2})
+
+    def test_invalid(self):
+        for raw in [b"", b"{", b'{"a" 1}', b'{"a": 1', b'[1, 2', b'{"a": "x}', b'{"a": 1} x', b'[1 2]']:
+            with self.assertRaises(ValueError):
+                loads(raw, SomeDict(a=Some()))
+
+
+class LoadTest(unittest.TestCase):
+    def test_file(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(DOCUMENT, f)
+            template = SomeDict(menu=SomeDict(randomInt=Some(int)))
+            self.assertEqual(load(path, template), {"menu": {"randomInt": 4562}})
+            with open(path, "rb") as f:
+                self.assertEqual(load(f, template), {"menu": {"randomInt": 4562}})
+            expect(load(path, template)).to_be(template)
+        finally:
+            os.remove(path)
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import pysome
+
+try:
+    import pytest
+except ImportError:  # pragma: no cover
+    pytest = None
+
+TESTS = '''
+import time
+
+from pysome import Some, SomeList, expect
+
+
+def slow(x):
+    time.sleep(0.05)
+    return True
+
+
+def test_fast():
+    for i in range(100):
+        expect({"a": i}).to_be({"a": Some(int)})
+
+
+def test_slow():
+    expect([1]).to_be(SomeList(Some(slow)))
+'''
+
+
+@unittest.skipIf(pytest is None, "pytest is not installed")
+class PytestPluginTest(unittest.TestCase):
+    def run_pytest(self, *args, backend="auto"):
+        src = os.path.dirname(os.path.dirname(os.path.abspath(pysome.__file__)))
+        env = dict(os.environ, PYTHONPATH=src, PYTEST_DISABLE_PLUGIN_AUTOLOAD="1", PYSOME_BACKEND=backend)
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "test_templates.py"), "w") as f:
+                f.write(TESTS)
+            result = subprocess.run([sys.executable, "-m", "pytest", "-p", "pysome.pytest_plugin", "-p",
+                                     "no:cacheprovider", "test_templates.py", *args], cwd=tmp, env=env,
+                                    capture_output=True, text=True)
+        return result.returncode, result.stdout
+
+    def test_slowest(self):
+        code, out = self.run_pytest("--pysome-slowest=1")
+        self.assertEqual(code, 0, out)
+        lines = out.split("slowest 1 pysome templates")[1].splitlines()
+        self.assertIn("test_templates.py:18  SomeList(Some(slow))", lines[1])
+        self.assertIn("template cache: 99 hits, 2 misses, 2/256 templates", lines[2])
+
+    def test_slowest_interpreted(self):
+        code, out = self.run_pytest("--pysome-slowest=1", backend="interpreted")
+        self.assertEqual(code, 0, out)
+        self.assertIn("SomeList(Some(slow))", out)
+        self.assertNotIn("template cache", out)
+
+    def test_budget(self):
+        code, out = self.run_pytest("--pysome-budget=0.02")
+        self.assertEqual(code, 1, out)
+        self.assertIn("1 failed, 1 passed", out)
+        self.assertIn("expect(...).to_be(SomeList(Some(slow))) took", out)
+        self.assertNotIn("slowest", out)
+
+    def test_inactive(self):
+        code, out = self.run_pytest()
+        self.assertEqual(code, 0, out)
+        self.assertNotIn("pysome", out)
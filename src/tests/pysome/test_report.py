@@ -0,0 +1,65 @@
+import pickle
+import unittest
+
+from pysome import *
+from pysome.report import Report, matcher_name
+
+
+class ReportTest(unittest.TestCase):
+    def test_counts(self):
+        template = SomeDict(id=Some(int), tags=SomeList(Some(str)))
+        report = Report()
+        self.assertTrue(report.add({"id": 1, "tags": []}, template))
+        self.assertFalse(report.add({"id": "1", "tags": ["a"]}, template))
+        self.assertFalse(report.add({"id": 2, "tags": [1, 2, "a"]}, template))
+        self.assertFalse(report.add({"id": 2.5, "tags": [3]}, template))
+
+        self.assertEqual(report.records, 4)
+        self.assertEqual(report.failed, 3)
+        self.assertEqual(report.passed, 1)
+        self.assertEqual(report.pass_rate, 0.25)
+        self.assertEqual(report.paths, {"$.id": 2, "$.tags[*]": 2})
+        self.assertEqual(report.failure_rate("$.id"), 0.5)
+        self.assertEqual(report.matchers, {"Some(int)": 2, "Some(str)": 3})
+        self.assertEqual(report.samples("$.id"), ["1", 2.5])
+        self.assertEqual(report.samples("$.tags[*]"), [1, 2, 3])
+        self.assertIn("$.tags[*]", str(report))
+
+    def test_empty(self):
+        report = Report()
+        self.assertEqual(report.pass_rate, 1.0)
+        self.assertEqual(report.failure_rate("$"), 0.0)
+
+    def test_bounded_samples(self):
+        report = Report(max_samples=3, seed=1)
+        report.add_all(({"a": str(i)} for i in range(1000)), {"a": Some(int)})
+        self.assertEqual(report.failed, 1000)
+        samples = report.samples("$.a")
+        self.assertEqual(len(samples), 3)
+        self.assertEqual(len(set(samples)), 3)
+
+    def test_merge(self):
+        template = {"a": Some(int)}
+        r1 = Report(max_samples=4, seed=1).add_all([{"a": 1}, {"a": "x"}, {"a": "y"}], template)
+        r2 = Report(max_samples=4, seed=2).add_all([{"a": "z"}, {"a": 2}, {"a": None}, {"a": []}], template)
+        r2 = pickle.loads(pickle.dumps(r2))
+        r1.merge(r2)
+        self.assertEqual(r1.records, 7)
+        self.assertEqual(r1.failed, 5)
+        self.assertEqual(r1.paths, {"$.a": 5})
+        samples = r1.samples("$.a")
+        self.assertEqual(len(samples), 4)
+        self.assertTrue(set(map(repr, samples)) <= {"'x'", "'y'", "'z'", "None", "[]"})
+
+    def test_expect(self):
+        report = expect({"a": 1}, {"a": "b"}, {"b": 1}).report({"a": Some(int)})
+        self.assertEqual(report.records, 3)
+        self.assertEqual(report.paths, {"$.a": 2, "$.b": 1})
+        self.assertEqual(report.matchers["<unexpected key>"], 1)
+        expect({"a": 1}).report({"a": Some(int)}, report=report)
+        self.assertEqual(report.records, 4)
+
+    def test_matcher_name(self):
+        self.assertEqual(matcher_name(SomeList(Some(int))), "SomeList(Some(int))")
+        self.assertEqual(matcher_name([1, 2]), "<list>")
+        self.assertEqual(matcher_name("a"), "'a'")
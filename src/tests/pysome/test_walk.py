@@ -0,0 +1,66 @@
+import unittest
+
+from pysome import *
+from pysome.walk import iter_failures, find_failures, format_path, missing
+
+
+class IterFailuresTest(unittest.TestCase):
+    def test_no_failures(self):
+        template = {"a": Some(int), "b": SomeList(SomeDict(id=Some(int)))}
+        self.assertEqual(list(iter_failures({"a": 1, "b": [{"id": 1}, {"id": 2}]}, template)), [])
+
+    def test_all_failures(self):
+        template = {"a": Some(int), "b": SomeList(SomeDict(id=Some(int)))}
+        failures = list(iter_failures({"a": "x", "b": [{"id": "1"}, {"id": 2}, {}]}, template))
+        self.assertEqual([format_path(f.path) for f in failures], ["$.a", "$.b[0].id", "$.b[2].id"])
+        self.assertEqual([f.value for f in failures], ["x", "1", None])
+
+    def test_dict_keys(self):
+        failures = list(iter_failures({"a": 1, "c": 2}, {"a": 1, "b": Some()}))
+        self.assertEqual({(f.path, f.value) for f in failures}, {(("b",), missing), (("c",), 2)})
+
+    def test_closed_dict(self):
+        template = SomeDict(a=Some(int), b=SomeOrNone(str), extra="forbid", required=["a"])
+        failures = list(iter_failures({"b": 1, "c": 2}, template))
+        self.assertEqual({(f.path, f.value) for f in failures}, {(("a",), missing), (("b",), 1), (("c",), 2)})
+        self.assertEqual(list(iter_failures({"a": 1}, template)), [])
+
+    def test_mapping_each(self):
+        failures = list(iter_failures({"a": 1, "b": "2", 3: 3}, SomeMapping.each(Some(str), Some(int))))
+        self.assertEqual({(f.path, f.value) for f in failures}, {(("b",), "2"), ((3,), 3)})
+
+    def test_shape(self):
+        self.assertEqual(len(list(iter_failures([1, 2], [Some(int)]))), 1)
+        self.assertEqual(len(list(iter_failures((1, 2), [Some(int), Some(int)]))), 1)
+        self.assertEqual(len(list(iter_failures([1, 2], SomeList(length=3)))), 1)
+        self.assertEqual(len(list(iter_failures(12, {"a": 1}))), 1)
+
+    def test_equals_template(self):
+        cases = [
+            ({"a": [1, "2", 3]}, {"a": SomeList(Some(int))}),
+            ({"a": [1, 2, 3]}, {"a": SomeList(Some(int))}),
+            ([{"a": 1}, {"a": 2, "b": 3}], [SomeDict(a=Some(int)), {"a": 2}]),
+            ("abc", SomeIterable(Some(str))),
+            ({"a": 1, "b": 2}, SomeDict(a=1, extra="forbid")),
+            ({"b": 2}, SomeDict(a=Some(), required=True)),
+        ]
+        for data, template in cases:
+            self.assertEqual(template == data, not list(iter_failures(data, template)))
+
+    def test_one_of(self):
+        template = SomeList(SomeOneOf("type", {"a": SomeDict(x=Some(int)), "b": SomeDict(y=Some(int))}))
+        failures = list(iter_failures([{"type": "a", "x": 1}, {"type": "b", "y": "2"}, {"type": "c"}, {}], template))
+        self.assertEqual([format_path(f.path) for f in failures], ["$[1].y", "$[2].type", "$[3].type"])
+        self.assertEqual([f.value for f in failures], ["2", "c", missing])
+
+    def test_same(self):
+        self.assertEqual(find_failures([1, 1], [Same(), Same()]), [])
+        self.assertEqual(len(find_failures([1, 2], [Same(), Same()])), 1)
+
+
+class FormatPathTest(unittest.TestCase):
+    def test_basics(self):
+        self.assertEqual(format_path(()), "$")
+        self.assertEqual(format_path(("a", 0, "b")), "$.a[0].b")
+        self.assertEqual(format_path(("a", 0, "b"), wildcard=True), "$.a[*].b")
+        self.assertEqual(format_path((1.5, "x y")), "$[1.5]['x y']")